@@ -1,9 +1,18 @@
 import os
 import logging
 import datetime
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, jsonify, request
 from flask_cors import CORS
 
+from challenges import challenges
+from downloads import downloads
+from initial_page import InitialPage
+from jobs import job_summaries, jobs
+from metrics import init_metrics
+from queries import queries
+from static_manifest import StaticManifest
+from streaming import streaming
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -11,24 +20,56 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Initialize Flask app with static folder configuration
-app = Flask(__name__, static_folder='../frontend/build', static_url_path='')
+# Initialize Flask app; the React build is served from an in-memory manifest
+app = Flask(__name__, static_folder=None)
 CORS(app)
+init_metrics(app)
+app.register_blueprint(challenges)
+app.register_blueprint(downloads)
+app.register_blueprint(jobs)
+app.register_blueprint(queries)
+app.register_blueprint(streaming)
+
+STATIC_ROOT = os.path.normpath(os.path.join(app.root_path, '..', 'frontend', 'build'))
+static_files = StaticManifest(STATIC_ROOT)
+
+
+def hello_payload():
+    return {
+        "message": "THIS IS THE TRIAL FOR DECEMBER 14, 2024",
+        "environment": os.getenv('AWS_ENVIRONMENT', 'development')
+    }
+
+
+def initial_data():
+    """What the app needs for first paint; the job list comes from the jobs cache"""
+    summaries, _ = job_summaries()
+    states = {}
+    for summary in summaries:
+        states[summary['state']] = states.get(summary['state'], 0) + 1
+    return dict(hello_payload(), jobs={"total": len(summaries), "states": states})
+
+
+initial_page = InitialPage(static_files, initial_data)
+
+
+def serve_index():
+    response = initial_page.response(request)
+    if response is None:
+        return jsonify({"error": "Frontend build not found"}), 404
+    return response
 
 # Serve React App at root URL
 @app.route('/')
 def serve():
     logger.info("Serving React frontend")
-    return send_from_directory(app.static_folder, 'index.html')
+    return serve_index()
 
 # Move your existing endpoint to /api/hello
 @app.route("/api/hello")
 def hello_world():
     logger.info(f"Hello world endpoint called from IP: {request.remote_addr}")
-    return jsonify({
-        "message": "THIS IS THE TRIAL FOR DECEMBER 14, 2024",
-        "environment": os.getenv('AWS_ENVIRONMENT', 'development')
-    })
+    return jsonify(hello_payload())
 
 @app.route("/api/health")
 def health():
@@ -38,13 +79,13 @@ def health():
         "timestamp": datetime.datetime.utcnow().isoformat()
     })
 
-# Serve static files from the React app
+# Serve static files from the React app; unknown paths get index.html for client-side routing
 @app.route('/<path:path>')
 def serve_static(path):
-    if os.path.exists(os.path.join(app.static_folder, path)):
-        return send_from_directory(app.static_folder, path)
-    else:
-        return send_from_directory(app.static_folder, 'index.html')
+    asset = static_files.get(path)
+    if asset is None or path == 'index.html':
+        return serve_index()
+    return static_files.response(asset, request)
 
 # Keep your existing error handlers and middleware...
 
@@ -0,0 +1,73 @@
+import os
+import json
+import logging
+import datetime
+
+from flask import Blueprint, jsonify, request
+
+from runs import read_status, run_path
+
+logger = logging.getLogger(__name__)
+
+challenges = Blueprint('challenges', __name__)
+
+# File protocol shared with outlook_extractor/twofactor.py: the extractor publishes
+# the pending challenge and waits for the code file naming the same challenge id
+CHALLENGE_FILE = 'challenge.json'
+CODE_FILE = 'challenge.code'
+
+
+def pending_challenge(run_id):
+    try:
+        with open(run_path(run_id, CHALLENGE_FILE), 'r') as f:
+            challenge = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if challenge.get('state') != 'pending':
+        return None
+    if datetime.datetime.fromisoformat(challenge['expires_at']) < datetime.datetime.utcnow():
+        return None
+    return challenge
+
+
+@challenges.route('/api/jobs/<run_id>/2fa')
+def get_challenge(run_id):
+    """The 2FA prompt a job is waiting on, if any"""
+    try:
+        if read_status(run_id) is None:
+            return jsonify({"error": "Unknown job"}), 404
+    except ValueError:
+        return jsonify({"error": "Invalid job id"}), 400
+    challenge = pending_challenge(run_id)
+    if challenge is None:
+        return jsonify({"error": "No 2FA code is pending for this job"}), 404
+    return jsonify({key: challenge.get(key) for key in ('id', 'prompt', 'attempt', 'created_at', 'expires_at')})
+
+
+@challenges.route('/api/jobs/<run_id>/2fa', methods=['POST'])
+def submit_code(run_id):
+    """Hand a 2FA code to the job waiting on it; the job picks it up on its next poll"""
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({"error": "request body must be a JSON object"}), 400
+    code = str(payload.get('code') or '').strip()
+    if not code:
+        return jsonify({"error": "code is required"}), 400
+    try:
+        if read_status(run_id) is None:
+            return jsonify({"error": "Unknown job"}), 404
+    except ValueError:
+        return jsonify({"error": "Invalid job id"}), 400
+    challenge = pending_challenge(run_id)
+    if challenge is None:
+        return jsonify({"error": "No 2FA code is pending for this job"}), 404
+    # Optional, so a client answering a stale prompt cannot feed its code to a newer challenge
+    if payload.get('challenge_id') not in (None, challenge['id']):
+        return jsonify({"error": "That challenge is no longer pending", "pending": challenge['id']}), 409
+
+    tmp_path = run_path(run_id, f'{CODE_FILE}.{os.getpid()}.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump({'id': challenge['id'], 'code': code}, f)
+    os.replace(tmp_path, run_path(run_id, CODE_FILE))
+    logger.info(f"2FA code submitted for job {run_id} (challenge {challenge['id']})")
+    return jsonify({"id": challenge['id'], "state": "submitted"}), 202
@@ -0,0 +1,190 @@
+import os
+import zlib
+import logging
+import mimetypes
+
+from flask import Blueprint, Response, jsonify, request
+from werkzeug.http import http_date, parse_date
+from werkzeug.wsgi import ClosingIterator, wrap_file
+
+from runs import EXTRACTION_DIR, read_status, run_path
+from slots import long_requests, releaser
+
+logger = logging.getLogger(__name__)
+
+downloads = Blueprint('downloads', __name__)
+
+EXPORT_DIR = 'export'
+TEXT_FORMATS = ('.txt', '.jsonl', '.csv', '.html')
+CHUNK_SIZE = 256 * 1024
+# When set (e.g. "/protected-exports/"), the response only carries an
+# X-Accel-Redirect under this prefix and nginx sends the file, freeing the worker thread immediately
+ACCEL_PREFIX = os.environ.get('DOWNLOAD_ACCEL_PREFIX')
+
+mimetypes.add_type('application/x-ndjson', '.jsonl')
+
+
+def export_files(run_id):
+    """Finished export files of a run; renders in progress live in hidden partial directories"""
+    directory = run_path(run_id, EXPORT_DIR)
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return []
+    return sorted((entry for entry in entries if entry.is_file() and not entry.name.startswith('.')),
+                  key=lambda entry: entry.name)
+
+
+def file_etag(stat):
+    return f'{stat.st_size:x}-{stat.st_mtime_ns:x}'
+
+
+def requested_range(stat, etag):
+    """(start, stop) of a satisfiable single Range, None for the whole file, or False if unsatisfiable.
+
+    A Range whose If-Range no longer matches the file is ignored, so a
+    resumed download of a re-rendered export restarts from the beginning.
+    """
+    if request.range is None:
+        return None
+    if_range = request.if_range
+    if if_range.etag is not None and if_range.etag != etag:
+        return None
+    if if_range.date is not None and int(stat.st_mtime) > if_range.date.timestamp():
+        return None
+    span = request.range.range_for_length(stat.st_size)
+    if span is None:
+        # Multiple ranges are answered with the whole file; a single range past the end is unsatisfiable
+        return False if len(request.range.ranges) == 1 else None
+    return span
+
+
+def gzip_chunks(path):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+    yield compressor.flush()
+
+
+def send_export(path, name, stat):
+    etag = file_etag(stat)
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    headers = {
+        'Accept-Ranges': 'bytes',
+        'Content-Disposition': f'attachment; filename="{name}"',
+        'Last-Modified': http_date(stat.st_mtime),
+        'Cache-Control': 'private, no-cache',
+    }
+    text = name.endswith(TEXT_FORMATS)
+    if text:
+        headers['Vary'] = 'Accept-Encoding'
+
+    span = requested_range(stat, etag)
+    if span is False:
+        return Response(status=416, headers={'Content-Range': f'bytes */{stat.st_size}'})
+    gzip = text and span is None and request.accept_encodings.quality('gzip') > 0 and not ACCEL_PREFIX
+
+    etags = request.if_none_match
+    if etags and etags.contains_weak(f'{etag}-gzip' if gzip else etag):
+        return Response(status=304, headers={'ETag': f'"{etag}-gzip"' if gzip else f'"{etag}"'})
+    since = parse_date(request.headers.get('If-Modified-Since'))
+    if not etags and since is not None and int(stat.st_mtime) <= since.timestamp():
+        return Response(status=304)
+
+    if ACCEL_PREFIX:
+        headers['X-Accel-Redirect'] = ACCEL_PREFIX + os.path.relpath(path, EXTRACTION_DIR).replace(os.sep, '/')
+        headers['ETag'] = f'"{etag}"'
+        return Response(status=200, headers=headers, content_type=content_type)
+
+    # Served by this worker, the download holds a thread until the client has it all,
+    # so it shares the event streams' budget instead of taking the reserved threads
+    if not long_requests.acquire(blocking=False):
+        return jsonify({"error": "Too many downloads in progress"}), 503, {'Retry-After': '5'}
+    release = releaser()
+    try:
+        return stream_export(path, stat, span, gzip, etag, headers, content_type, release)
+    except BaseException:
+        release()
+        raise
+
+
+class SlotFile:
+    """An open export whose close also gives back the download's slot.
+
+    Passed-through bodies never reach the response's close callbacks, so the
+    server's file wrapper closing the file is the one signal that the
+    transfer ended; everything else (fileno for sendfile, seek, read) goes
+    to the file itself.
+    """
+
+    def __init__(self, f, release):
+        self.f = f
+        self.release = release
+
+    def __getattr__(self, name):
+        return getattr(self.f, name)
+
+    def close(self):
+        try:
+            self.f.close()
+        finally:
+            self.release()
+
+
+def stream_export(path, stat, span, gzip, etag, headers, content_type, release):
+    if gzip:
+        # Compressed on the fly chunk by chunk; the length is unknown, so the response is chunked
+        headers.update({'ETag': f'"{etag}-gzip"', 'Content-Encoding': 'gzip'})
+        headers['Accept-Ranges'] = 'none'
+        return Response(ClosingIterator(gzip_chunks(path), release), headers=headers, content_type=content_type,
+                        direct_passthrough=True)
+
+    f = SlotFile(open(path, 'rb'), release)
+    headers['ETag'] = f'"{etag}"'
+    status = 200
+    length = stat.st_size
+    if span is not None:
+        start, stop = span
+        f.seek(start)
+        length = stop - start
+        status = 206
+        headers['Content-Range'] = f'bytes {start}-{stop - 1}/{stat.st_size}'
+    # The server's file wrapper sends from the current offset for Content-Length bytes with
+    # sendfile(2), so neither a whole file nor a range is read into the worker
+    response = Response(wrap_file(request.environ, f, CHUNK_SIZE), status=status, headers=headers,
+                        content_type=content_type, direct_passthrough=True)
+    response.content_length = length
+    return response
+
+
+@downloads.route('/api/jobs/<run_id>/exports')
+def list_exports(run_id):
+    try:
+        if read_status(run_id) is None:
+            return jsonify({"error": "Unknown job"}), 404
+    except ValueError:
+        return jsonify({"error": "Invalid job id"}), 400
+    return jsonify({"exports": [{
+        'name': entry.name,
+        'size': entry.stat().st_size,
+        'url': f'/api/jobs/{run_id}/exports/{entry.name}',
+    } for entry in export_files(run_id)]})
+
+
+@downloads.route('/api/jobs/<run_id>/exports/<name>')
+def download_export(run_id, name):
+    """Download a finished export with Range/If-Range support, gzip-encoding text formats on the fly"""
+    try:
+        entry = next((entry for entry in export_files(run_id) if entry.name == name), None)
+    except ValueError:
+        return jsonify({"error": "Invalid job id"}), 400
+    if entry is None:
+        return jsonify({"error": "Export not found"}), 404
+    logger.info(f"Download of {run_id}/{name} (range: {request.headers.get('Range')})")
+    return send_export(entry.path, name, entry.stat())
@@ -1,4 +1,37 @@
-bind = "0.0.0.0:10000"
-workers = 2
-threads = 4
-timeout = 120
\ No newline at end of file
+import os
+import sys
+import shutil
+import logging
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from tuning import settings  # noqa: E402
+
+# One config for the Dockerfile, the Procfile and local runs; platforms that assign a port set PORT
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+# Sized from the cgroup CPU/memory limits and, when present, loadtest.py --sweep results
+# (WEB_CONCURRENCY, GUNICORN_THREADS and GUNICORN_WORKER_CLASS override)
+tuned = settings()
+workers = tuned['workers']
+threads = tuned['threads']
+worker_class = tuned['worker_class']
+timeout = 120
+# Workers import the app after this runs, so slots.py sizes its budget from the threads chosen here
+os.environ['MAX_LONG_REQUESTS'] = str(tuned['max_long_requests'])
+
+# Workers write their metrics here so /metrics aggregates all of them
+prometheus_dir = os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'prometheus_multiproc'))
+
+
+def on_starting(server):
+    logging.getLogger('gunicorn.error').info(
+        f"{workers} workers x {threads} threads ({worker_class}), {tuned['max_long_requests']} for streams "
+        f"and downloads, for {tuned['limits']}; {tuned['reason']}")
+    shutil.rmtree(prometheus_dir, ignore_errors=True)
+    os.makedirs(prometheus_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,77 @@
+import json
+import gzip
+import hashlib
+import logging
+import threading
+
+from flask import Response
+
+logger = logging.getLogger(__name__)
+
+HEAD_END = b'</head>'
+
+
+def script_tag(payload):
+    # Escape "<" so no string in the payload can close the script element
+    data = json.dumps(payload, sort_keys=True, separators=(',', ':')).replace('<', '\\u003c')
+    return f'<script>window.__INITIAL_DATA__={data}</script>'.encode('utf-8')
+
+
+class RenderedPage:
+    __slots__ = ('key', 'body', 'gzipped', 'etag')
+
+    def __init__(self, key, body):
+        self.key = key
+        self.body = body
+        self.gzipped = gzip.compress(body, 9)
+        self.etag = hashlib.blake2b(body, digest_size=12).hexdigest()
+
+
+class InitialPage:
+    """index.html with the app's boot data inlined, so first paint needs no API round trip.
+
+    ``data`` is called on every request and should be cheap (cached); the
+    page is re-rendered and re-compressed only when its result or the build's
+    index.html changes, and otherwise served from memory with an ETag.
+    """
+
+    def __init__(self, static_files, data):
+        self.static_files = static_files
+        self.data = data
+        self.page = None
+        self.lock = threading.Lock()
+
+    def render(self):
+        template = self.static_files.get('index.html')
+        if template is None:
+            return None
+        payload = self.data()
+        key = (template.identity.etag, json.dumps(payload, sort_keys=True))
+        page = self.page
+        if page is not None and page.key == key:
+            return page
+        with self.lock:
+            if self.page is None or self.page.key != key:
+                html = template.identity.body
+                if html is None:
+                    with open(template.identity.file_path, 'rb') as f:
+                        html = f.read()
+                head = html.find(HEAD_END)
+                at = head if head >= 0 else 0
+                self.page = RenderedPage(key, html[:at] + script_tag(payload) + html[at:])
+                logger.info(f"Rendered index.html with initial data ({len(self.page.body)} bytes)")
+            return self.page
+
+    def response(self, request):
+        page = self.render()
+        if page is None:
+            return None
+        gzipped = request.accept_encodings.quality('gzip') > 0
+        response = Response(page.gzipped if gzipped else page.body, mimetype='text/html')
+        if gzipped:
+            response.content_encoding = 'gzip'
+        response.vary.add('Accept-Encoding')
+        response.set_etag(f'{page.etag}-gzip' if gzipped else page.etag)
+        # Revalidated on every load: the data in it changes while the URL does not
+        response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
@@ -0,0 +1,220 @@
+import os
+import sys
+import json
+import time
+import fcntl
+import shlex
+import hashlib
+import logging
+import datetime
+import threading
+import subprocess
+
+from flask import Blueprint, jsonify, request
+
+from runs import ACTIVE_STATES, EXTRACTION_DIR, iter_runs, read_status, run_path
+from singleflight import CoalescingCache
+
+logger = logging.getLogger(__name__)
+
+jobs = Blueprint('jobs', __name__)
+
+# How the backend starts an extraction; the run directory and options are appended
+EXTRACTOR_COMMAND = os.environ.get('EXTRACTOR_COMMAND', f'{sys.executable} -m outlook_extractor')
+EXTRACTOR_CWD = os.environ.get('EXTRACTOR_CWD', os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+# A completed run is reused for an identical request for this many seconds
+JOB_RESULT_TTL = float(os.environ.get('JOB_RESULT_TTL', 600))
+JOBS_DIR = os.path.join(EXTRACTION_DIR, '.jobs')
+# The launched extractor's pid, kept apart from status.json, which the extractor owns once it starts
+PID_FILE = 'extractor.pid'
+
+FETCH_MODES = ('render', 'source')
+OUTPUTS = ('text', 'parquet', 'dedup', 'segments')
+
+job_list_cache = CoalescingCache(maxsize=1, ttl=2.0)
+
+
+def normalize_spec(payload):
+    """The fields that decide what a run extracts, in canonical form; raises ValueError on bad input"""
+    if not isinstance(payload, dict):
+        raise ValueError("request body must be a JSON object")
+    for field in ('account', 'sender', 'fetch_mode'):
+        if payload.get(field) is not None and not isinstance(payload[field], str):
+            raise ValueError(f"{field} must be a string")
+    if payload.get('outputs') is not None and (not isinstance(payload['outputs'], list) or
+                                               not all(isinstance(output, str) for output in payload['outputs'])):
+        raise ValueError("outputs must be a list of strings")
+    account = (payload.get('account') or os.environ.get('OUTLOOK_EMAIL') or '').strip().lower()
+    sender = ' '.join((payload.get('sender') or '').split())
+    if not account or not sender:
+        raise ValueError("account and sender are required")
+    fetch_mode = payload.get('fetch_mode', 'render')
+    if fetch_mode not in FETCH_MODES:
+        raise ValueError(f"fetch_mode must be one of {', '.join(FETCH_MODES)}")
+    outputs = sorted(set(payload.get('outputs') or ()))
+    if set(outputs) - set(OUTPUTS):
+        raise ValueError(f"outputs must be among {', '.join(OUTPUTS)}")
+    return {
+        'account': account,
+        'sender': sender,
+        'fetch_mode': fetch_mode,
+        'conversations': bool(payload.get('conversations')),
+        'attachments': bool(payload.get('attachments')),
+        'outputs': outputs,
+    }
+
+
+def spec_key(spec):
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def process_alive(pid):
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def launched_pid(run_id):
+    try:
+        with open(run_path(run_id, PID_FILE), 'r') as f:
+            return int(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def reusable(run_id, status):
+    """Whether an existing run can serve a new identical request: still going, or completed recently"""
+    state = status.get('state')
+    if state in ACTIVE_STATES:
+        return process_alive(status.get('pid') or launched_pid(run_id))
+    if state == 'completed':
+        finished = datetime.datetime.fromisoformat(status['updated_at'])
+        return (datetime.datetime.utcnow() - finished).total_seconds() < JOB_RESULT_TTL
+    return False
+
+
+def extractor_args(spec, output_dir):
+    args = shlex.split(EXTRACTOR_COMMAND) + ['--output-dir', output_dir, '--sender', spec['sender'], '--headless',
+                                             '--fetch-mode', spec['fetch_mode']]
+    if spec['conversations']:
+        args.append('--conversations')
+    if spec['attachments']:
+        args.append('--attachments')
+    for output in spec['outputs']:
+        args += ['--output', output]
+    return args
+
+
+def launch(spec, key):
+    run_id = f"{datetime.datetime.utcnow().strftime('%Y%m%d_%H%M%S')}_{key[:8]}"
+    output_dir = run_path(run_id)
+    os.makedirs(output_dir)
+    write_status(run_id, {'state': 'queued', 'key': key, 'spec': spec, 'account': spec['account'],
+                          'sender': spec['sender'], 'queued_at': datetime.datetime.utcnow().isoformat()})
+    env = dict(os.environ, OUTLOOK_EMAIL=spec['account'])
+    with open(run_path(run_id, 'extractor.log'), 'ab') as log:
+        process = subprocess.Popen(extractor_args(spec, output_dir), cwd=EXTRACTOR_CWD, env=env,
+                                   stdout=log, stderr=subprocess.STDOUT, start_new_session=True)
+    # Reap the child when it exits so finished extractions do not linger as zombies
+    threading.Thread(target=process.wait, daemon=True).start()
+    # Not merged into status.json: the extractor may already be writing its own state there
+    tmp_path = run_path(run_id, f'{PID_FILE}.tmp')
+    with open(tmp_path, 'w') as f:
+        f.write(str(process.pid))
+    os.replace(tmp_path, run_path(run_id, PID_FILE))
+    logger.info(f"Started job {run_id} (pid {process.pid}) for {spec['sender']}")
+    return run_id
+
+
+def write_status(run_id, status):
+    # The extractor merges its own fields into this file once it starts
+    status['updated_at'] = datetime.datetime.utcnow().isoformat()
+    tmp_path = run_path(run_id, f'status.json.{os.getpid()}.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(status, f)
+    os.replace(tmp_path, run_path(run_id, 'status.json'))
+
+
+def submit(spec):
+    """Return (run id, how) for a spec: 'attached' to an in-flight run, 'cached' completed run, or 'started'.
+
+    Gunicorn workers are separate processes, so the in-flight table is the
+    run directories themselves: a per-key pointer file names the current run
+    and an exclusive lock on it makes check-then-launch atomic across workers.
+    """
+    key = spec_key(spec)
+    os.makedirs(JOBS_DIR, exist_ok=True)
+    with open(os.path.join(JOBS_DIR, f'{key}.lock'), 'a+') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        pointer_path = os.path.join(JOBS_DIR, f'{key}.json')
+        try:
+            with open(pointer_path, 'r') as f:
+                run_id = json.load(f)['run_id']
+            status = read_status(run_id)
+        except (OSError, ValueError, KeyError):
+            run_id, status = None, None
+        if status and reusable(run_id, status):
+            return run_id, 'attached' if status.get('state') in ACTIVE_STATES else 'cached'
+
+        run_id = launch(spec, key)
+        with open(pointer_path + '.tmp', 'w') as f:
+            json.dump({'run_id': run_id, 'spec': spec}, f)
+        os.replace(pointer_path + '.tmp', pointer_path)
+        job_list_cache.clear()
+        return run_id, 'started'
+
+
+def job_summary(run_id, status):
+    return {
+        'id': run_id,
+        'state': status.get('state'),
+        'account': status.get('account'),
+        'sender': status.get('sender'),
+        'extracted': status.get('extracted', 0),
+        'started_at': status.get('started_at') or status.get('queued_at'),
+        'updated_at': status.get('updated_at'),
+        'challenge': status.get('challenge'),
+    }
+
+
+@jobs.route('/api/jobs', methods=['POST'])
+def create_job():
+    """Start an extraction, or attach to an identical one that is running or just finished"""
+    try:
+        spec = normalize_spec(request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    started = time.monotonic()
+    run_id, how = submit(spec)
+    logger.info(f"Job request for {spec['sender']}: {how} {run_id} in {time.monotonic() - started:.3f}s")
+    return jsonify(dict(job_summary(run_id, read_status(run_id) or {}), result=how)), \
+        202 if how == 'started' else 200
+
+
+def job_summaries():
+    """(summaries of every run, cache source), shared with the initial page data"""
+    return job_list_cache.get_or_compute(
+        'jobs', lambda: [job_summary(run_id, status) for run_id, status in iter_runs()])
+
+
+@jobs.route('/api/jobs')
+def list_jobs():
+    summaries, source = job_summaries()
+    return jsonify({"jobs": summaries, "source": source})
+
+
+@jobs.route('/api/jobs/<run_id>')
+def get_job(run_id):
+    try:
+        status = read_status(run_id)
+    except ValueError:
+        return jsonify({"error": "Invalid job id"}), 400
+    if status is None:
+        return jsonify({"error": "Unknown job"}), 404
+    return jsonify(job_summary(run_id, status))
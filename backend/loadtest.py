@@ -0,0 +1,240 @@
+import os
+import re
+import sys
+import json
+import time
+import socket
+import logging
+import argparse
+import threading
+import subprocess
+import http.client
+from urllib.parse import urlsplit
+
+from tuning import PROFILE_PATH, detect_limits, recommend
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STEPS = (1, 2, 4, 8, 16, 32, 64)
+# workers x threads[:class]; sync workers take no threads
+DEFAULT_CONFIGS = ('1x8', '2x4', '2x8', '3x4', '4x4', '4x1:sync')
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+# How much of the mix each kind of route gets
+MIX = (('static', 3), ('api', 6), ('stream', 1))
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def discover_routes(base_url):
+    """Paths to drive per kind: the SPA and its assets, the JSON API, and a job's event stream"""
+    routes = {'static': ['/'], 'api': ['/api/health', '/api/jobs', '/api/emails?limit=50'], 'stream': []}
+    host = urlsplit(base_url)
+    connection = http.client.HTTPConnection(host.hostname, host.port, timeout=10)
+    try:
+        connection.request('GET', '/')
+        page = connection.getresponse().read().decode('utf-8', 'replace')
+        routes['static'] += sorted(set(re.findall(r'(?:src|href)="(/static/[^"]+)"', page)))
+        connection.request('GET', '/api/jobs')
+        response = connection.getresponse()
+        jobs = json.loads(response.read()).get('jobs', []) if response.status == 200 else []
+    finally:
+        connection.close()
+    # A finished job's stream replays its records and then ends, so each request has a definite length
+    finished = [job['id'] for job in jobs if job.get('state') == 'completed']
+    if finished:
+        routes['stream'].append(f'/api/jobs/{finished[0]}/events')
+    return routes
+
+
+def schedule(routes):
+    """Round-robin list of (kind, path) following MIX over the routes that exist"""
+    plan = []
+    for kind, weight in MIX:
+        paths = routes.get(kind) or []
+        for n in range(weight * max(1, len(paths)) if paths else 0):
+            plan.append((kind, paths[n % len(paths)]))
+    return plan
+
+
+class Client(threading.Thread):
+    """One simulated user on a keep-alive connection, issuing requests back to back until the deadline"""
+
+    def __init__(self, base_url, plan, offset, deadline):
+        super().__init__(daemon=True)
+        self.host = urlsplit(base_url)
+        self.plan = plan
+        self.offset = offset
+        self.deadline = deadline
+        self.samples = []
+
+    def connect(self):
+        return http.client.HTTPConnection(self.host.hostname, self.host.port, timeout=30)
+
+    def run(self):
+        connection = self.connect()
+        n = self.offset
+        while time.monotonic() < self.deadline:
+            kind, path = self.plan[n % len(self.plan)]
+            n += 1
+            started = time.monotonic()
+            try:
+                connection.request('GET', path, headers={'Accept-Encoding': 'gzip, br'})
+                response = connection.getresponse()
+                response.read()
+                ok = response.status < 500
+            except (OSError, http.client.HTTPException):
+                ok = False
+                connection.close()
+                connection = self.connect()
+            self.samples.append((kind, time.monotonic() - started, ok))
+        connection.close()
+
+
+def summarize(samples, elapsed, concurrency):
+    latencies = [latency for _, latency, _ in samples]
+    errors = sum(1 for _, _, ok in samples if not ok)
+    step = {
+        'concurrency': concurrency,
+        'requests': len(samples),
+        'rps': len(samples) / elapsed if elapsed else 0.0,
+        'error_rate': errors / len(samples) if samples else 1.0,
+        'p50': percentile(latencies, 0.5),
+        'p95': percentile(latencies, 0.95),
+        'p99': percentile(latencies, 0.99),
+        'routes': {},
+    }
+    for kind, _ in MIX:
+        kind_latencies = [latency for sample_kind, latency, _ in samples if sample_kind == kind]
+        if kind_latencies:
+            step['routes'][kind] = {'requests': len(kind_latencies), 'p50': percentile(kind_latencies, 0.5),
+                                    'p99': percentile(kind_latencies, 0.99)}
+    return step
+
+
+def run_steps(base_url, steps=DEFAULT_STEPS, duration=10.0):
+    """Drive the mix at each concurrency level in turn and return a summary per level"""
+    plan = schedule(discover_routes(base_url))
+    results = []
+    for concurrency in steps:
+        started = time.monotonic()
+        clients = [Client(base_url, plan, n, started + duration) for n in range(concurrency)]
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+        step = summarize([sample for client in clients for sample in client.samples],
+                         time.monotonic() - started, concurrency)
+        print(f"  c={concurrency:<4} {step['rps']:8.1f} req/s  p50 {step['p50'] * 1000:7.1f}ms  "
+              f"p99 {step['p99'] * 1000:7.1f}ms  errors {step['error_rate']:.1%}")
+        results.append(step)
+    return results
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(base_url, timeout=30.0):
+    host = urlsplit(base_url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection(host.hostname, host.port, timeout=1)
+            connection.request('GET', '/api/health')
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not come up")
+
+
+def worker_rss(master_pid):
+    """Largest resident set among the master's workers, in bytes"""
+    try:
+        with open(f'/proc/{master_pid}/task/{master_pid}/children', 'r') as f:
+            children = [int(pid) for pid in f.read().split()]
+    except OSError:
+        return None
+    sizes = []
+    for pid in children:
+        try:
+            with open(f'/proc/{pid}/status', 'r') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        sizes.append(int(line.split()[1]) * 1024)
+        except OSError:
+            continue
+    return max(sizes) if sizes else None
+
+
+def parse_config(text):
+    shape, _, worker_class = text.partition(':')
+    workers, _, threads = shape.partition('x')
+    worker_class = worker_class or ('sync' if int(threads or 1) == 1 else 'gthread')
+    return {'workers': int(workers), 'threads': int(threads or 1), 'worker_class': worker_class}
+
+
+def sweep(configs, steps, duration):
+    """Start gunicorn with each configuration on this machine's limits and load-test it"""
+    results = []
+    for config in configs:
+        port = free_port()
+        base_url = f'http://127.0.0.1:{port}'
+        env = dict(os.environ, PORT=str(port), WEB_CONCURRENCY=str(config['workers']),
+                   GUNICORN_THREADS=str(config['threads']), GUNICORN_WORKER_CLASS=config['worker_class'])
+        print(f"{config['workers']} workers x {config['threads']} threads ({config['worker_class']})")
+        server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '--config', 'gunicorn_config.py', 'app:app'],
+                                  cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_until_up(base_url)
+            step_results = run_steps(base_url, steps, duration)
+            results.append({'config': config, 'steps': step_results, 'worker_rss': worker_rss(server.pid)})
+        finally:
+            server.terminate()
+            server.wait()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load-test the backend at rising concurrency')
+    parser.add_argument('--url', default='http://127.0.0.1:8000', help='Server to drive (without --sweep)')
+    parser.add_argument('--steps', default=','.join(map(str, DEFAULT_STEPS)), help='Concurrency levels')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per concurrency level')
+    parser.add_argument('--sweep', action='store_true',
+                        help='Start gunicorn once per --configs entry and record a tuning profile')
+    parser.add_argument('--configs', default=','.join(DEFAULT_CONFIGS),
+                        help='workers x threads[:class] entries to sweep, e.g. 2x4,4x1:sync')
+    parser.add_argument('--out', default=PROFILE_PATH, help='Where --sweep writes the profile gunicorn_config reads')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    steps = [int(step) for step in args.steps.split(',')]
+
+    if not args.sweep:
+        print(f"Driving {args.url}")
+        run_steps(args.url, steps, args.duration)
+        return 0
+
+    limits = detect_limits()
+    print(f"Limits ({limits.source}): {limits.cpus:g} CPUs, {limits.memory / 1024 ** 2:.0f} MiB")
+    profile = {'limits': limits.as_dict(), 'measured_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+               'results': sweep([parse_config(config) for config in args.configs.split(',')], steps, args.duration)}
+    with open(args.out + '.tmp', 'w') as f:
+        json.dump(profile, f, indent=2)
+    os.replace(args.out + '.tmp', args.out)
+    chosen = recommend(limits, profile)
+    print(f"Recommended: {chosen['workers']} workers x {chosen['threads']} threads ({chosen['worker_class']}); "
+          f"{chosen['reason']}")
+    print(f"Profile written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+import os
+import time
+import logging
+from collections import Counter as StateCounter
+
+from flask import Response, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+from runs import ACTIVE_STATES, iter_runs
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Under gunicorn each worker writes these to PROMETHEUS_MULTIPROC_DIR (set in
+# gunicorn_config.py) and a scrape of any worker aggregates all of them
+REQUESTS = Counter('http_requests_total', 'HTTP requests served', ['method', 'route', 'status'])
+LATENCY = Histogram('http_request_duration_seconds', 'HTTP request latency', ['method', 'route'],
+                    buckets=LATENCY_BUCKETS)
+IN_FLIGHT = Gauge('http_requests_in_flight', 'HTTP requests being served', ['route'],
+                  multiprocess_mode='livesum')
+
+
+class JobCollector:
+    """Extraction runs by state, read from the run directories at scrape time"""
+
+    def collect(self):
+        states = StateCounter(status.get('state', 'unknown') for _, status in iter_runs())
+        jobs = GaugeMetricFamily('extraction_jobs', 'Extraction runs by state', labels=['state'])
+        for state, count in sorted(states.items()):
+            jobs.add_metric([state], count)
+        yield jobs
+        yield GaugeMetricFamily('extraction_job_queue_depth', 'Extraction runs queued or running',
+                                value=sum(states[state] for state in ACTIVE_STATES))
+
+
+JOB_REGISTRY = CollectorRegistry(auto_describe=True)
+JOB_REGISTRY.register(JobCollector())
+
+
+def route_label():
+    # The URL rule, not the path, so /<path:path> is one series rather than one per file
+    return request.url_rule.rule if request.url_rule else 'unmatched'
+
+
+def before_request():
+    g.metrics_started = time.perf_counter()
+    g.metrics_route = route_label()
+    IN_FLIGHT.labels(g.metrics_route).inc()
+
+
+def after_request(response):
+    g.metrics_status = response.status_code
+    return response
+
+
+def teardown_request(exc):
+    started = g.pop('metrics_started', None)
+    if started is None:
+        return
+    route = g.metrics_route
+    IN_FLIGHT.labels(route).dec()
+    LATENCY.labels(request.method, route).observe(time.perf_counter() - started)
+    REQUESTS.labels(request.method, route, str(g.pop('metrics_status', 500))).inc()
+
+
+def metrics():
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry) + generate_latest(JOB_REGISTRY), mimetype=CONTENT_TYPE_LATEST)
+
+
+def init_metrics(app):
+    """Time every request and expose the aggregated metrics at /metrics"""
+    app.before_request(before_request)
+    app.after_request(after_request)
+    app.teardown_request(teardown_request)
+    app.add_url_rule('/metrics', 'metrics', metrics)
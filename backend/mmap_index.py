@@ -0,0 +1,220 @@
+import os
+import json
+import mmap
+import time
+import struct
+import logging
+import threading
+
+from runs import EXTRACTION_DIR, RECORDS
+
+logger = logging.getLogger(__name__)
+
+# Layout written by outlook_extractor/search_index.py (see the comment there)
+MAGIC = b'OWIDX001'
+HEADER = struct.Struct('<8sQQQQQQQQ')
+ROW = struct.Struct('<qQQIHHH')
+U32 = struct.Struct('<I')
+U64 = struct.Struct('<Q')
+UNDATED = -(1 << 63)
+
+INDEX_ROOT = os.path.join(EXTRACTION_DIR, '.index')
+CURRENT = 'CURRENT'
+INDEX_FILE = 'index.bin'
+
+
+class IndexRow:
+    __slots__ = ('number', 'epoch', 'id', 'sender', 'subject', 'run', 'offset')
+
+    def __init__(self, number, epoch, id, sender, subject, run, offset):
+        self.number = number
+        self.epoch = epoch
+        self.id = id
+        self.sender = sender
+        self.subject = subject
+        self.run = run
+        self.offset = offset
+
+    @property
+    def sort_key(self):
+        return (UNDATED if self.epoch is None else self.epoch, self.id)
+
+
+class EmailIndex:
+    """One generation of the search index, memory-mapped read-only.
+
+    Every worker maps the same file, so the OS page cache holds a single copy
+    however many workers and threads query it, and opening a generation costs
+    a header read rather than a rebuild.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, self.generation, self.count, self.senders_offset, self.text_starts_offset,
+         self.text_offset, self.strings_offset, runs_offset, runs_length) = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not a search index: {path}")
+        self.runs = json.loads(self.map[runs_offset:runs_offset + runs_length])
+
+    def __len__(self):
+        return self.count
+
+    def key(self, number):
+        epoch, _, string_offset, _, id_length, _, _ = ROW.unpack_from(self.map, HEADER.size + number * ROW.size)
+        start = self.strings_offset + string_offset
+        return epoch, self.map[start:start + id_length].decode('utf-8')
+
+    def row(self, number):
+        epoch, offset, string_offset, run, id_length, sender_length, subject_length = ROW.unpack_from(
+            self.map, HEADER.size + number * ROW.size)
+        start = self.strings_offset + string_offset
+        raw = self.map[start:start + id_length + sender_length + subject_length]
+        return IndexRow(number, None if epoch == UNDATED else epoch, raw[:id_length].decode('utf-8'),
+                        raw[id_length:id_length + sender_length].decode('utf-8'),
+                        raw[id_length + sender_length:].decode('utf-8'), self.runs[run], offset)
+
+    def lower_bound(self, epoch, message_id=''):
+        """First row whose (epoch, id) is not below the given key"""
+        key = (UNDATED if epoch is None else epoch, message_id)
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def upper_bound(self, epoch, message_id):
+        """First row whose (epoch, id) is above the given key"""
+        key = (UNDATED if epoch is None else epoch, message_id)
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.key(middle) <= key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def sender_row(self, position):
+        return U32.unpack_from(self.map, self.senders_offset + position * U32.size)[0]
+
+    def sender_range(self, sender):
+        """(first, end) positions in the sender table for an exact, case-insensitive sender"""
+        sender = sender.lower()
+
+        def bound(strict):
+            low, high = 0, self.count
+            while low < high:
+                middle = (low + high) // 2
+                value = self.row(self.sender_row(middle)).sender
+                if value < sender or (strict and value == sender):
+                    low = middle + 1
+                else:
+                    high = middle
+            return low
+
+        return bound(False), bound(True)
+
+    def text_row(self, position):
+        """Row number whose text line contains the byte at position"""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if U64.unpack_from(self.map, self.text_starts_offset + middle * U64.size)[0] <= position:
+                low = middle + 1
+            else:
+                high = middle
+        return low - 1
+
+    def search(self, term, start_row=0):
+        """Row numbers from start_row on whose sender or subject contains term, in (epoch, id) order.
+
+        The scan is mmap.find over the packed text section, so it runs in C
+        against the shared pages instead of decoding rows in Python.
+        """
+        needle = ' '.join(term.split()).lower().encode('utf-8')
+        if not needle or start_row >= self.count:
+            return
+        end = self.strings_offset
+        position = self.text_offset + (
+            U64.unpack_from(self.map, self.text_starts_offset + start_row * U64.size)[0] if start_row else 0)
+        while True:
+            hit = self.map.find(needle, position, end)
+            if hit < 0:
+                return
+            number = self.text_row(hit - self.text_offset)
+            yield number
+            if number + 1 >= self.count:
+                return
+            position = self.text_offset + U64.unpack_from(
+                self.map, self.text_starts_offset + (number + 1) * U64.size)[0]
+
+    def search_reverse(self, term, end_row=None):
+        """Like search, but from the row before end_row backwards, using mmap.rfind"""
+        needle = ' '.join(term.split()).lower().encode('utf-8')
+        end_row = self.count if end_row is None else min(end_row, self.count)
+        if not needle or end_row <= 0:
+            return
+        end = self.strings_offset if end_row == self.count else self.text_offset + U64.unpack_from(
+            self.map, self.text_starts_offset + end_row * U64.size)[0]
+        while True:
+            hit = self.map.rfind(needle, self.text_offset, end)
+            if hit < 0:
+                return
+            number = self.text_row(hit - self.text_offset)
+            yield number
+            end = self.text_offset + U64.unpack_from(self.map, self.text_starts_offset + number * U64.size)[0]
+
+    def record(self, row):
+        """The full record of a row, re-read from its run's log at the indexed offset"""
+        with open(os.path.join(EXTRACTION_DIR, row.run, RECORDS), 'rb') as f:
+            f.seek(row.offset)
+            return json.loads(f.readline())
+
+
+class SharedIndex:
+    """The current index generation for this worker, swapped when a newer one is published.
+
+    CURRENT is re-read at most every ``check_interval`` seconds. A swap only
+    replaces the reference; requests already holding the old generation keep
+    using it, and its mapping is released when the last of them is done.
+    """
+
+    def __init__(self, root=INDEX_ROOT, check_interval=2.0):
+        self.root = root
+        self.check_interval = check_interval
+        self.index = None
+        self.checked = 0.0
+        self.lock = threading.Lock()
+
+    def published_generation(self):
+        try:
+            with open(os.path.join(self.root, CURRENT), 'r') as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            return None
+
+    def get(self):
+        """The latest published EmailIndex, or None if nothing has been indexed yet"""
+        now = time.monotonic()
+        if now - self.checked < self.check_interval:
+            return self.index
+        with self.lock:
+            if now - self.checked < self.check_interval:
+                return self.index
+            self.checked = now
+            generation = self.published_generation()
+            if generation is not None and (self.index is None or self.index.generation != generation):
+                try:
+                    self.index = EmailIndex(os.path.join(self.root, f'gen-{generation}', INDEX_FILE))
+                    logger.info(f"Opened search index generation {generation} ({len(self.index)} messages)")
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Could not open search index generation {generation}: {e}")
+            return self.index
+
+
+shared_index = SharedIndex()
@@ -0,0 +1,229 @@
+import json
+import base64
+import logging
+import binascii
+import datetime
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+
+from mmap_index import shared_index
+from singleflight import CoalescingCache
+
+logger = logging.getLogger(__name__)
+
+queries = Blueprint('queries', __name__)
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+NDJSON = 'application/x-ndjson'
+# Answered from the index alone; any other field makes each row re-read its record
+INDEX_FIELDS = ('id', 'timestamp', 'sender', 'subject', 'job')
+DEFAULT_FIELDS = ('id', 'timestamp', 'sender', 'subject')
+
+# Pages keyed by index generation, so a newly published index never serves stale pages
+page_cache = CoalescingCache(maxsize=512, ttl=30.0)
+
+
+class QueryError(ValueError):
+    pass
+
+
+def encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        epoch, message_id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError, TypeError):
+        raise QueryError("Invalid cursor")
+    if not isinstance(epoch, int) or not isinstance(message_id, str):
+        raise QueryError("Invalid cursor")
+    return epoch, message_id
+
+
+def parse_time(value, name):
+    """Epoch seconds from epoch digits or an ISO 8601 date/time (UTC when no offset is given)"""
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        parsed = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        raise QueryError(f"{name} must be epoch seconds or an ISO 8601 date")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return int(parsed.timestamp())
+
+
+def parse_query(args, bulk):
+    fields = tuple(field for field in args.get('fields', ','.join(DEFAULT_FIELDS)).split(',') if field)
+    order = args.get('order', 'asc')
+    if order not in ('asc', 'desc'):
+        raise QueryError("order must be asc or desc")
+    try:
+        limit = int(args['limit']) if 'limit' in args else None
+    except ValueError:
+        raise QueryError("limit must be an integer")
+    if limit is None:
+        limit = None if bulk else DEFAULT_LIMIT
+    elif limit < 1 or (not bulk and limit > MAX_LIMIT):
+        raise QueryError(f"limit must be between 1 and {MAX_LIMIT}")
+    return {
+        'q': ' '.join(args.get('q', '').split()).lower(),
+        'sender': args.get('sender', '').strip().lower(),
+        'since': parse_time(args.get('since'), 'since'),
+        'until': parse_time(args.get('until'), 'until'),
+        'after': decode_cursor(args['cursor']) if args.get('cursor') else None,
+        'order': order,
+        'limit': limit,
+        'fields': fields or DEFAULT_FIELDS,
+    }
+
+
+def bound(index, low, high, row_at, key, strict):
+    """First position in [low, high) whose row key is above key (strict) or not below it"""
+    while low < high:
+        middle = (low + high) // 2
+        current = index.key(row_at(middle))
+        if current < key or (strict and current == key):
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+def matching_rows(index, query):
+    """Row numbers matching query in its order, starting just past the cursor.
+
+    Every filter is a bisection of a sorted table followed by a forward or
+    backward walk, so the cost of a page does not depend on how deep it is.
+    """
+    if query['sender']:
+        low, high = index.sender_range(query['sender'])
+        row_at = index.sender_row
+    else:
+        low, high = 0, len(index)
+        row_at = None
+    position = row_at or (lambda number: number)
+    since, until, after = query['since'], query['until'], query['after']
+
+    if query['order'] == 'asc':
+        start = low
+        if since is not None:
+            start = bound(index, start, high, position, (since, ''), False)
+        if after is not None:
+            start = max(start, bound(index, low, high, position, after, True))
+        end = high if until is None else bound(index, start, high, position, (until, ''), False)
+        if query['q'] and row_at is None:
+            for number in index.search(query['q'], start):
+                if number >= end:
+                    return
+                yield number
+            return
+        steps = range(start, end)
+    else:
+        end = high
+        if until is not None:
+            end = bound(index, low, end, position, (until, ''), False)
+        if after is not None:
+            end = min(end, bound(index, low, high, position, after, False))
+        start = low if since is None else bound(index, low, end, position, (since, ''), False)
+        if query['q'] and row_at is None:
+            for number in index.search_reverse(query['q'], end):
+                if number < start:
+                    return
+                yield number
+            return
+        steps = range(end - 1, start - 1, -1)
+
+    for step in steps:
+        number = position(step)
+        if query['q']:
+            row = index.row(number)
+            if query['q'] not in ' '.join(f'{row.sender} {row.subject}'.split()).lower():
+                continue
+        yield number
+
+
+def project(index, number, fields):
+    row = index.row(number)
+    values = {
+        'id': row.id,
+        'timestamp': None if row.epoch is None else
+        datetime.datetime.fromtimestamp(row.epoch, datetime.timezone.utc).isoformat(),
+        'sender': row.sender,
+        'subject': row.subject,
+        'job': row.run,
+    }
+    if any(field not in INDEX_FIELDS for field in fields):
+        record = index.record(row)
+        return {field: values[field] if field in values else record.get(field) for field in fields}, row
+    return {field: values[field] for field in fields}, row
+
+
+def read_page(index, query):
+    emails = []
+    last = None
+    rows = matching_rows(index, query)
+    for number in rows:
+        email, last = project(index, number, query['fields'])
+        emails.append(email)
+        if len(emails) == query['limit']:
+            # Only hand out a cursor when there is something after it
+            if next(rows, None) is None:
+                last = None
+            break
+    else:
+        last = None
+    return {
+        'emails': emails,
+        'next_cursor': encode_cursor(last.sort_key) if last is not None else None,
+        'generation': index.generation,
+    }
+
+
+def stream_rows(index, query):
+    """NDJSON lines for every match; the response holds this generation for its whole length"""
+    count = 0
+    for number in matching_rows(index, query):
+        email, row = project(index, number, query['fields'])
+        yield json.dumps(dict(email, cursor=encode_cursor(row.sort_key))) + '\n'
+        count += 1
+        if count == query['limit']:
+            break
+    logger.info(f"Streamed {count} emails from index generation {index.generation}")
+
+
+@queries.route('/api/emails')
+@queries.route('/api/emails/search', endpoint='search_emails')
+def list_emails():
+    """Page through indexed emails by (date, id) keyset; NDJSON when asked for bulk pulls.
+
+    Filters: q (sender/subject substring), sender (exact), since/until.
+    ``cursor`` continues after the last email of the previous page, and
+    ``fields`` picks the keys returned for each email.
+    """
+    bulk = request.args.get('format') == 'ndjson' or \
+        request.accept_mimetypes.best_match(['application/json', NDJSON]) == NDJSON
+    try:
+        query = parse_query(request.args, bulk)
+    except QueryError as e:
+        return jsonify({"error": str(e)}), 400
+    if request.endpoint == 'queries.search_emails' and not query['q']:
+        return jsonify({"error": "q is required"}), 400
+    index = shared_index.get()
+    if index is None:
+        return jsonify({"error": "No search index has been built yet"}), 503
+
+    if bulk:
+        return Response(stream_with_context(stream_rows(index, query)), content_type=NDJSON,
+                        headers={'X-Index-Generation': str(index.generation)})
+
+    key = (index.generation, json.dumps(query, sort_keys=True))
+    page, source = page_cache.get_or_compute(key, lambda: read_page(index, query))
+    return jsonify(dict(page, source=source))
+
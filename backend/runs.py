@@ -0,0 +1,42 @@
+import os
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Run directories written by the extractor (python -m outlook_extractor)
+EXTRACTION_DIR = os.environ.get('EXTRACTION_DIR', '/tmp/outlook_extraction')
+RECORDS = 'records.jsonl'
+STATUS = 'status.json'
+
+# awaiting_2fa: the extractor is parked on a login code submitted through /api/jobs/<id>/2fa
+ACTIVE_STATES = ('queued', 'running', 'awaiting_2fa')
+
+
+def run_path(run_id, *parts):
+    """Path inside a run directory; rejects ids that would escape EXTRACTION_DIR"""
+    if not run_id or run_id != os.path.basename(run_id) or run_id.startswith('.'):
+        raise ValueError(f"Invalid run id: {run_id!r}")
+    return os.path.join(EXTRACTION_DIR, run_id, *parts)
+
+
+def read_status(run_id):
+    """A run's status, or None if it has none yet; raises ValueError for an invalid run id"""
+    path = run_path(run_id, STATUS)
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def iter_runs():
+    """Yield (run id, status) for every run directory that has a status file"""
+    try:
+        names = os.listdir(EXTRACTION_DIR)
+    except OSError:
+        return
+    for name in sorted(names):
+        status = read_status(name) if not name.startswith('.') else None
+        if status is not None:
+            yield name, status
@@ -0,0 +1,102 @@
+import time
+import threading
+from collections import OrderedDict
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs a function once per key at a time; callers arriving meanwhile wait for and share its result"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        """Return (result, shared) where shared is True if another caller did the work"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire ``ttl`` seconds after being stored"""
+
+    def __init__(self, maxsize=256, ttl=60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        """Return (hit, value)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class CoalescingCache:
+    """A TTL/LRU cache in front of a single-flight group: duplicate demand computes a value once"""
+
+    def __init__(self, maxsize=256, ttl=60.0):
+        self.cache = TTLCache(maxsize, ttl)
+        self.flight = SingleFlight()
+
+    def get_or_compute(self, key, fn):
+        """Return (value, source) where source is 'cache', 'coalesced' or 'computed'"""
+        hit, value = self.cache.get(key)
+        if hit:
+            return value, 'cache'
+
+        def compute():
+            result = fn()
+            self.cache.set(key, result)
+            return result
+
+        value, shared = self.flight.do(key, compute)
+        return value, 'coalesced' if shared else 'computed'
+
+    def clear(self):
+        self.cache.clear()
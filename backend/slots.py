@@ -0,0 +1,24 @@
+import os
+import threading
+
+# Requests that hold a server thread for as long as the client stays connected (event
+# streams, file downloads) share this per-worker budget. gunicorn_config.py sets it to the
+# worker's threads minus tuning.RESERVED_THREADS, so the API and health checks always have
+# a thread; the default is for the dev server, which starts a thread per request.
+MAX_LONG_REQUESTS = int(os.environ.get('MAX_LONG_REQUESTS', 64))
+
+long_requests = threading.BoundedSemaphore(MAX_LONG_REQUESTS) if MAX_LONG_REQUESTS > 0 else threading.Semaphore(0)
+
+
+def releaser(slots=long_requests):
+    """A callable that gives back one taken slot the first time it is called, and does nothing after"""
+    lock = threading.Lock()
+    held = [True]
+
+    def release():
+        with lock:
+            if not held[0]:
+                return
+            held[0] = False
+        slots.release()
+    return release
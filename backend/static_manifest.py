@@ -0,0 +1,99 @@
+import os
+import re
+import hashlib
+import logging
+import mimetypes
+
+from flask import Response
+from werkzeug.wsgi import wrap_file
+
+logger = logging.getLogger(__name__)
+
+# CRA puts a content hash in every bundle name (main.8f3a2b1c.js, logo.6ce24c58...svg)
+HASHED_NAME = re.compile(r'\.[0-9a-f]{8,}\.')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+# Precompressed siblings written by frontend/scripts/compress.js, in order of preference
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+class StaticFile:
+    """One file of the build: its headers, and its body when small enough to keep in memory"""
+
+    __slots__ = ('file_path', 'size', 'body', 'etag')
+
+    def __init__(self, file_path, max_memory_bytes):
+        self.file_path = file_path
+        self.size = os.path.getsize(file_path)
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        self.etag = hashlib.blake2b(data, digest_size=12).hexdigest()
+        self.body = data if self.size <= max_memory_bytes else None
+
+
+class StaticAsset:
+    __slots__ = ('path', 'content_type', 'last_modified', 'immutable', 'identity', 'variants')
+
+    def __init__(self, path, file_path, max_memory_bytes):
+        self.path = path
+        self.content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        self.last_modified = int(os.path.getmtime(file_path))
+        self.immutable = bool(HASHED_NAME.search(os.path.basename(path)))
+        self.identity = StaticFile(file_path, max_memory_bytes)
+        self.variants = {}
+        for encoding, suffix in ENCODINGS:
+            if os.path.isfile(file_path + suffix):
+                self.variants[encoding] = StaticFile(file_path + suffix, max_memory_bytes)
+
+
+class StaticManifest:
+    """The frontend build scanned once into memory.
+
+    Every file gets its size, ETag, content type and any precompressed
+    .br/.gz siblings at startup, so a request is answered from the manifest
+    without a stat call and without compressing anything in Python. Files up
+    to ``max_memory_bytes`` (index.html and the bundles) are held in memory;
+    larger ones are streamed through the server's file wrapper.
+    """
+
+    def __init__(self, root, max_memory_bytes=4 * 1024 * 1024):
+        self.root = root
+        self.max_memory_bytes = max_memory_bytes
+        self.assets = {}
+        self.scan()
+
+    def scan(self):
+        assets = {}
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                file_path = os.path.join(directory, name)
+                base, suffix = os.path.splitext(file_path)
+                if suffix in ('.br', '.gz') and os.path.isfile(base):
+                    continue
+                path = os.path.relpath(file_path, self.root).replace(os.sep, '/')
+                assets[path] = StaticAsset(path, file_path, self.max_memory_bytes)
+        self.assets = assets
+        logger.info(f"Static manifest: {len(assets)} files from {self.root}")
+
+    def get(self, path):
+        return self.assets.get(path)
+
+    def response(self, asset, request):
+        """Serve an asset in the best encoding the client accepts, honouring If-None-Match/If-Modified-Since"""
+        encoding = next((encoding for encoding, _ in ENCODINGS
+                         if encoding in asset.variants and request.accept_encodings.quality(encoding)), None)
+        static_file = asset.variants[encoding] if encoding else asset.identity
+
+        if static_file.body is not None:
+            response = Response(static_file.body, mimetype=asset.content_type)
+        else:
+            response = Response(wrap_file(request.environ, open(static_file.file_path, 'rb')),
+                                mimetype=asset.content_type, direct_passthrough=True)
+            response.content_length = static_file.size
+        if encoding:
+            response.content_encoding = encoding
+        if asset.variants:
+            response.vary.add('Accept-Encoding')
+        response.set_etag(static_file.etag)
+        response.last_modified = asset.last_modified
+        response.headers['Cache-Control'] = IMMUTABLE if asset.immutable else 'no-cache'
+        return response.make_conditional(request)
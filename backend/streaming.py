@@ -0,0 +1,201 @@
+import os
+import json
+import time
+import logging
+import threading
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+
+from runs import RECORDS, read_status, run_path
+from slots import long_requests
+
+logger = logging.getLogger(__name__)
+
+streaming = Blueprint('streaming', __name__)
+
+POLL_INTERVAL = 0.5
+KEEPALIVE_INTERVAL = 15.0
+# Most a client's stream reads from the log before yielding to the server,
+# which blocks on the socket until the client has taken the previous chunk
+MAX_CHUNK_LINES = 200
+MAX_CHUNK_BYTES = 1024 * 1024
+FINAL_STATES = ('completed', 'failed')
+
+
+def start_offset(path, last_event_id):
+    """Byte offset to resume from: an event id is the offset just past its record"""
+    try:
+        offset = int(last_event_id or 0)
+    except ValueError:
+        return 0
+    if offset <= 0:
+        return 0
+    try:
+        with open(path, 'rb') as f:
+            f.seek(offset - 1)
+            if f.read(1) == b'\n':
+                return offset
+    except OSError:
+        pass
+    return 0
+
+
+def sse(event, data, event_id=None):
+    lines = [f'event: {event}']
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'data: {data}')
+    return '\n'.join(lines) + '\n\n'
+
+
+def project(line, fields):
+    record = json.loads(line)
+    return json.dumps({field: record.get(field) for field in fields}, ensure_ascii=False)
+
+
+def read_chunk(f, offset, fields):
+    """Read complete records from offset, up to the chunk limits; a torn last line waits for the next poll"""
+    events = []
+    size = 0
+    f.seek(offset)
+    while len(events) < MAX_CHUNK_LINES and size < MAX_CHUNK_BYTES:
+        line = f.readline()
+        if not line.endswith(b'\n'):
+            break
+        offset += len(line)
+        size += len(line)
+        data = line[:-1].decode('utf-8')
+        events.append(sse('record', project(data, fields) if fields else data, offset))
+    return ''.join(events), offset
+
+
+def progress(status):
+    return {key: status.get(key) for key in ('state', 'extracted', 'recycles', 'updated_at', 'error', 'challenge')}
+
+
+class JobTailer:
+    """Watches one run's record log and status on behalf of every client streaming it.
+
+    A single thread per job polls the log's size and status.json, and wakes
+    the clients only when either changed; each client then reads its own
+    chunk from its own offset. A job with hundreds of viewers costs one poll
+    per interval instead of one per viewer. The thread exits once the last
+    client has left.
+    """
+
+    def __init__(self, run_id):
+        self.run_id = run_id
+        self.path = run_path(run_id, RECORDS)
+        self.changed = threading.Condition()
+        self.version = 0
+        self.size = -1
+        self.status = read_status(run_id) or {}
+        self.clients = 0
+
+    def poll(self):
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = -1
+        status = read_status(self.run_id) or self.status
+        with self.changed:
+            if size != self.size or progress(status) != progress(self.status):
+                self.size, self.status = size, status
+                self.version += 1
+                self.changed.notify_all()
+
+    def run(self):
+        while True:
+            with tailers_lock:
+                if not self.clients:
+                    tailers.pop(self.run_id, None)
+                    return
+            self.poll()
+            time.sleep(POLL_INTERVAL)
+
+    def wait(self, version, timeout):
+        """Block until the log or status changes past version, or timeout passes; returns the current version"""
+        with self.changed:
+            self.changed.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+
+tailers = {}
+tailers_lock = threading.Lock()
+
+
+def subscribe(run_id):
+    with tailers_lock:
+        tailer = tailers.get(run_id)
+        if tailer is None:
+            tailer = tailers[run_id] = JobTailer(run_id)
+            threading.Thread(target=tailer.run, name=f'tail-{run_id}', daemon=True).start()
+        tailer.clients += 1
+    return tailer
+
+
+def unsubscribe(tailer):
+    with tailers_lock:
+        tailer.clients -= 1
+
+
+def event_stream(run_id, offset, fields):
+    tailer = subscribe(run_id)
+    last_progress = None
+    last_sent = time.monotonic()
+    version = None
+    f = None
+    try:
+        yield f'retry: {int(POLL_INTERVAL * 4000)}\n\n'
+        while True:
+            if f is None and os.path.exists(tailer.path):
+                f = open(tailer.path, 'rb')
+            chunk = ''
+            if f is not None:
+                chunk, offset = read_chunk(f, offset, fields)
+            status = tailer.status
+            current = progress(status)
+            if current != last_progress:
+                chunk += sse('progress', json.dumps(current))
+                last_progress = current
+            if chunk:
+                yield chunk
+                last_sent = time.monotonic()
+                continue
+            if status.get('state') in FINAL_STATES:
+                yield sse('end', json.dumps(current), offset)
+                return
+            if time.monotonic() - last_sent >= KEEPALIVE_INTERVAL:
+                yield ': keepalive\n\n'
+                last_sent = time.monotonic()
+            version = tailer.wait(version, KEEPALIVE_INTERVAL - (time.monotonic() - last_sent))
+    finally:
+        unsubscribe(tailer)
+        if f is not None:
+            f.close()
+
+
+@streaming.route('/api/jobs/<run_id>/events')
+def job_events(run_id):
+    """Stream a run's records and progress as Server-Sent Events, resuming after Last-Event-ID"""
+    try:
+        if read_status(run_id) is None:
+            return jsonify({"error": "Unknown job"}), 404
+    except ValueError:
+        return jsonify({"error": "Invalid job id"}), 400
+    # Each stream holds a server thread while it runs, so streams only get the worker's long-request budget
+    if not long_requests.acquire(blocking=False):
+        return jsonify({"error": "Too many open streams"}), 503, {'Retry-After': '5'}
+
+    fields = [field for field in request.args.get('fields', '').split(',') if field]
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    offset = start_offset(run_path(run_id, RECORDS), last_event_id)
+    logger.info(f"Streaming job {run_id} from offset {offset}")
+    response = Response(
+        stream_with_context(event_stream(run_id, offset, fields)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+    # Runs when the server closes the response, even if the client left before the first event
+    response.call_on_close(long_requests.release)
+    return response
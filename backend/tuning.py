@@ -0,0 +1,197 @@
+import os
+import sys
+import json
+import math
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Written by loadtest.py --sweep; measured results win over the heuristic when they match this machine
+PROFILE_PATH = os.environ.get('GUNICORN_PROFILE',
+                              os.path.join(os.path.dirname(os.path.abspath(__file__)), 'loadtest_profile.json'))
+# Resident memory of one worker before measurements say otherwise (Flask app plus a mapped index)
+WORKER_MEMORY = 160 * 1024 * 1024
+# Share of the memory limit the workers may use; the rest is for the master, page cache and spikes
+MEMORY_SHARE = 0.7
+# Requests in flight the heuristic provisions threads for, across all workers
+TARGET_CONCURRENCY = 32
+MAX_THREADS = 16
+# Threads per worker kept free of event streams and downloads, so API calls and health checks still get one;
+# the rest are the worker's long-request budget (settings()['max_long_requests'], enforced by backend/slots.py)
+RESERVED_THREADS = 2
+# Event streams and downloads a server must be able to hold open at once, summed over its workers' budgets
+MIN_LONG_REQUESTS = 8
+# Worker classes that park a waiting stream on a greenlet instead of a thread; their budget is not tied to threads
+ASYNC_WORKER_CLASSES = ('gevent', 'eventlet')
+ASYNC_LONG_REQUESTS = 1000
+# A configuration only counts at concurrency levels where it stayed under these
+P99_BUDGET = 1.0
+MAX_ERROR_RATE = 0.01
+# Measured limits may differ this much from the current ones and still apply
+LIMITS_TOLERANCE = 0.1
+
+
+class Limits:
+    __slots__ = ('cpus', 'memory', 'source')
+
+    def __init__(self, cpus, memory, source):
+        self.cpus = cpus
+        self.memory = memory
+        self.source = source
+
+    def matches(self, other):
+        if not other:
+            return False
+        return all(abs(mine - theirs) <= LIMITS_TOLERANCE * max(mine, theirs)
+                   for mine, theirs in ((self.cpus, other['cpus']), (self.memory, other['memory'])))
+
+    def as_dict(self):
+        return {'cpus': self.cpus, 'memory': self.memory, 'source': self.source}
+
+
+def read_first(*paths):
+    for path in paths:
+        try:
+            with open(path, 'r') as f:
+                return f.read().strip()
+        except OSError:
+            continue
+    return None
+
+
+def cgroup_cpus():
+    """CPUs granted by the cgroup quota (Fargate/docker --cpus), or None when unlimited"""
+    quota = read_first('/sys/fs/cgroup/cpu.max')
+    if quota:
+        limit, period = quota.split()
+        return None if limit == 'max' else int(limit) / int(period)
+    limit = read_first('/sys/fs/cgroup/cpu/cpu.cfs_quota_us', '/sys/fs/cgroup/cpu,cpuacct/cpu.cfs_quota_us')
+    period = read_first('/sys/fs/cgroup/cpu/cpu.cfs_period_us', '/sys/fs/cgroup/cpu,cpuacct/cpu.cfs_period_us')
+    if limit and period and int(limit) > 0:
+        return int(limit) / int(period)
+    return None
+
+
+def cgroup_memory():
+    """Memory limit of the cgroup in bytes, or None when unlimited"""
+    limit = read_first('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes')
+    if not limit or limit == 'max':
+        return None
+    limit = int(limit)
+    # cgroup v1 reports "unlimited" as a page-rounded huge number
+    return None if limit >= 1 << 60 else limit
+
+
+def host_memory():
+    try:
+        with open('/proc/meminfo', 'r') as f:
+            for line in f:
+                if line.startswith('MemTotal:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+
+
+def detect_limits():
+    cpus, memory = cgroup_cpus(), cgroup_memory()
+    source = 'cgroup' if cpus is not None or memory is not None else 'host'
+    if cpus is None:
+        cpus = float(len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1)
+    if memory is None:
+        memory = host_memory()
+    return Limits(cpus, memory, source)
+
+
+def heuristic(limits, worker_memory=WORKER_MEMORY):
+    """Workers from CPU (2 per CPU plus one) capped by what fits in memory; threads cover the rest of the target"""
+    cpu_workers = max(1, round(2 * limits.cpus) + 1)
+    memory_workers = max(1, int(limits.memory * MEMORY_SHARE // worker_memory))
+    workers = min(cpu_workers, memory_workers)
+    threads = min(MAX_THREADS, max(RESERVED_THREADS + 2, math.ceil(TARGET_CONCURRENCY / workers)))
+    return {'workers': workers, 'threads': threads, 'worker_class': 'gthread',
+            'reason': f'heuristic: {cpu_workers} workers by CPU, {memory_workers} by memory'}
+
+
+def sustained(result):
+    """Best throughput a measured configuration held within the latency and error budgets, and at what concurrency"""
+    best = (0.0, 0)
+    for step in result['steps']:
+        if step['p99'] <= P99_BUDGET and step['error_rate'] <= MAX_ERROR_RATE and step['rps'] > best[0]:
+            best = (step['rps'], step['concurrency'])
+    return best
+
+
+def measured(profile, limits):
+    """The best configuration from a sweep on matching limits that also fits in today's memory, or None"""
+    if not limits.matches(profile.get('limits', {})):
+        logger.info("Load-test profile was measured under different limits; ignoring it")
+        return None
+    candidates = []
+    for result in profile.get('results', ()):
+        config = result['config']
+        if config['workers'] * max(0, config['threads'] - RESERVED_THREADS) < MIN_LONG_REQUESTS:
+            continue
+        if config['workers'] * (result.get('worker_rss') or WORKER_MEMORY) > limits.memory * MEMORY_SHARE:
+            continue
+        rps, concurrency = sustained(result)
+        if rps:
+            candidates.append((rps, concurrency, config))
+    if not candidates:
+        return None
+    # Anything within 5% of the best is a tie, and the tie goes to fewer workers: the same throughput for less memory
+    best = max(rps for rps, _, _ in candidates)
+    rps, concurrency, config = min((candidate for candidate in candidates if candidate[0] >= best * 0.95),
+                                   key=lambda candidate: (candidate[2]['workers'], -candidate[0]))
+    return dict(config, reason=f'measured: {rps:.0f} req/s at concurrency {concurrency}')
+
+
+def load_profile(path=PROFILE_PATH):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def recommend(limits=None, profile=None):
+    limits = limits or detect_limits()
+    profile = profile if profile is not None else load_profile()
+    worker_memory = WORKER_MEMORY
+    if profile:
+        chosen = measured(profile, limits)
+        if chosen:
+            return chosen
+        sizes = [result['worker_rss'] for result in profile.get('results', ()) if result.get('worker_rss')]
+        if sizes:
+            worker_memory = max(sizes)
+    return heuristic(limits, worker_memory)
+
+
+def settings():
+    """Gunicorn worker settings: environment overrides first, then the recommendation"""
+    limits = detect_limits()
+    chosen = recommend(limits)
+    workers = int(os.environ.get('WEB_CONCURRENCY', chosen['workers']))
+    threads = int(os.environ.get('GUNICORN_THREADS', chosen['threads']))
+    worker_class = os.environ.get('GUNICORN_WORKER_CLASS', chosen['worker_class'])
+    if threads > 1 and worker_class == 'sync':
+        threads = 1
+    # Per-worker cap on requests that hold a thread for their whole length (see backend/slots.py)
+    if worker_class in ASYNC_WORKER_CLASSES:
+        max_long_requests = ASYNC_LONG_REQUESTS
+    else:
+        max_long_requests = max(0, threads - RESERVED_THREADS)
+    if 'MAX_LONG_REQUESTS' in os.environ:
+        max_long_requests = min(max_long_requests, int(os.environ['MAX_LONG_REQUESTS']))
+    return {'workers': workers, 'threads': threads, 'worker_class': worker_class,
+            'max_long_requests': max_long_requests, 'reason': chosen['reason'], 'limits': limits.as_dict()}
+
+
+def main(argv=None):
+    print(json.dumps(settings(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
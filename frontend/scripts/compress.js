@@ -0,0 +1,29 @@
+// Writes .br and .gz siblings next to every compressible file in build/ so the
+// backend can serve precompressed bytes instead of compressing per request.
+const fs = require("fs");
+const path = require("path");
+const zlib = require("zlib");
+
+const BUILD_DIR = path.join(__dirname, "..", "build");
+const COMPRESSIBLE = /\.(html|js|css|json|svg|txt|map|ico)$/;
+const MIN_SIZE = 1024;
+
+function walk(dir) {
+  return fs.readdirSync(dir, { withFileTypes: true }).flatMap((entry) => {
+    const fullPath = path.join(dir, entry.name);
+    return entry.isDirectory() ? walk(fullPath) : [fullPath];
+  });
+}
+
+for (const file of walk(BUILD_DIR)) {
+  if (!COMPRESSIBLE.test(file)) continue;
+  const data = fs.readFileSync(file);
+  if (data.length < MIN_SIZE) continue;
+
+  const brotli = zlib.brotliCompressSync(data, {
+    params: { [zlib.constants.BROTLI_PARAM_QUALITY]: zlib.constants.BROTLI_MAX_QUALITY },
+  });
+  const gzip = zlib.gzipSync(data, { level: zlib.constants.Z_BEST_COMPRESSION });
+  if (brotli.length < data.length) fs.writeFileSync(file + ".br", brotli);
+  if (gzip.length < data.length) fs.writeFileSync(file + ".gz", gzip);
+}
@@ -1,11 +1,27 @@
 import React, { useEffect, useState } from "react";
 import "./App.css";
 
+interface InitialData {
+  message: string;
+  environment: string;
+  jobs?: { total: number; states: Record<string, number> };
+}
+
+declare global {
+  interface Window {
+    // Inlined into index.html by the backend so the first render needs no API call
+    __INITIAL_DATA__?: InitialData;
+  }
+}
+
 function App() {
-  const [message, setMessage] = useState("");
+  const [message, setMessage] = useState(window.__INITIAL_DATA__?.message ?? "");
 
   useEffect(() => {
-    // Make API call to backend
+    if (window.__INITIAL_DATA__) {
+      return;
+    }
+    // Not served by the backend (e.g. the dev server): ask the API instead
     fetch('/api/hello')
       .then(response => response.json())
       .then(data => {
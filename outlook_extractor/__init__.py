@@ -0,0 +1,45 @@
+"""Outlook on the web email extraction package."""
+
+from .attachments import AttachmentDownloader, AttachmentStore
+from .bounded import BoundedMemoryExtractor
+from .calibration import calibrate
+from .checkpoint import Checkpoint
+from .conversation import ConversationExtractor
+from .dedup import DedupWriter, NearDuplicateIndex
+from .export import export_run
+from .metadata import EmailMetadata, MetadataIndex
+from .mime import SourceFetchExtractor, SourceFetcher, parse_source
+from .profiling import MemoryProfiler
+from .records import RecordWriter, RunDirectory, iter_records
+from .segments import SegmentPipeline, SegmentStore, split_body
+from .session import login_to_outlook, wait_for_load
+from .strategies import StrategySet
+from .twofactor import ChallengeRendezvous
+
+__all__ = [
+    'AttachmentDownloader',
+    'AttachmentStore',
+    'BoundedMemoryExtractor',
+    'ChallengeRendezvous',
+    'Checkpoint',
+    'EmailMetadata',
+    'ConversationExtractor',
+    'DedupWriter',
+    'MemoryProfiler',
+    'MetadataIndex',
+    'NearDuplicateIndex',
+    'RecordWriter',
+    'RunDirectory',
+    'SegmentPipeline',
+    'SegmentStore',
+    'SourceFetchExtractor',
+    'SourceFetcher',
+    'StrategySet',
+    'calibrate',
+    'export_run',
+    'iter_records',
+    'login_to_outlook',
+    'parse_source',
+    'split_body',
+    'wait_for_load',
+]
@@ -0,0 +1,182 @@
+import os
+import sys
+import logging
+import argparse
+from datetime import datetime
+
+from playwright.sync_api import sync_playwright
+
+from .attachments import AttachmentDownloader, AttachmentStore
+from .bounded import BoundedMemoryExtractor, VIEWPORT
+from .calibration import calibrate
+from .conversation import ConversationExtractor
+from .export import FORMATS, export_run
+from .mime import DEFAULT_SOURCE_URL, SourceFetchExtractor
+from .profiling import MemoryProfiler
+from .records import RunDirectory
+from .search_index import build_index
+from .sender_rules import load_rules
+from .strategies import (
+    CAPTURE_STRATEGIES,
+    LIST_SCAN_STRATEGIES,
+    LOGIN_STRATEGIES,
+    NAVIGATION_STRATEGIES,
+    OUTPUT_STRATEGIES,
+    SenderRulesScan,
+    StrategySet,
+)
+from .twofactor import ChallengeRendezvous
+
+DEFAULT_OUTPUT_ROOT = os.environ.get('EXTRACTION_DIR', '/tmp/outlook_extraction')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='outlook_extractor', description='Extract emails from Outlook on the web')
+    parser.add_argument('--output-dir', help='Run directory (default: a new timestamped directory under $EXTRACTION_DIR)')
+    parser.add_argument('--sender', default='Lynn Gadue', help='Only extract rows whose text contains this sender')
+    parser.add_argument('--sender-rules', metavar='CSV',
+                        help='Match rows against many senders/domains (pattern,output per line) instead of --sender; '
+                             'matches are routed to <run>/routes/<output>.jsonl')
+    parser.add_argument('--headless', action='store_true')
+    parser.add_argument('--recycle-every', type=int, default=500,
+                        help='Recycle the page after this many messages (0 disables)')
+    parser.add_argument('--heap-limit-mb', type=int, default=256,
+                        help='Recycle the page when the renderer JS heap exceeds this size (0 disables)')
+    parser.add_argument('--recycle-scope', choices=['page', 'context'], default='page')
+    parser.add_argument('--conversations', action='store_true',
+                        help='Open each conversation once and extract every message in the thread')
+    parser.add_argument('--fetch-mode', choices=['render', 'source'], default='render',
+                        help='render: read the opened message; source: download the raw .eml without opening it')
+    parser.add_argument('--source-url', default=DEFAULT_SOURCE_URL,
+                        help='Message source URL template with an {id} placeholder (source mode)')
+    parser.add_argument('--attachments', action='store_true',
+                        help='Download attachments into a content-addressed store under <run>/attachments')
+    parser.add_argument('--attachment-workers', type=int, default=4)
+    parser.add_argument('--login', choices=sorted(LOGIN_STRATEGIES), default='form')
+    parser.add_argument('--navigation', choices=sorted(NAVIGATION_STRATEGIES), default='direct')
+    parser.add_argument('--list-scan', choices=sorted(set(LIST_SCAN_STRATEGIES) - {'sender-rules'}),
+                        default='sender-text', help='Ignored with --sender-rules')
+    parser.add_argument('--capture', choices=sorted(CAPTURE_STRATEGIES), default='structured')
+    parser.add_argument('--output', action='append', choices=sorted(OUTPUT_STRATEGIES), default=[],
+                        help='Extra output next to records.jsonl; may be repeated')
+    parser.add_argument('--calibrate', action='store_true',
+                        help='Time every navigation/list scan/capture combination first and use the fastest reliable one')
+    parser.add_argument('--calibration-sample', type=int, default=5)
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='Record Python and renderer memory per phase and every --profile-every messages '
+                             'in <run>/memory.jsonl')
+    parser.add_argument('--profile-every', type=int, default=50)
+    parser.add_argument('--profile-top', type=int, default=10, help='Allocation sites reported per phase')
+    parser.add_argument('--two-factor-timeout', type=int, default=300,
+                        help='Seconds to wait for a 2FA code submitted to the run (see README) before failing')
+    parser.add_argument('--interactive-2fa', action='store_true',
+                        help='Type the 2FA code into the visible browser and confirm on the terminal instead')
+    parser.add_argument('--export', help=f"Comma separated export formats to render when done ({', '.join(FORMATS)})")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    email = os.environ.get('OUTLOOK_EMAIL')
+    password = os.environ.get('OUTLOOK_PASSWORD')
+    if not email or not password:
+        print("Set OUTLOOK_EMAIL and OUTLOOK_PASSWORD to run an extraction")
+        return 2
+
+    output_dir = args.output_dir or os.path.join(DEFAULT_OUTPUT_ROOT, datetime.now().strftime("%Y%m%d_%H%M%S"))
+    run_dir = RunDirectory(output_dir)
+    run_dir.update_status(state='running', pid=os.getpid(), account=email,
+                          sender=None if args.sender_rules else args.sender, sender_rules=args.sender_rules,
+                          started_at=datetime.utcnow().isoformat())
+    profiler = None
+    if args.profile_memory:
+        profiler = MemoryProfiler(run_dir.file('memory.jsonl'), args.profile_every, args.profile_top)
+        run_dir.update_status(memory_report=run_dir.file('memory.jsonl'))
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=args.headless, args=['--disable-dev-shm-usage'])
+        context = browser.new_context(viewport=VIEWPORT)
+        extractor = None
+        attachments = None
+        try:
+            page = context.new_page()
+            two_factor = None if args.interactive_2fa else ChallengeRendezvous(run_dir, args.two_factor_timeout)
+            LOGIN_STRATEGIES[args.login]().login(page, email, password, two_factor)
+            page.close()
+            if profiler:
+                profiler.phase('login')
+
+            sender = args.sender
+            list_scan = args.list_scan
+            outputs = args.output
+            if args.sender_rules:
+                sender = None
+                list_scan = SenderRulesScan(load_rules(args.sender_rules))
+                outputs = outputs + ['routes']
+
+            if args.calibrate:
+                best = calibrate(context, sender, sample_size=args.calibration_sample,
+                                 report_path=run_dir.file('calibration.json'),
+                                 list_scan=list_scan if args.sender_rules else None)
+                list_scan = list_scan if args.sender_rules else best['list_scan']
+                strategies = StrategySet(best['navigation'], list_scan, best['capture'], outputs)
+            else:
+                strategies = StrategySet(args.navigation, list_scan, args.capture, outputs)
+            run_dir.update_status(strategies=strategies.describe())
+
+            if args.attachments:
+                store = AttachmentStore(run_dir.file('attachments'))
+                attachments = AttachmentDownloader(store, context.cookies(), max_workers=args.attachment_workers)
+
+            options = dict(
+                attachments=attachments,
+                strategies=strategies,
+                sender=sender,
+                recycle_every=args.recycle_every,
+                heap_limit_mb=args.heap_limit_mb,
+                recycle_scope=args.recycle_scope,
+                profiler=profiler,
+            )
+            if args.fetch_mode == 'source':
+                extractor = SourceFetchExtractor(browser, context, run_dir, url_template=args.source_url, **options)
+            elif args.conversations:
+                extractor = ConversationExtractor(browser, context, run_dir, **options)
+            else:
+                extractor = BoundedMemoryExtractor(browser, context, run_dir, **options)
+            records_path = extractor.run()
+            run_dir.update_status(state='completed', extracted=len(extractor.checkpoint))
+            print(f"\nExtraction completed! Records saved to {records_path}")
+            try:
+                build_index(os.path.dirname(os.path.abspath(run_dir.path)))
+            except Exception as e:
+                logging.warning(f"Could not rebuild the search index: {e}")
+            if args.export:
+                # A failed export leaves the extraction completed; it is reported on its own
+                try:
+                    paths = export_run(run_dir, [fmt.strip() for fmt in args.export.split(',')])
+                    run_dir.update_status(export={'state': 'completed', 'formats': sorted(paths)})
+                except Exception as e:
+                    logging.error(f"Export failed: {e}")
+                    run_dir.update_status(export={'state': 'failed', 'error': str(e)})
+                if profiler:
+                    profiler.phase('export')
+            return 0
+        except Exception as e:
+            logging.error(f"Extraction failed: {e}")
+            run_dir.update_status(state='failed', error=str(e))
+            return 1
+        finally:
+            if attachments:
+                attachments.close()
+            (extractor.context if extractor else context).close()
+            browser.close()
+            if profiler:
+                profiler.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+import os
+import hashlib
+import logging
+import tempfile
+import threading
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+from .records import RecordWriter
+from .session import session_opener
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+# Links in OWA's attachment well above the body, collected by the in-page extraction
+# script; links inside the message body itself are never taken (see inpage.attachmentsOf)
+ATTACHMENT_LINK_SELECTOR = ('[role="listbox"][aria-label*="attachment" i] a[href], '
+                            '[data-testid*="attachment" i] a[href]')
+# Hosts OWA serves attachments from; a link anywhere else is refused rather than fetched with the session
+ATTACHMENT_HOSTS = ('outlook.office365.com', 'outlook.office.com', 'attachments.office.net', 'outlook.live.com')
+
+
+def allowed_attachment_url(url):
+    parts = urllib.parse.urlsplit(url)
+    host = (parts.hostname or '').lower()
+    return parts.scheme == 'https' and any(host == allowed or host.endswith('.' + allowed)
+                                           for allowed in ATTACHMENT_HOSTS)
+
+
+class AttachmentStore:
+    """Content-addressed blob store: each file lives once under its SHA-256.
+
+    ``manifest.jsonl`` links every (message id, attachment name) to its blob,
+    so a file sent a hundred times costs one blob and a hundred manifest lines.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.blob_dir = os.path.join(directory, 'blobs')
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self._manifest = RecordWriter(os.path.join(directory, 'manifest.jsonl'))
+        self._lock = threading.Lock()
+
+    def blob_path(self, digest):
+        return os.path.join(self.blob_dir, digest[:2], digest)
+
+    def put_stream(self, stream, message_id, name, url=None):
+        """Copy a file-like object into the store chunk by chunk and record it in the manifest"""
+        sha256 = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.blob_dir, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                while True:
+                    chunk = stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    sha256.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+            digest = sha256.hexdigest()
+            path = self.blob_path(digest)
+            if os.path.exists(path):
+                os.remove(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        with self._lock:
+            self._manifest.write({
+                'message_id': message_id,
+                'name': name,
+                'sha256': digest,
+                'size': size,
+                'url': url,
+            })
+        return digest
+
+    def close(self):
+        self._manifest.close()
+
+
+class AttachmentDownloader:
+    """Downloads attachment links with bounded concurrency through the browser session's cookies.
+
+    Downloads run on worker threads, where Playwright's sync API cannot be
+    used, so each request (and each redirect hop) carries only the cookies a
+    browser would send to its URL, and links or redirects outside
+    ATTACHMENT_HOSTS are refused outright.
+    """
+
+    def __init__(self, store, cookies=None, max_workers=4, timeout=120):
+        self.store = store
+        self.timeout = timeout
+        self.opener = session_opener(cookies or [], allow_url=allowed_attachment_url)
+        self.pool = ThreadPoolExecutor(max_workers=max_workers)
+        # Caps queued downloads so a mailbox full of attachments applies backpressure to the extractor
+        self.slots = threading.BoundedSemaphore(max_workers * 2)
+        self.downloaded = 0
+        self.failed = 0
+        self.refused = 0
+
+    def _download(self, message_id, attachment):
+        try:
+            with self.opener.open(attachment['url'], timeout=self.timeout) as response:
+                self.store.put_stream(response, message_id, attachment['name'], attachment['url'])
+            self.downloaded += 1
+        except Exception as e:
+            self.failed += 1
+            logger.error(f"Error downloading attachment '{attachment['name']}' of {message_id}: {e}")
+        finally:
+            self.slots.release()
+
+    def submit(self, message_id, attachments):
+        for attachment in attachments:
+            if not allowed_attachment_url(attachment['url']):
+                self.refused += 1
+                logger.warning(f"Refusing attachment link of {message_id} to a non-Outlook host: {attachment['url']}")
+                continue
+            self.slots.acquire()
+            self.pool.submit(self._download, message_id, attachment)
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+        self.store.close()
+        logger.info(f"Attachments: {self.downloaded} downloaded, {self.failed} failed, {self.refused} refused")
@@ -0,0 +1,242 @@
+import time
+import logging
+from datetime import datetime
+
+from .checkpoint import Checkpoint
+from .records import iter_records_with_offsets
+from .strategies import StrategySet
+from .strategies.listscan import LIST_ITEM_SELECTOR, row_id
+
+logger = logging.getLogger(__name__)
+
+LIST_SELECTOR = 'div[role="list"]'
+READING_PANE_SELECTOR = 'div[role="main"]'
+VIEWPORT = {'width': 1280, 'height': 800}
+
+# Scrolls the nearest scrollable ancestor of the message list by one screen
+SCROLL_LIST_JS = """el => {
+    let node = el;
+    while (node && node.scrollHeight <= node.clientHeight) node = node.parentElement;
+    if (!node) return -1;
+    const before = node.scrollTop;
+    node.scrollTop = before + node.clientHeight;
+    return node.scrollTop > before ? node.scrollTop : -1;
+}"""
+
+RESTORE_SCROLL_JS = """(el, top) => {
+    let node = el;
+    while (node && node.scrollHeight <= node.clientHeight) node = node.parentElement;
+    if (node) node.scrollTop = top;
+}"""
+
+JS_HEAP_JS = "() => (performance.memory ? performance.memory.usedJSHeapSize : 0)"
+
+
+class BoundedMemoryExtractor:
+    """Extracts a mailbox with flat Python and renderer memory.
+
+    Rows are addressed through short-lived locators, every record goes to the
+    run's JSONL log as soon as it is extracted, and the page (or the whole
+    browser context) is recycled after ``recycle_every`` messages or when the
+    renderer's JS heap grows past ``heap_limit_mb``. How the list is reached,
+    scanned and read is delegated to ``strategies``. An optional ``profiler``
+    records memory at phase boundaries and every few messages.
+    """
+
+    # Checkpoint a row once extract_row returns; extractors that finish rows later
+    # leave this False and are checkpointed only by write_records
+    checkpoint_rows = True
+
+    def __init__(self, browser, context, run_dir, sender=None, recycle_every=500,
+                 heap_limit_mb=256, heap_check_every=25, recycle_scope='page', attachments=None,
+                 strategies=None, profiler=None):
+        if recycle_scope not in ('page', 'context'):
+            raise ValueError(f"Unknown recycle scope: {recycle_scope}")
+        self.browser = browser
+        self.context = context
+        self.page = None
+        self.run_dir = run_dir
+        self.sender = sender
+        self.recycle_every = recycle_every
+        self.heap_limit_bytes = heap_limit_mb * 1024 * 1024
+        self.heap_check_every = heap_check_every
+        self.recycle_scope = recycle_scope
+        self.attachments = attachments
+        self.strategies = strategies or StrategySet()
+        self.profiler = profiler
+        self.checkpoint = Checkpoint(run_dir.path, records_path=run_dir.records_path)
+        self.since_recycle = 0
+        self.last_heap_check = 0
+        self.recycle_count = 0
+
+    def open_page(self, scroll_top=0):
+        self.page = self.context.new_page()
+        self.strategies.navigation.open(self.page, self.sender)
+        if scroll_top:
+            self.page.locator(LIST_SELECTOR).first.evaluate(RESTORE_SCROLL_JS, scroll_top)
+            self.page.wait_for_timeout(500)
+
+    def js_heap_bytes(self):
+        try:
+            return self.page.evaluate(JS_HEAP_JS)
+        except Exception as e:
+            logger.debug(f"Could not read JS heap size: {e}")
+            return 0
+
+    def should_recycle(self):
+        if self.recycle_every and self.since_recycle >= self.recycle_every:
+            return True
+        # Counted from the last check, since batched writes can move since_recycle by more than one
+        if self.heap_limit_bytes and self.since_recycle - self.last_heap_check >= self.heap_check_every:
+            self.last_heap_check = self.since_recycle
+            return self.js_heap_bytes() > self.heap_limit_bytes
+        return False
+
+    def recycle(self):
+        """Drop the current page (and optionally context) and reopen the list where it was"""
+        scroll_top = self.page.locator(LIST_SELECTOR).first.evaluate(
+            "el => { let n = el; while (n && n.scrollHeight <= n.clientHeight) n = n.parentElement; "
+            "return n ? n.scrollTop : 0; }"
+        )
+        logger.info(f"Recycling {self.recycle_scope} after {self.since_recycle} messages")
+        if self.profiler:
+            self.profiler.phase('before-recycle', extracted=len(self.checkpoint))
+        self.page.close()
+        if self.recycle_scope == 'context':
+            storage_state = self.context.storage_state()
+            self.context.close()
+            self.context = self.browser.new_context(viewport=VIEWPORT, storage_state=storage_state)
+        self.since_recycle = 0
+        self.last_heap_check = 0
+        self.recycle_count += 1
+        self.open_page(scroll_top)
+        self.run_dir.update_status(extracted=len(self.checkpoint), recycles=self.recycle_count)
+        if self.profiler:
+            self.profiler.phase('after-recycle', extracted=len(self.checkpoint))
+
+    def open_row(self, info):
+        self.page.locator(LIST_ITEM_SELECTOR).nth(info['index']).click()
+
+    def extract_row(self, info):
+        """Open a list row and return the records it yields"""
+        self.open_row(info)
+        return self.extract_open_row(info)
+
+    def extract_open_row(self, info):
+        message = self.strategies.capture.capture(self.page, attachments=bool(self.attachments))
+        record = {
+            'id': row_id(info),
+            'sender': message['from'] or info['sender'],
+            'to': message['to'],
+            'cc': message['cc'],
+            'subject': message['subject'] or info['subject'],
+            'date': info['date'] if info['date'] != 'Date unknown' else message['date'],
+            'body': message['text'],
+            'body_html': message['html'],
+            'attachments': message['attachments'],
+            'extracted_at': datetime.utcnow().isoformat(),
+        }
+        if 'outputs' in info:
+            record['outputs'] = info['outputs']
+        return [record]
+
+    def write_records(self, records):
+        for record in records:
+            if record['id'] in self.checkpoint:
+                continue
+            for output in self.strategies.outputs:
+                output.write(record)
+            if self.attachments and record.get('attachments'):
+                self.attachments.submit(record['id'], record['attachments'])
+            self.checkpoint.add(record['id'])
+            self.since_recycle += 1
+            logger.info(f"Extracted {len(self.checkpoint)}: {record['subject']} ({len(record['body'])} chars)")
+            if self.profiler:
+                self.profiler.message(self.page, len(self.checkpoint))
+
+    def finish(self):
+        """Return records still held by the extractor once the list is exhausted"""
+        return []
+
+    def row_key(self, info):
+        """Checkpoint key of a list row: the message id for extractors that read one message per row"""
+        return row_id(info)
+
+    def is_done(self, key):
+        """Whether a row needs no more work; asynchronous extractors also count rows still in flight"""
+        return key in self.checkpoint
+
+    def mark_done(self, key):
+        """Record a row whose records have been written"""
+        if self.checkpoint_rows:
+            self.checkpoint.add(key)
+
+    def process_visible_rows(self):
+        """Extract every unseen matching row on screen; returns False if a recycle interrupted the pass"""
+        rows = self.strategies.list_scan.rows(self.page, self.sender)
+        for info in rows:
+            key = self.row_key(info)
+            if self.is_done(key):
+                continue
+            try:
+                records = self.extract_row(info)
+            except Exception as e:
+                logger.error(f"Error processing email '{info['subject']}': {e}")
+                continue
+            self.write_records(records)
+            self.mark_done(key)
+            del records
+
+            if self.should_recycle():
+                self.recycle()
+                return False
+        return True
+
+    def scroll_list(self):
+        top = self.page.locator(LIST_SELECTOR).first.evaluate(SCROLL_LIST_JS)
+        if top < 0:
+            return False
+        self.page.wait_for_timeout(500)
+        return True
+
+    def flush_outputs(self):
+        for output in self.strategies.outputs:
+            output.flush()
+
+    def open_outputs(self):
+        for output in self.strategies.outputs:
+            output.open(self.run_dir)
+        if self.checkpoint.recovered_offset is not None:
+            # Records of a crashed session the checkpoint took back from the log; buffered outputs may lack them
+            for output in self.strategies.outputs:
+                output.recover(record for _, record in iter_records_with_offsets(
+                    self.run_dir.records_path, self.checkpoint.recovered_offset))
+        self.checkpoint.before_commit = self.flush_outputs
+
+    def close_outputs(self):
+        self.checkpoint.before_commit = None
+        for output in self.strategies.outputs:
+            output.close()
+
+    def run(self):
+        started = time.time()
+        self.open_outputs()
+        try:
+            self.open_page()
+            if self.profiler:
+                self.profiler.phase('list-opened')
+            while True:
+                if not self.process_visible_rows():
+                    continue
+                if not self.scroll_list():
+                    break
+            if self.profiler:
+                self.profiler.phase('list-exhausted', extracted=len(self.checkpoint))
+            self.write_records(self.finish())
+            self.page.close()
+        finally:
+            self.close_outputs()
+            self.checkpoint.close()
+        logger.info(f"Extracted {len(self.checkpoint)} emails in {time.time() - started:.1f}s "
+                    f"with {self.recycle_count} recycles")
+        return self.run_dir.records_path
@@ -0,0 +1,74 @@
+import json
+import time
+import logging
+import itertools
+
+from .strategies import CAPTURE_STRATEGIES, LIST_SCAN_STRATEGIES, NAVIGATION_STRATEGIES, StrategySet
+from .strategies.listscan import LIST_ITEM_SELECTOR
+
+logger = logging.getLogger(__name__)
+
+
+def candidate_combinations(sender=None, list_scan=None):
+    """Every navigation/list scan/capture combination that yields only the sender's mail.
+
+    A configured list scan (e.g. sender rules) is kept fixed and only
+    navigation and capture are varied around it.
+    """
+    list_scans = [list_scan] if list_scan else [name for name in LIST_SCAN_STRATEGIES if name != 'sender-rules']
+    for navigation, scan, capture in itertools.product(NAVIGATION_STRATEGIES, list_scans, CAPTURE_STRATEGIES):
+        if sender and scan == 'all' and not NAVIGATION_STRATEGIES[navigation].narrows_to_sender:
+            continue
+        yield navigation, scan, capture
+
+
+def time_combination(context, strategies, sender, sample_size):
+    result = dict(strategies.describe(), rows=0, succeeded=0, setup_seconds=None,
+                  seconds_per_message=None, error=None)
+    page = context.new_page()
+    try:
+        started = time.monotonic()
+        strategies.navigation.open(page, sender)
+        rows = strategies.list_scan.rows(page, sender)[:sample_size]
+        result['setup_seconds'] = time.monotonic() - started
+        result['rows'] = len(rows)
+
+        elapsed = 0.0
+        for info in rows:
+            started = time.monotonic()
+            try:
+                page.locator(LIST_ITEM_SELECTOR).nth(info['index']).click()
+                if strategies.capture.capture(page)['text']:
+                    result['succeeded'] += 1
+            except Exception as e:
+                logger.debug(f"Calibration capture failed: {e}")
+            elapsed += time.monotonic() - started
+        if rows:
+            result['seconds_per_message'] = elapsed / len(rows)
+    except Exception as e:
+        result['error'] = str(e)
+    finally:
+        page.close()
+    return result
+
+
+def calibrate(context, sender=None, sample_size=5, min_success=0.8, report_path=None, list_scan=None):
+    """Time each strategy combination on a sample of the live mailbox and return the fastest reliable one"""
+    results = []
+    for navigation, scan, capture in candidate_combinations(sender, list_scan):
+        strategies = StrategySet(navigation, scan, capture)
+        result = time_combination(context, strategies, sender, sample_size)
+        logger.info(f"Calibration {navigation}/{strategies.list_scan.name}/{capture}: "
+                    f"{result['succeeded']}/{result['rows']} ok, {result['seconds_per_message']} s/message")
+        results.append(result)
+
+    reliable = [r for r in results if r['rows'] and r['succeeded'] / r['rows'] >= min_success]
+    if not reliable:
+        raise Exception("No strategy combination extracted the calibration sample reliably")
+    best = min(reliable, key=lambda r: (r['seconds_per_message'], r['setup_seconds']))
+
+    if report_path:
+        with open(report_path, 'w') as f:
+            json.dump({'best': best, 'results': results, 'sample_size': sample_size}, f, indent=2)
+    logger.info(f"Selected {best['navigation']}/{best['list_scan']}/{best['capture']}")
+    return best
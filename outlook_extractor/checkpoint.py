@@ -0,0 +1,173 @@
+import os
+import json
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_HEADER = '# checkpoint v1'
+# Size of the record log when the ids above it were committed; message ids never start with '#'
+RECORDS_MARK = '# records '
+
+
+def write_atomic(path, lines):
+    """Write lines to path via a fsynced temp file and rename, so readers never see a partial file"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for line in lines:
+            f.write(line)
+            f.write('\n')
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    dir_fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+class Checkpoint:
+    """Crash-safe record of completed message ids for resumable runs.
+
+    Ids are appended to a write-ahead log and group-committed (one write and
+    fsync) every ``commit_every`` ids or ``commit_interval`` seconds. Every
+    ``snapshot_every`` committed ids the full set is compacted into a snapshot
+    written by atomic rename and the log is truncated. Resume loads the
+    snapshot and replays the log; a torn final log line is ignored, so a crash
+    at any point loses at most the uncommitted tail, never the whole run.
+
+    Given the run's ``records_path``, every commit also notes how long the
+    record log was, and load adds the ids of records written after that mark,
+    so a record that reached the log before its id was committed is not
+    extracted and written a second time. ``recovered_offset`` is where those
+    records start, and ``before_commit`` (if set) runs before every commit so
+    buffering outputs can catch up with the ids about to be committed.
+    """
+
+    WAL = 'checkpoint.wal'
+    SNAPSHOT = 'checkpoint.snapshot'
+
+    def __init__(self, directory, commit_every=50, commit_interval=5.0, snapshot_every=20000, records_path=None):
+        self.wal_path = os.path.join(directory, self.WAL)
+        self.snapshot_path = os.path.join(directory, self.SNAPSHOT)
+        self.records_path = records_path
+        self.records_offset = 0
+        self.recovered_offset = None
+        self.before_commit = None
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+        self.snapshot_every = snapshot_every
+        self.completed = set()
+        self.pending = []
+        self.wal_entries = 0
+        self.last_commit = time.monotonic()
+        os.makedirs(directory, exist_ok=True)
+        self.load()
+        self._wal = open(self.wal_path, 'a', encoding='utf-8')
+        if self.pending:
+            self.commit()
+
+    def _load_entry(self, entry):
+        if entry.startswith(RECORDS_MARK):
+            self.records_offset = int(entry[len(RECORDS_MARK):])
+            return False
+        self.completed.add(entry)
+        return True
+
+    def load(self):
+        started = time.monotonic()
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                lines = f.read().split('\n')
+            if lines[0] != SNAPSHOT_HEADER:
+                raise ValueError(f"Unrecognised checkpoint snapshot: {self.snapshot_path}")
+            for entry in lines[1:-1]:
+                self._load_entry(entry)
+        if os.path.exists(self.wal_path):
+            good_bytes = 0
+            with open(self.wal_path, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        logger.warning("Dropping torn checkpoint log entry")
+                        break
+                    if self._load_entry(line[:-1].decode('utf-8')):
+                        self.wal_entries += 1
+                    good_bytes += len(line)
+            if good_bytes != os.path.getsize(self.wal_path):
+                os.truncate(self.wal_path, good_bytes)
+        if self.records_path:
+            self.recover_records()
+        if self.completed:
+            logger.info(f"Resumed {len(self.completed)} completed ids in "
+                        f"{(time.monotonic() - started) * 1000:.0f}ms")
+
+    def recover_records(self):
+        """Take back ids of complete records written after the last commit, to be committed with the next one"""
+        if not os.path.exists(self.records_path):
+            return
+        recovered = 0
+        with open(self.records_path, 'rb') as f:
+            f.seek(self.records_offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                message_id = json.loads(line)['id']
+                if message_id not in self.completed:
+                    self.completed.add(message_id)
+                    self.pending.append(message_id)
+                    recovered += 1
+        if recovered:
+            self.recovered_offset = self.records_offset
+            logger.warning(f"Recovered {recovered} ids written to the record log after the last checkpoint commit")
+
+    def records_mark(self):
+        if not self.records_path or not os.path.exists(self.records_path):
+            return []
+        return [RECORDS_MARK + str(os.path.getsize(self.records_path))]
+
+    def __contains__(self, message_id):
+        return message_id in self.completed
+
+    def __len__(self):
+        return len(self.completed)
+
+    def add(self, message_id):
+        if message_id in self.completed:
+            return
+        self.completed.add(message_id)
+        self.pending.append(message_id)
+        if len(self.pending) >= self.commit_every or time.monotonic() - self.last_commit >= self.commit_interval:
+            self.commit()
+
+    def _append_pending(self):
+        if not self.pending:
+            return
+        if self.before_commit:
+            self.before_commit()
+        self._wal.write(''.join(entry + '\n' for entry in self.pending + self.records_mark()))
+        self._wal.flush()
+        os.fsync(self._wal.fileno())
+        self.wal_entries += len(self.pending)
+        self.pending = []
+
+    def commit(self):
+        """Group-commit pending ids to the log with a single write and fsync"""
+        self.last_commit = time.monotonic()
+        self._append_pending()
+        if self.wal_entries >= self.snapshot_every:
+            self.snapshot()
+
+    def snapshot(self):
+        """Compact the committed ids into a new snapshot and start an empty log"""
+        self._append_pending()
+        write_atomic(self.snapshot_path, [SNAPSHOT_HEADER] + self.records_mark() + sorted(self.completed))
+        self._wal.close()
+        self._wal = open(self.wal_path, 'w', encoding='utf-8')
+        self.wal_entries = 0
+
+    def close(self):
+        self._append_pending()
+        if self.wal_entries:
+            self.snapshot()
+        self._wal.close()
@@ -0,0 +1,159 @@
+import os
+import sys
+import logging
+import argparse
+import urllib.parse
+
+from .dates import DateParser
+from .records import RunDirectory, iter_records
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+
+def require_pyarrow():
+    if pa is None:
+        raise ImportError("Parquet export needs pyarrow: pip install pyarrow")
+
+
+def metadata_schema():
+    return pa.schema([
+        ('message_id', pa.string()),
+        ('thread_id', pa.string()),
+        ('sender', pa.string()),
+        ('recipients', pa.list_(pa.string())),
+        ('subject', pa.string()),
+        ('timestamp', pa.timestamp('ms', tz='UTC')),
+        ('body_length', pa.int64()),
+    ])
+
+
+def bodies_schema():
+    return pa.schema([
+        ('message_id', pa.string()),
+        ('body', pa.large_string()),
+    ])
+
+
+def addresses(value):
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [part.strip() for part in value.split(',') if part.strip()]
+    return list(value)
+
+
+class ParquetDatasetWriter:
+    """Writes records into a Parquet dataset partitioned as account=<account>/month=<YYYY-MM>.
+
+    Rows are buffered per partition and flushed as a row group every
+    ``row_group_size`` rows, so the dataset grows while the extraction runs
+    and memory is bounded by the number of open partitions. With ``bodies``
+    the message text goes to a parallel ``bodies`` dataset, keeping the
+    metadata files small enough to scan for aggregations.
+    """
+
+    def __init__(self, root, account, part_name='part-0', row_group_size=10000, bodies=False):
+        require_pyarrow()
+        self.root = root
+        self.account = account or 'unknown'
+        self.part_name = part_name
+        self.row_group_size = row_group_size
+        self.bodies = bodies
+        # One account's dates, so one layout cache and day/month order for the writer
+        self.dates = DateParser()
+        self.buffers = {}
+        self.writers = {}
+        self.count = 0
+
+    def partition_dir(self, dataset, month):
+        account = urllib.parse.quote(self.account, safe='@.')
+        return os.path.join(self.root, dataset, f'account={account}', f'month={month}')
+
+    def write(self, record):
+        timestamp = self.dates.parse(record.get('date'))
+        month = timestamp.strftime('%Y-%m') if timestamp else 'unknown'
+        body = record.get('body') or ''
+        row = {
+            'message_id': record['id'],
+            'thread_id': record.get('conversation_id') or '',
+            'sender': record.get('sender') or '',
+            'recipients': addresses(record.get('to')) + addresses(record.get('cc')),
+            'subject': record.get('subject') or '',
+            'timestamp': timestamp,
+            'body_length': len(body),
+        }
+        buffer = self.buffers.setdefault(month, {'metadata': [], 'bodies': []})
+        buffer['metadata'].append(row)
+        if self.bodies:
+            buffer['bodies'].append({'message_id': record['id'], 'body': body})
+        self.count += 1
+        if len(buffer['metadata']) >= self.row_group_size:
+            self.flush(month)
+
+    def _write_rows(self, dataset, month, rows, schema):
+        key = (dataset, month)
+        writer = self.writers.get(key)
+        if writer is None:
+            directory = self.partition_dir(dataset, month)
+            os.makedirs(directory, exist_ok=True)
+            writer = pq.ParquetWriter(os.path.join(directory, f'{self.part_name}.parquet'), schema,
+                                      compression='zstd')
+            self.writers[key] = writer
+        writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+
+    def flush(self, month):
+        buffer = self.buffers.get(month)
+        if not buffer or not buffer['metadata']:
+            return
+        self._write_rows('metadata', month, buffer['metadata'], metadata_schema())
+        if buffer['bodies']:
+            self._write_rows('bodies', month, buffer['bodies'], bodies_schema())
+        self.buffers[month] = {'metadata': [], 'bodies': []}
+
+    def close(self):
+        for month in list(self.buffers):
+            self.flush(month)
+        for writer in self.writers.values():
+            writer.close()
+        self.writers = {}
+
+
+def export_parquet(run_dir, root=None, account=None, bodies=False, row_group_size=10000):
+    """Convert an existing run's records.jsonl into the partitioned Parquet dataset"""
+    status = run_dir.read_status()
+    writer = ParquetDatasetWriter(
+        root or run_dir.file('parquet'),
+        account or status.get('account'),
+        part_name=f"part-{os.path.basename(os.path.normpath(run_dir.path))}",
+        row_group_size=row_group_size,
+        bodies=bodies,
+    )
+    for record in iter_records(run_dir.records_path):
+        writer.write(record)
+    writer.close()
+    return writer.count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Write a run as a Parquet dataset partitioned by account and month')
+    parser.add_argument('run_dir')
+    parser.add_argument('--root', help='Dataset root (default: <run>/parquet); share it across runs to build one dataset')
+    parser.add_argument('--account', help="Account name (default: the run's status.json)")
+    parser.add_argument('--bodies', action='store_true', help='Also write message bodies to a separate bodies dataset')
+    parser.add_argument('--row-group-size', type=int, default=10000)
+    args = parser.parse_args(argv)
+
+    count = export_parquet(RunDirectory(args.run_dir), args.root, args.account, args.bodies, args.row_group_size)
+    print(f"Wrote {count} records")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
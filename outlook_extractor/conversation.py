@@ -0,0 +1,151 @@
+import hashlib
+import logging
+from datetime import datetime
+
+from .attachments import ATTACHMENT_LINK_SELECTOR
+from .bounded import READING_PANE_SELECTOR, BoundedMemoryExtractor
+from .checkpoint import Checkpoint
+from .inpage import TEXT_OF_FUNCTION
+from .strategies.listscan import SenderRulesScan, row_id
+
+logger = logging.getLogger(__name__)
+
+EXPAND_ALL_SELECTORS = [
+    "button[aria-label*='Expand all' i]",
+    "button:has-text('Expand all')",
+]
+COLLAPSED_ITEM_SELECTOR = 'div[role="main"] [aria-expanded="false"][data-item-id]'
+
+# Collects every message of the open conversation in one round trip
+CONVERSATION_JS = """(pane, attachmentSelector) => {
+    %s
+    const found = Array.from(pane.querySelectorAll('[data-item-id], div[aria-label^="Email from"]'));
+    const items = found.filter(el => !found.some(other => other !== el && other.contains(el)));
+    return items.map(el => {
+        const sender = el.querySelector('span[title*="@"]');
+        const dated = el.querySelector('[title*="/"]');
+        const body = el.querySelector('div[role="document"]');
+        return {
+            id: el.getAttribute('data-item-id') || '',
+            sender: sender ? sender.getAttribute('title') : '',
+            sender_name: sender ? sender.textContent.trim() : '',
+            date: dated ? dated.getAttribute('title') : '',
+            body: body ? textOf(body) : '',
+            body_html: body ? body.innerHTML : '',
+            attachments: attachmentSelector ? attachmentsOf(el, body, attachmentSelector) : [],
+        };
+    });
+}""" % TEXT_OF_FUNCTION
+
+
+def member_id(conversation_id, member):
+    """Id for a conversation member, falling back to a digest of its sender, date and body"""
+    if member.get('id'):
+        return member['id']
+    digest = hashlib.sha1(f"{member['sender']}|{member['date']}|{member['body']}".encode('utf-8'))
+    return f"{conversation_id}-{digest.hexdigest()[:16]}"
+
+
+class RowCheckpoint(Checkpoint):
+    """Conversation rows already opened, kept apart from the message ids the run counts"""
+
+    WAL = 'rows.wal'
+    SNAPSHOT = 'rows.snapshot'
+
+
+class ConversationExtractor(BoundedMemoryExtractor):
+    """Opens each conversation once and extracts every message in the thread.
+
+    OWA collapses earlier replies and hides their quoted history, so expanding
+    the thread in the reading pane yields each reply's own text without the
+    repeated quotes a per-row extraction picks up.
+
+    Messages are checkpointed by their own ids. A conversation row is keyed by
+    its id plus its latest date and preview text, which change when the thread
+    gains a reply, so a resumed run re-opens that thread and writes only the
+    new messages. Row keys live in their own checkpoint (``rows.wal``), so
+    the run's message count is not inflated by them. Each member is matched
+    against the run's sender, or its sender rules, on its own.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rows = RowCheckpoint(self.run_dir.path)
+
+    def row_key(self, info):
+        version = hashlib.sha1(f"{info['date']}|{info['text']}".encode('utf-8')).hexdigest()[:12]
+        return f"{row_id(info)}@{version}"
+
+    def is_done(self, key):
+        return key in self.rows
+
+    def mark_done(self, key):
+        self.rows.add(key)
+
+    def run(self):
+        try:
+            return super().run()
+        finally:
+            self.rows.close()
+
+    def expand_conversation(self):
+        for selector in EXPAND_ALL_SELECTORS:
+            button = self.page.locator(selector)
+            if button.count() and button.first.is_visible():
+                button.first.click()
+                self.page.wait_for_timeout(300)
+                return
+        collapsed = self.page.locator(COLLAPSED_ITEM_SELECTOR)
+        for _ in range(collapsed.count()):
+            collapsed.first.click()
+            self.page.wait_for_timeout(100)
+
+    def sender_rules(self):
+        scan = self.strategies.list_scan
+        return scan if self.sender is None and isinstance(scan, SenderRulesScan) else None
+
+    def member_outputs(self, member, info):
+        """Outputs a thread member is routed to: its own rule matches in sender-rules mode, else its row's"""
+        rules = self.sender_rules()
+        if rules:
+            return rules.outputs_for(f"{member['sender_name']} {member['sender']}")
+        return info.get('outputs')
+
+    def matches_member(self, member):
+        if self.sender:
+            return self.sender in member['sender_name'] or self.sender in member['sender']
+        rules = self.sender_rules()
+        return not rules or bool(rules.outputs_for(f"{member['sender_name']} {member['sender']}"))
+
+    def extract_row(self, info):
+        self.open_row(info)
+        self.page.locator(READING_PANE_SELECTOR).first.wait_for(state='visible', timeout=10000)
+        self.expand_conversation()
+
+        conversation_id = row_id(info)
+        attachment_selector = ATTACHMENT_LINK_SELECTOR if self.attachments else None
+        members = self.page.locator(READING_PANE_SELECTOR).first.evaluate(CONVERSATION_JS, attachment_selector)
+        if not members:
+            return self.extract_open_row(info)
+
+        extracted_at = datetime.utcnow().isoformat()
+        records = []
+        for member in members:
+            if not self.matches_member(member):
+                continue
+            outputs = self.member_outputs(member, info)
+            records.append({
+                'id': member_id(conversation_id, member),
+                'conversation_id': conversation_id,
+                'sender': member['sender'],
+                'subject': info['subject'],
+                'date': member['date'] or info['date'],
+                'body': member['body'],
+                'body_html': member['body_html'],
+                'attachments': member['attachments'],
+                'extracted_at': extracted_at,
+            })
+            if outputs:
+                records[-1]['outputs'] = outputs
+        logger.info(f"Conversation '{info['subject']}': {len(members)} messages, {len(records)} matching")
+        return records
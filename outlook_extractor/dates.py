@@ -0,0 +1,140 @@
+import re
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+# Formats OWA uses in list row titles and the reading pane header
+OWA_DATE_FORMATS = [
+    '%a %m/%d/%Y %I:%M %p',
+    '%m/%d/%Y %I:%M %p',
+    '%a %d/%m/%Y %H:%M',
+    '%d/%m/%Y %H:%M',
+    '%a %Y-%m-%d %H:%M',
+    '%Y-%m-%d %H:%M',
+    '%m/%d/%Y',
+    '%d/%m/%Y',
+]
+ISO = 'iso'
+RFC2822 = 'rfc2822'
+
+SHAPE_DIGITS = re.compile(r'\d+')
+SHAPE_LETTERS = re.compile(r'[^\W\d_]+')
+SLASH_DATE = re.compile(r'(\d{1,2})/(\d{1,2})/\d{2,4}')
+DAY_FIRST = 'day-first'
+MONTH_FIRST = 'month-first'
+
+
+def date_shape(text):
+    """Reduce a date string to its layout, e.g. 'Mon 10/14/2024 9:05 AM' -> 'a 9/9/9 9:9 a'"""
+    return SHAPE_LETTERS.sub('a', SHAPE_DIGITS.sub('9', text))
+
+
+def field_order(fmt):
+    """DAY_FIRST or MONTH_FIRST for a numeric d/m format, None for formats without that ambiguity"""
+    if '%d/%m' in fmt:
+        return DAY_FIRST
+    if '%m/%d' in fmt:
+        return MONTH_FIRST
+    return None
+
+
+def order_evidence(text):
+    """The field order a d/m/y value proves (one field above 12), or None if it fits both"""
+    match = SLASH_DATE.search(text)
+    if not match:
+        return None
+    first, second = int(match.group(1)), int(match.group(2))
+    if first > 12 >= second:
+        return DAY_FIRST
+    if second > 12 >= first:
+        return MONTH_FIRST
+    return None
+
+
+class DateParser:
+    """Parses OWA, RFC 2822 and ISO dates, remembering which format fits each string layout.
+
+    A mailbox renders every date in one or two locale layouts, so after the
+    first string of a given shape has been matched, later ones go straight to
+    the right parser instead of trying the whole format list. Day/month order
+    is settled once, by the first value that can only be read one way (or by
+    ``day_first``), and applies to the ambiguous values after it; ambiguous
+    values before that are read month first. A value only one order can read
+    is always read that way. The order belongs to one mailbox, so use one
+    parser per run or account, never one shared across accounts.
+    """
+
+    def __init__(self, formats=OWA_DATE_FORMATS, day_first=None):
+        self.formats = list(formats)
+        self.order = None if day_first is None else (DAY_FIRST if day_first else MONTH_FIRST)
+        self.detected = {}
+        self.unparseable = set()
+
+    def _parse_with(self, fmt, text):
+        if fmt == ISO:
+            return datetime.fromisoformat(text.replace('Z', '+00:00'))
+        if fmt == RFC2822:
+            parsed = parsedate_to_datetime(text)
+            if parsed is None:
+                raise ValueError(text)
+            return parsed
+        return datetime.strptime(text, fmt)
+
+    @staticmethod
+    def allowed(fmt, order):
+        return order is None or field_order(fmt) in (None, order)
+
+    def parse(self, text):
+        """Return an aware UTC datetime for text, or None if no known format matches"""
+        if not text or text == 'Date unknown':
+            return None
+        text = text.strip()
+        shape = date_shape(text)
+        if shape in self.unparseable:
+            return None
+        evidence = order_evidence(text)
+        if self.order is None:
+            self.order = evidence
+        order = evidence or self.order
+
+        cached = self.detected.get(shape)
+        if cached is not None and not self.allowed(cached, order):
+            # Cached for the other field order; this value has to be read the way it allows
+            cached = None
+        candidates = ([cached] if cached else []) + [
+            fmt for fmt in [ISO, RFC2822] + self.formats if fmt != cached and self.allowed(fmt, order)]
+        parsed = None
+        for candidate in candidates:
+            try:
+                parsed = self._parse_with(candidate, text)
+            except (TypeError, ValueError):
+                continue
+            if cached is None and (evidence is None or evidence == self.order):
+                self.detected[shape] = candidate
+            break
+        if parsed is None:
+            # A shape that has parsed before only had a bad value; just a shape nothing fits is written off
+            if shape not in self.detected:
+                self.unparseable.add(shape)
+            return None
+        if parsed.tzinfo is None:
+            # OWA renders list dates in the mailbox's local time without an offset
+            parsed = parsed.astimezone()
+        return parsed.astimezone(timezone.utc)
+
+    def epoch(self, text):
+        """Return whole seconds since the Unix epoch for text, or None"""
+        parsed = self.parse(text)
+        return int(parsed.timestamp()) if parsed else None
+
+
+def parse_date(text):
+    """Parse one OWA, RFC 2822 or ISO date string into an aware UTC datetime, or None.
+
+    Nothing carries over between calls; to parse a mailbox's dates, keep a
+    DateParser for the run instead.
+    """
+    return DateParser().parse(text)
+
+
+def parse_epoch(text):
+    return DateParser().epoch(text)
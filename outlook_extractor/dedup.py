@@ -0,0 +1,170 @@
+import os
+import re
+import sys
+import struct
+import hashlib
+import logging
+import argparse
+
+from .records import RecordWriter, RunDirectory, iter_records
+
+logger = logging.getLogger(__name__)
+
+MAX_HASH = (1 << 64) - 1
+WORD = re.compile(r'\w+')
+
+
+def shingles(text, size=5):
+    """Word k-shingles of the lower-cased text; short texts yield a single shingle"""
+    words = WORD.findall(text.lower())
+    if len(words) <= size:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def shingle_hash(shingle):
+    return struct.unpack('<Q', hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest())[0]
+
+
+def minhash(text, num_perm=64, shingle_size=5):
+    """MinHash signature by one-permutation hashing with rotation densification.
+
+    Each shingle is hashed once and its hash decides both the bin and the
+    value, so a signature costs one hash per shingle instead of one per
+    shingle per permutation. Empty bins borrow the next non-empty bin's value.
+    """
+    signature = [MAX_HASH] * num_perm
+    for shingle in shingles(text, shingle_size):
+        value = shingle_hash(shingle)
+        slot = value % num_perm
+        if value < signature[slot]:
+            signature[slot] = value
+    filled = [i for i, value in enumerate(signature) if value != MAX_HASH]
+    if not filled:
+        return tuple(signature)
+    for i in range(num_perm):
+        if signature[i] == MAX_HASH:
+            offset = 1
+            while signature[(i + offset) % num_perm] == MAX_HASH:
+                offset += 1
+            signature[i] = signature[(i + offset) % num_perm] ^ offset
+    return tuple(signature)
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+
+class NearDuplicateIndex:
+    """Incremental LSH index clustering near-duplicate bodies as records arrive.
+
+    Signatures are split into ``bands`` bands of ``num_perm / bands`` rows; a
+    new body is compared only with the cluster canonicals that share a band
+    bucket with it, and joins the first whose estimated similarity reaches
+    ``threshold``. Otherwise it starts a new cluster as its canonical.
+    """
+
+    def __init__(self, num_perm=64, bands=8, threshold=0.8, shingle_size=5):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.buckets = [{} for _ in range(bands)]
+        self.canonicals = {}
+
+    def band_keys(self, signature):
+        for band in range(self.bands):
+            yield band, hash(signature[band * self.rows:(band + 1) * self.rows])
+
+    def add_canonical(self, cluster_id, signature):
+        self.canonicals[cluster_id] = signature
+        for band, key in self.band_keys(signature):
+            self.buckets[band].setdefault(key, cluster_id)
+
+    def add(self, message_id, text):
+        """Return (cluster id, similarity to its canonical, is_new_cluster) for a body"""
+        signature = minhash(text, self.num_perm, self.shingle_size)
+        checked = set()
+        for band, key in self.band_keys(signature):
+            cluster_id = self.buckets[band].get(key)
+            if cluster_id is None or cluster_id in checked:
+                continue
+            checked.add(cluster_id)
+            score = similarity(signature, self.canonicals[cluster_id])
+            if score >= self.threshold:
+                return cluster_id, score, False
+
+        self.add_canonical(message_id, signature)
+        return message_id, 1.0, True
+
+
+class DedupWriter:
+    """Stores one canonical body per cluster and a body-less reference record per message.
+
+    ``bodies.jsonl`` holds {cluster_id, body} for each canonical and
+    ``messages.jsonl`` holds every record with its body replaced by the
+    cluster id and the similarity to the canonical body. Canonicals already
+    in ``bodies.jsonl`` are re-indexed on open so a resumed run keeps
+    clustering against them.
+    """
+
+    def __init__(self, directory, index=None):
+        os.makedirs(directory, exist_ok=True)
+        self.index = index or NearDuplicateIndex()
+        bodies_path = os.path.join(directory, 'bodies.jsonl')
+        for canonical in iter_records(bodies_path):
+            self.index.add_canonical(canonical['cluster_id'], minhash(
+                canonical['body'], self.index.num_perm, self.index.shingle_size))
+        self.bodies = RecordWriter(bodies_path)
+        self.messages = RecordWriter(os.path.join(directory, 'messages.jsonl'))
+        self.body_chars = 0
+        self.stored_chars = 0
+
+    def write(self, record):
+        body = record.get('body') or ''
+        cluster_id, score, is_new = self.index.add(record['id'], body)
+        self.body_chars += len(body)
+        if is_new:
+            self.bodies.write({'cluster_id': cluster_id, 'body': body})
+            self.stored_chars += len(body)
+        reference = {key: value for key, value in record.items() if key not in ('body', 'body_html')}
+        reference['cluster_id'] = cluster_id
+        reference['similarity'] = round(score, 3)
+        self.messages.write(reference)
+
+    def close(self):
+        self.bodies.close()
+        self.messages.close()
+        if self.body_chars:
+            logger.info(f"Dedup: {self.messages.count} messages in {self.bodies.count} clusters, "
+                        f"{self.stored_chars / self.body_chars:.0%} of body text stored")
+
+
+def dedup_run(run_dir, threshold=0.8, num_perm=64, bands=8):
+    writer = DedupWriter(run_dir.file('dedup'), NearDuplicateIndex(num_perm, bands, threshold))
+    for record in iter_records(run_dir.records_path):
+        writer.write(record)
+    writer.close()
+    return writer
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Cluster near-duplicate bodies of a run with MinHash/LSH')
+    parser.add_argument('run_dir')
+    parser.add_argument('--threshold', type=float, default=0.8, help='Estimated Jaccard similarity to join a cluster')
+    parser.add_argument('--num-perm', type=int, default=64)
+    parser.add_argument('--bands', type=int, default=8)
+    args = parser.parse_args(argv)
+
+    writer = dedup_run(RunDirectory(args.run_dir), args.threshold, args.num_perm, args.bands)
+    print(f"{writer.messages.count} messages, {writer.bodies.count} distinct bodies, "
+          f"{writer.stored_chars}/{writer.body_chars} body characters stored")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
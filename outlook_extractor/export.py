@@ -0,0 +1,327 @@
+import os
+import re
+import csv
+import sys
+import json
+import time
+import html
+import logging
+import zipfile
+import argparse
+from datetime import datetime
+from xml.sax.saxutils import escape
+from concurrent.futures import ProcessPoolExecutor
+
+from .metadata import MetadataIndex, iter_ordered_records
+from .records import RunDirectory, iter_records
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ('docx', 'txt', 'jsonl', 'html', 'csv')
+CSV_FIELDS = ['id', 'date', 'sender', 'to', 'cc', 'subject', 'body']
+JSONL_FIELDS = ['id', 'conversation_id', 'date', 'sender', 'to', 'cc', 'subject', 'body', 'attachments']
+
+# Characters that are not allowed in XML 1.0 documents
+INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def as_text(value):
+    if isinstance(value, list):
+        return ', '.join(value)
+    return value or ''
+
+
+class Renderer:
+    """Streams records into one export file; subclasses write the header, each record and the footer"""
+
+    extension = None
+
+    def __init__(self, path, title):
+        self.path = path
+        self.title = title
+        self.generated = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    def open(self):
+        self.file = open(self.path, 'w', encoding='utf-8', newline='')
+
+    def header(self):
+        pass
+
+    def record(self, index, record):
+        raise NotImplementedError
+
+    def footer(self):
+        pass
+
+    def close(self):
+        self.file.close()
+
+    def render(self, records):
+        self.open()
+        self.header()
+        count = 0
+        for count, record in enumerate(records, 1):
+            self.record(count, record)
+        self.footer()
+        self.close()
+        return count
+
+
+class TextRenderer(Renderer):
+    extension = 'txt'
+
+    def header(self):
+        self.file.write('\n'.join([self.title, f'Generated on: {self.generated}', '', '']))
+
+    def record(self, index, record):
+        self.file.write('\n'.join([
+            f'Email {index}',
+            f"Date: {record['date']}",
+            f"Subject: {record['subject']}",
+            'Content:',
+            record['body'],
+            '---',
+            '',
+            '',
+        ]))
+
+
+class JsonlRenderer(Renderer):
+    extension = 'jsonl'
+
+    def record(self, index, record):
+        projected = {field: record.get(field) for field in JSONL_FIELDS}
+        self.file.write(json.dumps(projected, ensure_ascii=False) + '\n')
+
+
+class CsvRenderer(Renderer):
+    extension = 'csv'
+
+    def header(self):
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(CSV_FIELDS)
+
+    def record(self, index, record):
+        self.writer.writerow([as_text(record.get(field)) for field in CSV_FIELDS])
+
+
+class HtmlRenderer(Renderer):
+    extension = 'html'
+
+    def header(self):
+        title = html.escape(self.title)
+        self.file.write(
+            f'<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>{title}</title></head><body>\n'
+            f'<h1>{title}</h1>\n<p>Generated on: {self.generated}</p>\n'
+        )
+
+    def record(self, index, record):
+        self.file.write(
+            f'<section id="{html.escape(record["id"])}">\n'
+            f'<h2>Email {index}</h2>\n'
+            f'<p>Date: {html.escape(record["date"])}<br>'
+            f'From: {html.escape(as_text(record.get("sender")))}<br>'
+            f'Subject: {html.escape(record["subject"])}</p>\n'
+            f'<pre>{html.escape(record["body"])}</pre>\n</section>\n'
+        )
+
+    def footer(self):
+        self.file.write('</body></html>\n')
+
+
+DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '<Override PartName="/word/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>'
+    '</Types>'
+)
+DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/></Relationships>'
+)
+DOCX_DOCUMENT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/></Relationships>'
+)
+DOCX_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<w:styles xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+    '<w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/></w:style>'
+    '<w:style w:type="paragraph" w:styleId="Title"><w:name w:val="Title"/><w:basedOn w:val="Normal"/>'
+    '<w:rPr><w:sz w:val="56"/></w:rPr></w:style>'
+    '<w:style w:type="paragraph" w:styleId="Heading1"><w:name w:val="heading 1"/><w:basedOn w:val="Normal"/>'
+    '<w:pPr><w:keepNext/><w:spacing w:before="240"/><w:outlineLvl w:val="0"/></w:pPr>'
+    '<w:rPr><w:b/><w:sz w:val="32"/></w:rPr></w:style>'
+    '</w:styles>'
+)
+DOCX_DOCUMENT_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+)
+DOCX_DOCUMENT_END = '<w:sectPr/></w:body></w:document>'
+
+
+def docx_paragraph(text, style=None):
+    lines = escape(INVALID_XML_CHARS.sub('', text)).split('\n')
+    runs = '<w:br/>'.join(f'<w:t xml:space="preserve">{line}</w:t>' for line in lines)
+    style_xml = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ''
+    return f'<w:p>{style_xml}<w:r>{runs}</w:r></w:p>'
+
+
+class DocxRenderer(Renderer):
+    """Writes WordprocessingML straight into the zip, split into volumes of ``volume_size`` emails.
+
+    Building a python-docx object tree costs far more per paragraph than
+    emitting the XML, and a single 50k-email document is too large for Word to
+    open comfortably, so each volume is streamed into its own .docx.
+    """
+
+    extension = 'docx'
+
+    def __init__(self, path, title, volume_size=5000):
+        super().__init__(path, title)
+        self.volume_size = volume_size
+        self.volume = 0
+        self.paths = []
+        self.archive = None
+
+    def volume_path(self):
+        root, ext = os.path.splitext(self.path)
+        return f'{root}_vol{self.volume:03d}{ext}'
+
+    def open(self):
+        pass
+
+    def start_volume(self):
+        self.volume += 1
+        path = self.volume_path()
+        self.paths.append(path)
+        self.archive = zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=1)
+        self.archive.writestr('[Content_Types].xml', DOCX_CONTENT_TYPES)
+        self.archive.writestr('_rels/.rels', DOCX_RELS)
+        self.archive.writestr('word/_rels/document.xml.rels', DOCX_DOCUMENT_RELS)
+        self.archive.writestr('word/styles.xml', DOCX_STYLES)
+        self.file = self.archive.open('word/document.xml', 'w')
+        self.write(DOCX_DOCUMENT_START)
+        self.write(docx_paragraph(f'{self.title} (volume {self.volume})', 'Title'))
+        self.write(docx_paragraph(f'Generated on: {self.generated}'))
+
+    def finish_volume(self):
+        self.write(DOCX_DOCUMENT_END)
+        self.file.close()
+        self.archive.close()
+        self.archive = None
+
+    def write(self, text):
+        self.file.write(text.encode('utf-8'))
+
+    def record(self, index, record):
+        if self.archive is None or (index - 1) % self.volume_size == 0:
+            if self.archive is not None:
+                self.finish_volume()
+            self.start_volume()
+        self.write(''.join([
+            docx_paragraph(f'Email {index}', 'Heading1'),
+            docx_paragraph(f"Date: {record['date']}"),
+            docx_paragraph(f"Subject: {record['subject']}"),
+            docx_paragraph('Content:'),
+            docx_paragraph(record['body']),
+            docx_paragraph('---'),
+        ]))
+
+    def close(self):
+        if self.archive is None:
+            self.start_volume()
+        self.finish_volume()
+
+
+RENDERERS = {cls.extension: cls for cls in (DocxRenderer, TextRenderer, JsonlRenderer, HtmlRenderer, CsvRenderer)}
+
+
+def render_format(fmt, records_path, output_dir, title, volume_size, offsets=None):
+    """Render one format from the record log, in log order or at the given offsets; runs in its own worker process.
+
+    Files are rendered in a hidden partial directory and renamed into place
+    when complete, so a reader of ``output_dir`` never sees a half-written export.
+    """
+    started = time.monotonic()
+    partial_dir = os.path.join(output_dir, f'.{fmt}.partial')
+    os.makedirs(partial_dir, exist_ok=True)
+    path = os.path.join(partial_dir, f'emails.{fmt}')
+    if fmt == 'docx':
+        renderer = DocxRenderer(path, title, volume_size)
+    else:
+        renderer = RENDERERS[fmt](path, title)
+    records = iter_records(records_path) if offsets is None else iter_ordered_records(records_path, offsets)
+    count = renderer.render(records)
+    paths = []
+    for partial_path in (renderer.paths if fmt == 'docx' else [path]):
+        final_path = os.path.join(output_dir, os.path.basename(partial_path))
+        os.replace(partial_path, final_path)
+        paths.append(final_path)
+    os.rmdir(partial_dir)
+    return fmt, count, paths, time.monotonic() - started
+
+
+def export_run(run_dir, formats=FORMATS, title=None, volume_size=5000, workers=None, order='extracted'):
+    """Render every requested format from the run's records.jsonl, one worker process per format.
+
+    With ``order='date'`` the records are rendered oldest first, using the
+    sorted metadata index to re-read them from the log by offset.
+    """
+    output_dir = run_dir.file('export')
+    os.makedirs(output_dir, exist_ok=True)
+    if title is None:
+        sender = run_dir.read_status().get('sender')
+        title = f'Emails from {sender}' if sender else 'Extracted emails'
+
+    offsets = None
+    if order == 'date':
+        offsets = [item.offset for item in MetadataIndex.from_records(run_dir.records_path).ordered()]
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers or len(formats)) as pool:
+        futures = [pool.submit(render_format, fmt, run_dir.records_path, output_dir, title, volume_size, offsets)
+                   for fmt in formats]
+        for future in futures:
+            fmt, count, paths, seconds = future.result()
+            logger.info(f"Rendered {count} emails to {fmt} in {seconds:.1f}s")
+            results[fmt] = paths
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Render an extraction run into export formats')
+    parser.add_argument('run_dir')
+    parser.add_argument('--formats', default=','.join(FORMATS),
+                        help=f"Comma separated subset of {', '.join(FORMATS)}")
+    parser.add_argument('--volume-size', type=int, default=5000, help='Emails per DOCX volume')
+    parser.add_argument('--title')
+    parser.add_argument('--order', choices=['extracted', 'date'], default='extracted')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    formats = [fmt.strip() for fmt in args.formats.split(',') if fmt.strip()]
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        parser.error(f"Unknown formats: {', '.join(sorted(unknown))}")
+    results = export_run(RunDirectory(args.run_dir), formats, args.title, args.volume_size, order=args.order)
+    for fmt, paths in results.items():
+        for path in paths:
+            print(f"{fmt}: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+import logging
+
+from .attachments import ATTACHMENT_LINK_SELECTOR
+
+logger = logging.getLogger(__name__)
+
+BODY_SELECTOR = 'div[role="document"]'
+
+# Layout-free replacement for innerText: walks the DOM and emits line breaks for
+# block elements, so reading a body never forces style recalculation or layout.
+TEXT_OF_FUNCTION = """
+function textOf(root) {
+    const BLOCK = new Set(['ADDRESS', 'ARTICLE', 'BLOCKQUOTE', 'DIV', 'DL', 'DT', 'DD', 'FIELDSET',
+        'FIGURE', 'FOOTER', 'FORM', 'H1', 'H2', 'H3', 'H4', 'H5', 'H6', 'HEADER', 'HR', 'LI',
+        'OL', 'P', 'PRE', 'SECTION', 'TABLE', 'TR', 'UL']);
+    const out = [];
+    const walk = node => {
+        if (node.nodeType === 3) {
+            out.push(node.nodeValue.replace(/\\s+/g, ' '));
+            return;
+        }
+        if (node.nodeType !== 1) return;
+        const tag = node.tagName;
+        if (tag === 'SCRIPT' || tag === 'STYLE' || node.hidden || node.getAttribute('aria-hidden') === 'true') return;
+        if (tag === 'BR') {
+            out.push('\\n');
+            return;
+        }
+        const block = BLOCK.has(tag);
+        if (block) out.push('\\n');
+        for (let child = node.firstChild; child; child = child.nextSibling) walk(child);
+        if (tag === 'TD' || tag === 'TH') out.push('\\t');
+        if (block) out.push('\\n');
+    };
+    walk(root);
+    return out.join('')
+        .replace(/[ \\t]*\\n[ \\t]*/g, '\\n')
+        .replace(/\\n{3,}/g, '\\n\\n')
+        .trim();
+}
+
+function attachmentsOf(root, body, selector) {
+    // Never links from the message body: those are the sender's, not Outlook's attachment well
+    return Array.from(root.querySelectorAll(selector)).filter(a => !(body && body.contains(a))).map(a => ({
+        name: a.getAttribute('download') || a.getAttribute('title') || a.textContent.trim(),
+        url: a.href,
+    }));
+}
+"""
+
+# Reads the whole open message in one evaluate; returns null while the body is not rendered yet
+EXTRACT_MESSAGE_JS = """(options) => {
+    %s
+    const body = document.querySelector('%s');
+    if (!body) return null;
+    const pane = body.closest('div[role="main"]') || document;
+    const addresses = label => Array.from(
+        pane.querySelectorAll(`[aria-label^="${label}"] [title*="@"]`)
+    ).map(el => el.getAttribute('title'));
+    const sender = pane.querySelector('span[title*="@"]');
+    const subject = pane.querySelector('[role="heading"]');
+    const time = pane.querySelector('time[datetime]');
+    const dated = pane.querySelector('[title*="/"]');
+    return {
+        from: sender ? sender.getAttribute('title') : '',
+        to: addresses('To'),
+        cc: addresses('Cc'),
+        subject: subject ? subject.textContent.trim() : '',
+        date: time ? time.getAttribute('datetime') : (dated ? dated.getAttribute('title') : ''),
+        html: body.innerHTML,
+        text: textOf(body),
+        attachments: options.attachments ? attachmentsOf(pane, body, options.attachmentSelector) : [],
+    };
+}""" % (TEXT_OF_FUNCTION, BODY_SELECTOR)
+
+
+def extract_message(page, attachments=False, timeout=10000):
+    """Return the open message as a dict in a single round trip, waiting only if it is not rendered yet"""
+    options = {'attachments': attachments, 'attachmentSelector': ATTACHMENT_LINK_SELECTOR}
+    message = page.evaluate(EXTRACT_MESSAGE_JS, options)
+    if message is None:
+        page.wait_for_selector(BODY_SELECTOR, timeout=timeout)
+        message = page.evaluate(EXTRACT_MESSAGE_JS, options)
+    if message is None:
+        raise Exception("Could not find email content")
+    return message
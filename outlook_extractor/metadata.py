@@ -0,0 +1,138 @@
+import bisect
+
+from .dates import DateParser
+from .records import iter_records_with_offsets, read_record_at
+
+
+def addresses(value):
+    if not value:
+        return ()
+    if isinstance(value, str):
+        return tuple(part.strip() for part in value.split(',') if part.strip())
+    return tuple(value)
+
+
+class EmailMetadata:
+    """Compact typed view of a record without its body; ``epoch`` is None when the date did not parse"""
+
+    __slots__ = ('id', 'thread_id', 'sender', 'recipients', 'subject', 'epoch', 'body_length', 'offset')
+
+    def __init__(self, id, thread_id, sender, recipients, subject, epoch, body_length, offset=None):
+        self.id = id
+        self.thread_id = thread_id
+        self.sender = sender
+        self.recipients = recipients
+        self.subject = subject
+        self.epoch = epoch
+        self.body_length = body_length
+        self.offset = offset
+
+    @classmethod
+    def from_record(cls, record, offset=None, parser=None):
+        """Pass the run's DateParser when converting many records, so its dates are read in one order"""
+        parser = parser or DateParser()
+        return cls(
+            record['id'],
+            record.get('conversation_id') or '',
+            (record.get('sender') or '').lower(),
+            addresses(record.get('to')) + addresses(record.get('cc')),
+            record.get('subject') or '',
+            parser.epoch(record.get('date')),
+            len(record.get('body') or ''),
+            offset,
+        )
+
+    @property
+    def sort_key(self):
+        return (self.epoch, self.id)
+
+    def __repr__(self):
+        return f"EmailMetadata({self.id!r}, sender={self.sender!r}, epoch={self.epoch})"
+
+
+class MetadataIndex:
+    """Sorted in-memory indexes over EmailMetadata by date and by sender.
+
+    Both indexes are kept ordered by (epoch, id), so date ranges, per-sender
+    date ranges and date-ordered iteration are bisections into a list rather
+    than scans. Messages whose date did not parse are kept apart in
+    ``undated`` and returned after the dated ones by ``ordered``.
+    """
+
+    def __init__(self):
+        self.keys = []
+        self.items = []
+        self.sender_keys = {}
+        self.sender_items = {}
+        self.undated = []
+
+    def add(self, item):
+        if item.epoch is None:
+            self.undated.append(item)
+            return
+        key = item.sort_key
+        position = bisect.bisect_right(self.keys, key)
+        self.keys.insert(position, key)
+        self.items.insert(position, item)
+        sender_keys = self.sender_keys.setdefault(item.sender, [])
+        sender_items = self.sender_items.setdefault(item.sender, [])
+        position = bisect.bisect_right(sender_keys, key)
+        sender_keys.insert(position, key)
+        sender_items.insert(position, item)
+
+    @classmethod
+    def build(cls, items):
+        """Bulk-build from an iterable with one sort per index instead of repeated inserts"""
+        index = cls()
+        dated = []
+        for item in items:
+            if item.epoch is None:
+                index.undated.append(item)
+            else:
+                dated.append(item)
+        dated.sort(key=lambda item: item.sort_key)
+        index.items = dated
+        index.keys = [item.sort_key for item in dated]
+        for item in dated:
+            index.sender_items.setdefault(item.sender, []).append(item)
+        index.sender_keys = {sender: [item.sort_key for item in items]
+                             for sender, items in index.sender_items.items()}
+        return index
+
+    @classmethod
+    def from_records(cls, path):
+        parser = DateParser()
+        return cls.build(EmailMetadata.from_record(record, offset, parser)
+                         for offset, record in iter_records_with_offsets(path))
+
+    def __len__(self):
+        return len(self.items) + len(self.undated)
+
+    @staticmethod
+    def _slice(keys, items, start, end):
+        low = 0 if start is None else bisect.bisect_left(keys, (start, ''))
+        high = len(keys) if end is None else bisect.bisect_left(keys, (end, ''))
+        return items[low:high]
+
+    def between(self, start=None, end=None):
+        """Messages with start <= epoch < end, oldest first"""
+        return self._slice(self.keys, self.items, start, end)
+
+    def from_sender(self, sender, start=None, end=None):
+        sender = sender.lower()
+        return self._slice(self.sender_keys.get(sender, []), self.sender_items.get(sender, []), start, end)
+
+    def senders(self):
+        return sorted(self.sender_items)
+
+    def ordered(self, reverse=False):
+        dated = reversed(self.items) if reverse else iter(self.items)
+        yield from dated
+        yield from self.undated
+
+
+def iter_ordered_records(path, offsets):
+    """Re-read full records from the JSONL log at the given byte offsets, in that order"""
+    with open(path, 'rb') as f:
+        for offset in offsets:
+            yield read_record_at(f, offset)
@@ -0,0 +1,174 @@
+import os
+import sys
+import shutil
+import logging
+import argparse
+import urllib.parse
+import urllib.request
+from datetime import datetime
+from email import policy
+from email.parser import BytesParser
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from .bounded import BoundedMemoryExtractor
+from .records import RecordWriter, RunDirectory
+from .session import session_opener
+from .strategies.listscan import row_id
+
+logger = logging.getLogger(__name__)
+
+# OWA's "Download > Download as EML" endpoint; override for other tenants or a local stand-in
+DEFAULT_SOURCE_URL = "https://outlook.office365.com/owa/service.svc/s/DownloadMessageSource?id={id}"
+CHUNK_SIZE = 64 * 1024
+
+
+def safe_filename(message_id):
+    return urllib.parse.quote(message_id, safe='') + '.eml'
+
+
+class SourceFetcher:
+    """Streams raw message sources to disk over HTTP, reusing the browser's session cookies"""
+
+    def __init__(self, directory, url_template=DEFAULT_SOURCE_URL, cookies=None, timeout=60):
+        self.directory = directory
+        self.url_template = url_template
+        self.timeout = timeout
+        self.opener = session_opener(cookies or [])
+        os.makedirs(directory, exist_ok=True)
+
+    def url_for(self, message_id):
+        return self.url_template.format(id=urllib.parse.quote(message_id, safe=''))
+
+    def fetch(self, message_id):
+        """Download one message source to <directory>/<id>.eml and return its path"""
+        path = os.path.join(self.directory, safe_filename(message_id))
+        if os.path.exists(path):
+            return path
+        url = self.url_for(message_id)
+        request = urllib.request.Request(url, headers={'Accept': 'message/rfc822, */*'})
+        tmp_path = path + '.part'
+        with self.opener.open(request, timeout=self.timeout) as response, open(tmp_path, 'wb') as f:
+            shutil.copyfileobj(response, f, CHUNK_SIZE)
+        os.replace(tmp_path, path)
+        return path
+
+
+def parse_source(path, message_id):
+    """Parse a stored .eml into a record; runs in a worker process"""
+    with open(path, 'rb') as f:
+        message = BytesParser(policy=policy.default).parse(f)
+
+    parts = []
+    for part in message.walk():
+        if part.is_multipart():
+            continue
+        payload = part.get_payload(decode=True) or b''
+        parts.append({
+            'content_type': part.get_content_type(),
+            'filename': part.get_filename(),
+            'size': len(payload),
+        })
+
+    body_part = message.get_body(preferencelist=('plain', 'html'))
+    html_part = message.get_body(preferencelist=('html',))
+    return {
+        'id': message_id,
+        'message_id': message.get('Message-ID', ''),
+        'sender': message.get('From', ''),
+        'to': message.get('To', ''),
+        'cc': message.get('Cc', ''),
+        'subject': message.get('Subject', 'No subject'),
+        'date': message.get('Date', 'Date unknown'),
+        'body': body_part.get_content() if body_part else '',
+        'body_html': html_part.get_content() if html_part else '',
+        'parts': parts,
+        'source_path': path,
+        'extracted_at': datetime.utcnow().isoformat(),
+    }
+
+
+class SourceFetchExtractor(BoundedMemoryExtractor):
+    """Fetches each listed message's raw source instead of rendering it.
+
+    Rows are never opened: their ids come from the list scan, the sources are
+    streamed to ``<run>/eml`` on a thread pool and parsed with the stdlib
+    ``email`` package in a process pool, so the browser loop only scrolls.
+    A row is checkpointed when its record is written, so a failed fetch is
+    retried on resume.
+    """
+
+    checkpoint_rows = False
+
+    def __init__(self, *args, url_template=DEFAULT_SOURCE_URL, fetch_workers=4, parse_workers=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fetcher = SourceFetcher(self.run_dir.file('eml'), url_template, cookies=self.context.cookies())
+        self.fetch_pool = ThreadPoolExecutor(max_workers=fetch_workers)
+        self.parse_pool = ProcessPoolExecutor(max_workers=parse_workers)
+        self.max_pending = fetch_workers * 4
+        self.pending = {}
+
+    def _fetch_and_parse(self, message_id, outputs=None):
+        path = self.fetcher.fetch(message_id)
+        record = self.parse_pool.submit(parse_source, path, message_id).result()
+        if outputs is not None:
+            record['outputs'] = outputs
+        return record
+
+    def completed_records(self, block=False):
+        records = []
+        for message_id, future in list(self.pending.items()):
+            if not block and not future.done():
+                continue
+            del self.pending[message_id]
+            try:
+                records.append(future.result())
+            except Exception as e:
+                logger.error(f"Error fetching message source {message_id}: {e}")
+        return records
+
+    def is_done(self, key):
+        return key in self.pending or super().is_done(key)
+
+    def extract_row(self, info):
+        message_id = row_id(info)
+        self.pending[message_id] = self.fetch_pool.submit(self._fetch_and_parse, message_id, info.get('outputs'))
+        block = len(self.pending) >= self.max_pending
+        return self.completed_records(block=block)
+
+    def finish(self):
+        records = self.completed_records(block=True)
+        self.fetch_pool.shutdown()
+        self.parse_pool.shutdown()
+        return records
+
+
+def fetch_sources(message_ids, run_dir, url_template, fetch_workers=4, parse_workers=None):
+    """Fetch and parse a list of message ids without a browser, e.g. against a local .eml server"""
+    fetcher = SourceFetcher(run_dir.file('eml'), url_template)
+    with RecordWriter(run_dir.records_path) as writer, \
+            ThreadPoolExecutor(max_workers=fetch_workers) as fetch_pool, \
+            ProcessPoolExecutor(max_workers=parse_workers) as parse_pool:
+        paths = fetch_pool.map(fetcher.fetch, message_ids)
+        for record in parse_pool.map(parse_source, paths, message_ids, chunksize=16):
+            writer.write(record)
+    return writer.count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Fetch raw message sources for a list of ids')
+    parser.add_argument('ids_file', help='File with one message id per line')
+    parser.add_argument('output_dir')
+    parser.add_argument('--url-template', default=DEFAULT_SOURCE_URL,
+                        help="Source URL with an {id} placeholder, e.g. http://127.0.0.1:8001/{id}.eml")
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args(argv)
+
+    with open(args.ids_file, 'r') as f:
+        message_ids = [line.strip() for line in f if line.strip()]
+    count = fetch_sources(message_ids, RunDirectory(args.output_dir), args.url_template, args.workers)
+    print(f"Fetched and parsed {count} messages into {args.output_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+import time
+import logging
+import resource
+import tracemalloc
+
+from .bounded import JS_HEAP_JS
+from .records import RecordWriter
+
+logger = logging.getLogger(__name__)
+
+# Renderer metrics reported by the DevTools Performance domain that are worth keeping
+CDP_METRICS = ('JSHeapUsedSize', 'JSHeapTotalSize', 'Nodes', 'Documents', 'JSEventListeners', 'LayoutCount')
+
+
+class MemoryProfiler:
+    """Opt-in memory time series for a run, appended to <run>/memory.jsonl.
+
+    ``phase`` takes a tracemalloc snapshot and records the ``top_n`` allocation
+    sites that grew since the previous phase; ``message`` samples the
+    renderer's heap through a CDP session every ``sample_every`` messages.
+    Every entry is flushed as it is written, so the series survives the run
+    being OOM-killed.
+    """
+
+    def __init__(self, path, sample_every=50, top_n=10, frames=1):
+        self.sample_every = sample_every
+        self.top_n = top_n
+        self.writer = RecordWriter(path)
+        self.started = time.monotonic()
+        self.cdp_page = None
+        self.cdp = None
+        tracemalloc.start(frames)
+        self.snapshot = tracemalloc.take_snapshot()
+
+    def elapsed(self):
+        return round(time.monotonic() - self.started, 3)
+
+    def python_memory(self):
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            'traced_bytes': current,
+            'traced_peak_bytes': peak,
+            'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        }
+
+    def phase(self, name, **fields):
+        """Record the Python heap at a phase boundary with the allocation sites that grew most since the last one"""
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+        top = [{
+            'site': str(stat.traceback[0]),
+            'size_diff': stat.size_diff,
+            'size': stat.size,
+            'count_diff': stat.count_diff,
+        } for stat in snapshot.compare_to(self.snapshot, 'lineno')[:self.top_n]]
+        self.snapshot = snapshot
+        entry = {'type': 'phase', 'phase': name, 'elapsed': self.elapsed(), **self.python_memory(), 'top': top}
+        entry.update(fields)
+        self.writer.write(entry)
+        logger.info(f"Memory at {name}: {entry['traced_bytes'] / 1024 / 1024:.1f}MB traced, "
+                    f"{entry['max_rss_kb'] / 1024:.0f}MB max RSS")
+
+    def browser_memory(self, page):
+        """Renderer metrics via CDP Performance.getMetrics, falling back to performance.memory"""
+        try:
+            if self.cdp_page is not page:
+                self.cdp = page.context.new_cdp_session(page)
+                self.cdp.send('Performance.enable')
+                self.cdp_page = page
+            metrics = self.cdp.send('Performance.getMetrics')['metrics']
+            return {metric['name']: metric['value'] for metric in metrics if metric['name'] in CDP_METRICS}
+        except Exception as e:
+            logger.debug(f"CDP metrics unavailable, using performance.memory: {e}")
+            self.cdp_page = None
+            try:
+                return {'JSHeapUsedSize': page.evaluate(JS_HEAP_JS)}
+            except Exception:
+                return {}
+
+    def message(self, page, extracted):
+        """Called after every extracted message; samples both heaps every ``sample_every`` messages"""
+        if not self.sample_every or extracted % self.sample_every:
+            return
+        self.writer.write({
+            'type': 'sample',
+            'elapsed': self.elapsed(),
+            'extracted': extracted,
+            **self.python_memory(),
+            'browser': self.browser_memory(page) if page is not None else {},
+        })
+
+    def close(self):
+        self.phase('end')
+        self.writer.close()
+        tracemalloc.stop()
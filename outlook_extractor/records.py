@@ -0,0 +1,134 @@
+import os
+import json
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+TAIL_SCAN_BYTES = 64 * 1024
+
+
+def truncate_torn_tail(path):
+    """Cut anything after the last newline of path, left there by a crash mid-write; returns bytes dropped"""
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return 0
+    with open(path, 'rb') as f:
+        end = size
+        while end > 0:
+            start = max(0, end - TAIL_SCAN_BYTES)
+            f.seek(start)
+            newline = f.read(end - start).rfind(b'\n')
+            if newline >= 0:
+                good_bytes = start + newline + 1
+                break
+            end = start
+        else:
+            good_bytes = 0
+    if good_bytes != size:
+        logger.warning(f"Dropping torn final record of {path} ({size - good_bytes} bytes)")
+        os.truncate(path, good_bytes)
+    return size - good_bytes
+
+
+class RecordWriter:
+    """Append-only JSONL writer that hands every record to the OS as soon as it is written.
+
+    A partial last line left by a crash is truncated on open, so a resumed
+    run appends after the last complete record instead of onto the torn one.
+    """
+
+    def __init__(self, path, fsync=False):
+        self.path = path
+        self.fsync = fsync
+        self.count = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        truncate_torn_tail(path)
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self.count += 1
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_records(path):
+    """Yield records from a JSONL file one at a time, skipping a torn final line"""
+    if not os.path.exists(path):
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.endswith('\n'):
+                break
+            yield json.loads(line)
+
+
+def iter_records_with_offsets(path, start=0):
+    """Yield (byte offset, record) pairs from start, so a record can later be re-read with read_record_at"""
+    if not os.path.exists(path):
+        return
+    offset = start
+    with open(path, 'rb') as f:
+        f.seek(start)
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            yield offset, json.loads(line)
+            offset += len(line)
+
+
+def read_record_at(f, offset):
+    f.seek(offset)
+    return json.loads(f.readline())
+
+
+class RunDirectory:
+    """Layout of a single extraction run on disk"""
+
+    RECORDS = 'records.jsonl'
+    STATUS = 'status.json'
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    @property
+    def records_path(self):
+        return os.path.join(self.path, self.RECORDS)
+
+    @property
+    def status_path(self):
+        return os.path.join(self.path, self.STATUS)
+
+    def file(self, name):
+        return os.path.join(self.path, name)
+
+    def read_status(self):
+        try:
+            with open(self.status_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def update_status(self, **fields):
+        status = self.read_status()
+        status.update(fields)
+        status['updated_at'] = datetime.utcnow().isoformat()
+        tmp_path = self.status_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(status, f)
+        os.replace(tmp_path, self.status_path)
+        return status
@@ -0,0 +1,290 @@
+import os
+import re
+import sys
+import json
+import time
+import logging
+import argparse
+from datetime import datetime
+from urllib.parse import quote, quote_plus
+
+from playwright.sync_api import sync_playwright
+
+from .bounded import VIEWPORT
+from .calibration import candidate_combinations, time_combination
+from .checkpoint import write_atomic
+from .session import open_mail_view
+from .strategies import LOGIN_STRATEGIES, StrategySet
+
+logger = logging.getLogger(__name__)
+
+# Credentials written into the HAR in place of the real ones; replay logs in with these
+REPLAY_EMAIL = 'replay.user@example.com'
+REPLAY_PASSWORD = 'replay-password'
+# Answers a recorded 2FA prompt; the replayed server accepts whatever is typed
+REPLAY_CODE = '000000'
+REDACTED = 'REDACTED'
+
+SENSITIVE_HEADERS = {'cookie', 'set-cookie', 'authorization', 'x-owa-canary'}
+TOKEN_PATTERN = re.compile(
+    r'((?:access_token|refresh_token|id_token|client_secret|canary)["\']?\s*[:=]\s*["\']?)[^"\'&\s,}]+',
+    re.IGNORECASE,
+)
+
+# Fixed delay added to every replayed request, in seconds
+LATENCY_PROFILES = {
+    'none': 0.0,
+    'lan': 0.005,
+    'broadband': 0.04,
+    'mobile': 0.15,
+    'slow': 0.4,
+}
+
+
+def secret_variants(secret):
+    return {secret, quote(secret, safe=''), quote_plus(secret)}
+
+
+def scrub_value(value, replacements):
+    for secret, placeholder in replacements:
+        if secret in value:
+            value = value.replace(secret, placeholder)
+    return TOKEN_PATTERN.sub(lambda match: match.group(1) + REDACTED, value)
+
+
+def scrub(node, replacements):
+    """Replace credentials and tokens in every string of a HAR, and blank cookies and auth headers"""
+    if isinstance(node, dict):
+        if 'name' in node and 'value' in node and str(node['name']).lower() in SENSITIVE_HEADERS:
+            return dict(node, value=REDACTED)
+        scrubbed = {key: scrub(value, replacements) for key, value in node.items()}
+        if 'cookies' in scrubbed:
+            scrubbed['cookies'] = [dict(cookie, value=REDACTED) for cookie in node['cookies']]
+        return scrubbed
+    if isinstance(node, list):
+        return [scrub(item, replacements) for item in node]
+    if isinstance(node, str):
+        return scrub_value(node, replacements)
+    return node
+
+
+def scrub_har(path, email, password, metadata=None):
+    """Rewrite a recorded HAR in place with the account's credentials replaced by the replay placeholders"""
+    with open(path, 'r', encoding='utf-8') as f:
+        har = json.load(f)
+    replacements = [(variant, REPLAY_PASSWORD) for variant in secret_variants(password)]
+    replacements += [(variant, REPLAY_EMAIL) for variant in secret_variants(email)]
+    # Longest first, so an encoded form is not half-replaced through a shorter variant
+    replacements.sort(key=lambda pair: len(pair[0]), reverse=True)
+    har = scrub(har, replacements)
+    har['log']['_outlook_extractor'] = dict(metadata or {}, scrubbed_at=datetime.utcnow().isoformat())
+    write_atomic(path, [json.dumps(har)])
+    return har
+
+
+def record(har_path, email, password, sender=None, sample_size=5, headless=False):
+    """Log in once and exercise every strategy combination, recording all traffic to a scrubbed HAR"""
+    tmp_path = har_path + '.recording'
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=headless)
+        context = browser.new_context(viewport=VIEWPORT, record_har_path=tmp_path,
+                                      record_har_content='embed', record_har_mode='full')
+        try:
+            page = context.new_page()
+            LOGIN_STRATEGIES['form']().login(page, email, password)
+            page.close()
+            for navigation, scan, capture in candidate_combinations(sender):
+                result = time_combination(context, StrategySet(navigation, scan, capture), sender, sample_size)
+                logger.info(f"Recorded {navigation}/{scan}/{capture}: {result['rows']} rows")
+        finally:
+            context.close()
+            browser.close()
+    scrub_har(tmp_path, email, password, {'sender': sender, 'sample_size': sample_size})
+    os.replace(tmp_path, har_path)
+    logger.info(f"Recorded scrubbed session to {har_path}")
+    return har_path
+
+
+class ReplayContext:
+    """A browser context answered entirely from a HAR, with a fixed latency per request.
+
+    Routes are consulted newest first: the latency route delays each request
+    and falls back to the HAR route, which falls back to an abort route for
+    anything the recording does not contain, so nothing reaches the network.
+    The sync API handles routes one at a time, so the profile models a single
+    slow connection rather than parallel ones.
+    """
+
+    def __init__(self, browser, har_path, latency=0.0):
+        self.latency = latency
+        self.misses = []
+        self.context = browser.new_context(viewport=VIEWPORT)
+        self.context.route('**/*', self.abort_unrecorded)
+        self.context.route_from_har(har_path, not_found='fallback')
+        if latency:
+            self.context.route('**/*', self.delay)
+
+    def abort_unrecorded(self, route):
+        self.misses.append(f"{route.request.method} {route.request.url}")
+        route.abort()
+
+    def delay(self, route):
+        time.sleep(self.latency)
+        route.fallback()
+
+    def close(self):
+        self.context.close()
+
+
+class ReplayCode:
+    """Stands in for ChallengeRendezvous so a recorded 2FA prompt is answered at once instead of waiting on input()"""
+
+    def wait_for_code(self, page, prompt='Enter code', attempt=1):
+        return REPLAY_CODE
+
+
+def time_login(browser, har_path, latency, login):
+    replay = ReplayContext(browser, har_path, latency)
+    result = {'login': login, 'seconds': None, 'error': None}
+    try:
+        page = replay.context.new_page()
+        started = time.monotonic()
+        LOGIN_STRATEGIES[login]().login(page, REPLAY_EMAIL, REPLAY_PASSWORD, two_factor=ReplayCode())
+        result['seconds'] = time.monotonic() - started
+    except Exception as e:
+        result['error'] = str(e)
+    finally:
+        result['unrecorded_requests'] = len(replay.misses)
+        replay.close()
+    return result
+
+
+def time_strategies(har_path, profile='broadband', sample_size=5, headless=True, logins=True):
+    """Time every login strategy and navigation/list scan/capture combination against the recording"""
+    with open(har_path, 'r', encoding='utf-8') as f:
+        metadata = json.load(f)['log'].get('_outlook_extractor', {})
+    sender = metadata.get('sender')
+    latency = LATENCY_PROFILES[profile]
+    results = {}
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=headless)
+        try:
+            if logins:
+                for login in LOGIN_STRATEGIES:
+                    results[f'login:{login}'] = time_login(browser, har_path, latency, login)
+            for navigation, scan, capture in candidate_combinations(sender):
+                strategies = StrategySet(navigation, scan, capture)
+                replay = ReplayContext(browser, har_path, latency)
+                try:
+                    page = replay.context.new_page()
+                    open_mail_view(page)
+                    page.close()
+                    result = time_combination(replay.context, strategies, sender, sample_size)
+                except Exception as e:
+                    result = dict(strategies.describe(), seconds_per_message=None, error=str(e))
+                finally:
+                    replay.close()
+                result['unrecorded_requests'] = len(replay.misses)
+                results[f'{navigation}/{scan}/{capture}'] = result
+                logger.info(f"Replayed {navigation}/{scan}/{capture} ({profile}): "
+                            f"{result['seconds_per_message']} s/message")
+        finally:
+            browser.close()
+    return results
+
+
+def timing(result):
+    """The number a regression is judged on: login time or per-message capture time"""
+    return result.get('seconds') if 'login' in result else result.get('seconds_per_message')
+
+
+def find_regressions(results, baseline, tolerance=0.2, min_delta=0.05):
+    """Entries slower than the baseline by more than ``tolerance`` (and ``min_delta`` seconds), or newly failing"""
+    regressions = []
+    for key, base in baseline.items():
+        current = results.get(key)
+        if current is None:
+            continue
+        before, after = timing(base), timing(current)
+        if before is not None and after is None:
+            regressions.append({'strategy': key, 'baseline': before, 'current': None,
+                                'reason': current.get('error') or 'no longer succeeds'})
+        elif before is not None and after > before * (1 + tolerance) and after - before > min_delta:
+            regressions.append({'strategy': key, 'baseline': before, 'current': after,
+                                'reason': f'{(after / before - 1):.0%} slower'})
+    return regressions
+
+
+def load_baseline(path, profile):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f).get(profile, {})
+    except (OSError, ValueError):
+        return {}
+
+
+def save_baseline(path, profile, results):
+    try:
+        with open(path, 'r') as f:
+            baselines = json.load(f)
+    except (OSError, ValueError):
+        baselines = {}
+    baselines[profile] = results
+    write_atomic(path, [json.dumps(baselines, indent=2)])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Record an Outlook session to a HAR and time strategies against it')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    record_parser = commands.add_parser('record', help='Record a live session (uses OUTLOOK_EMAIL/OUTLOOK_PASSWORD)')
+    record_parser.add_argument('har')
+    record_parser.add_argument('--sender', default='Lynn Gadue')
+    record_parser.add_argument('--sample-size', type=int, default=5)
+    record_parser.add_argument('--headless', action='store_true')
+
+    time_parser = commands.add_parser('time', help='Replay the HAR offline and time every strategy')
+    time_parser.add_argument('har')
+    time_parser.add_argument('--profile', choices=sorted(LATENCY_PROFILES), default='broadband')
+    time_parser.add_argument('--sample-size', type=int, default=5)
+    time_parser.add_argument('--baseline', help='Baseline JSON (default: <har>.baseline.json)')
+    time_parser.add_argument('--update-baseline', action='store_true')
+    time_parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed slowdown before flagging')
+    time_parser.add_argument('--skip-login', action='store_true')
+    time_parser.add_argument('--report', help='Write the timings to this JSON file')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    if args.command == 'record':
+        email = os.environ.get('OUTLOOK_EMAIL')
+        password = os.environ.get('OUTLOOK_PASSWORD')
+        if not email or not password:
+            print("Set OUTLOOK_EMAIL and OUTLOOK_PASSWORD to record a session")
+            return 2
+        record(args.har, email, password, args.sender, args.sample_size, args.headless)
+        return 0
+
+    results = time_strategies(args.har, args.profile, args.sample_size, logins=not args.skip_login)
+    if args.report:
+        write_atomic(args.report, [json.dumps({'profile': args.profile, 'results': results}, indent=2)])
+    for key, result in results.items():
+        print(f"{key}: {timing(result)}")
+
+    baseline_path = args.baseline or args.har + '.baseline.json'
+    if args.update_baseline:
+        save_baseline(baseline_path, args.profile, results)
+        print(f"Baseline for {args.profile} saved to {baseline_path}")
+        return 0
+    baseline = load_baseline(baseline_path, args.profile)
+    if not baseline:
+        print(f"No {args.profile} baseline in {baseline_path}; run with --update-baseline to create one")
+        return 0
+    regressions = find_regressions(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression['strategy']}: {regression['baseline']} -> "
+              f"{regression['current']} ({regression['reason']})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
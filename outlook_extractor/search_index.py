@@ -0,0 +1,162 @@
+import os
+import sys
+import json
+import fcntl
+import shutil
+import struct
+import logging
+import argparse
+
+from .dates import DateParser
+from .metadata import EmailMetadata
+from .records import RunDirectory, iter_records_with_offsets
+
+logger = logging.getLogger(__name__)
+
+# Immutable index file shared read-only (mmap) by the backend's workers; the
+# reader is backend/mmap_index.py and both sides must agree on this layout.
+#
+#   header   MAGIC, generation, count, and the offsets of the sections below
+#   rows     count x ROW sorted by (epoch, id): epoch, record offset, string
+#            offset, run number, id/sender/subject lengths
+#   senders  count x u32 row numbers sorted by (sender, epoch, id)
+#   text     lower-cased "sender subject\n" per row, in row order, searched
+#            with mmap.find; text_starts maps a hit back to its row
+#   strings  id, sender and subject of each row, back to back (UTF-8)
+#   runs     JSON list of run directory names, indexed by a row's run number
+MAGIC = b'OWIDX001'
+HEADER = struct.Struct('<8sQQQQQQQQ')
+ROW = struct.Struct('<qQQIHHH')
+U32 = struct.Struct('<I')
+U64 = struct.Struct('<Q')
+UNDATED = -(1 << 63)
+MAX_FIELD = 0xFFFF
+
+INDEX_DIR = '.index'
+CURRENT = 'CURRENT'
+INDEX_FILE = 'index.bin'
+
+
+def clip(text):
+    """UTF-8 bytes of a field, cut to what a row's u16 length can address"""
+    data = text.encode('utf-8')
+    if len(data) > MAX_FIELD:
+        data = data[:MAX_FIELD].decode('utf-8', 'ignore').encode('utf-8')
+    return data
+
+
+def completed_runs(root):
+    for name in sorted(os.listdir(root)):
+        if name.startswith('.') or not os.path.isdir(os.path.join(root, name)):
+            continue
+        run_dir = RunDirectory(os.path.join(root, name))
+        if run_dir.read_status().get('state') == 'completed' and os.path.exists(run_dir.records_path):
+            yield name, run_dir
+
+
+def collect(root):
+    """Metadata of every message in the completed runs; a message extracted again by a later run replaces the earlier copy"""
+    runs = []
+    latest = {}
+    for name, run_dir in completed_runs(root):
+        run_number = len(runs)
+        runs.append(name)
+        # Runs may belong to accounts with different date locales, so each gets its own parser
+        dates = DateParser()
+        for offset, record in iter_records_with_offsets(run_dir.records_path):
+            latest[record['id']] = (EmailMetadata.from_record(record, offset, dates), run_number)
+    return runs, list(latest.values())
+
+
+def write_index(path, generation, runs, entries):
+    entries.sort(key=lambda entry: (UNDATED if entry[0].epoch is None else entry[0].epoch, entry[0].id))
+    count = len(entries)
+    rows_offset = HEADER.size
+    senders_offset = rows_offset + count * ROW.size
+    text_starts_offset = senders_offset + count * U32.size
+
+    strings = bytearray()
+    text = bytearray()
+    rows = bytearray()
+    text_starts = bytearray()
+    for item, run_number in entries:
+        item_id, sender, subject = clip(item.id), clip(item.sender), clip(item.subject)
+        epoch = UNDATED if item.epoch is None else item.epoch
+        rows += ROW.pack(epoch, item.offset, len(strings), run_number, len(item_id), len(sender), len(subject))
+        strings += item_id + sender + subject
+        text_starts += U64.pack(len(text))
+        text += ' '.join(f'{item.sender} {item.subject}'.split()).lower().encode('utf-8') + b'\n'
+
+    # Rows are already in (epoch, id) order and the sort is stable, so this orders by (sender, epoch, id)
+    by_sender = sorted(range(count), key=lambda row: entries[row][0].sender)
+    senders = b''.join(U32.pack(row) for row in by_sender)
+
+    text_offset = text_starts_offset + count * U64.size
+    strings_offset = text_offset + len(text)
+    runs_offset = strings_offset + len(strings)
+    runs_blob = json.dumps(runs).encode('utf-8')
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, generation, count, senders_offset, text_starts_offset, text_offset,
+                            strings_offset, runs_offset, len(runs_blob)))
+        f.write(rows)
+        f.write(senders)
+        f.write(text_starts)
+        f.write(text)
+        f.write(strings)
+        f.write(runs_blob)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def current_generation(index_root):
+    try:
+        with open(os.path.join(index_root, CURRENT), 'r') as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return 0
+
+
+def build_index(root, keep=2):
+    """Build a new index generation over root's completed runs and publish it.
+
+    The generation is written to its own directory and then named in
+    CURRENT by atomic rename; readers switch on their next check, and older
+    generations are removed once ``keep`` newer ones exist (files a reader
+    still has mapped stay valid until it unmaps them).
+    """
+    index_root = os.path.join(root, INDEX_DIR)
+    os.makedirs(index_root, exist_ok=True)
+    with open(os.path.join(index_root, 'build.lock'), 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        generation = current_generation(index_root) + 1
+        runs, entries = collect(root)
+        generation_dir = os.path.join(index_root, f'gen-{generation}')
+        os.makedirs(generation_dir, exist_ok=True)
+        write_index(os.path.join(generation_dir, INDEX_FILE), generation, runs, entries)
+
+        tmp_path = os.path.join(index_root, CURRENT + '.tmp')
+        with open(tmp_path, 'w') as f:
+            f.write(f'{generation}\n')
+        os.replace(tmp_path, os.path.join(index_root, CURRENT))
+
+        for name in os.listdir(index_root):
+            if name.startswith('gen-') and int(name[4:]) <= generation - keep:
+                shutil.rmtree(os.path.join(index_root, name), ignore_errors=True)
+    logger.info(f"Published search index generation {generation}: {len(entries)} messages from {len(runs)} runs")
+    return generation
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build the shared search index over completed extraction runs')
+    parser.add_argument('root', nargs='?', default=os.environ.get('EXTRACTION_DIR', '/tmp/outlook_extraction'))
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    print(f"Generation {build_index(args.root)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
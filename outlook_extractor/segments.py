@@ -0,0 +1,186 @@
+import os
+import re
+import sys
+import hashlib
+import logging
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from .records import RecordWriter, RunDirectory, iter_records
+
+logger = logging.getLogger(__name__)
+
+NEW = 'new'
+QUOTED = 'quoted'
+SIGNATURE = 'signature'
+
+# Lines that introduce a quoted earlier message: "On ... wrote:", Outlook's
+# "-----Original Message-----" and underscore separators, and a From: header
+# followed within a few lines by Sent: or Date:
+REPLY_HEADER = re.compile(
+    r'^(?:On\s.{1,300}?wrote:[ \t]*$'
+    r'|-{2,}\s*Original Message\s*-{2,}.*$'
+    r'|_{10,}[ \t]*$'
+    r'|From:[ \t].+$(?=(?:\n.*){0,3}\n(?:Sent|Date):))',
+    re.MULTILINE | re.IGNORECASE,
+)
+QUOTE_LINE = re.compile(r'^>', re.MULTILINE)
+QUOTE_PREFIX = re.compile(r'^(?:>[ \t]?)+', re.MULTILINE)
+SIGNATURE_START = re.compile(
+    r'^(?:--[ \t]?$|Sent from my .+$|Get Outlook for .+$)',
+    re.MULTILINE | re.IGNORECASE,
+)
+WHITESPACE = re.compile(r'\s+')
+
+
+def segment_hash(text):
+    """Content hash of a segment, insensitive to whitespace and line wrapping"""
+    return hashlib.sha256(WHITESPACE.sub(' ', text).strip().encode('utf-8')).hexdigest()
+
+
+def split_signature(text, kind):
+    match = SIGNATURE_START.search(text)
+    if match is None:
+        return [(kind, text)]
+    return [(kind, text[:match.start()]), (SIGNATURE, text[match.start():])]
+
+
+def split_body(body):
+    """Split a body into (kind, text) segments: new content, each quoted message, and signatures.
+
+    The quoted history is un-quoted and cut at every reply header, so the
+    earlier messages of a thread become separate segments that hash the same
+    in every reply that repeats them, whatever their quoting depth.
+    """
+    text = body.replace('\r\n', '\n')
+    starts = [match.start() for match in (REPLY_HEADER.search(text), QUOTE_LINE.search(text)) if match]
+    quoted_start = min(starts) if starts else len(text)
+
+    segments = split_signature(text[:quoted_start], NEW)
+    quoted = QUOTE_PREFIX.sub('', text[quoted_start:])
+    cuts = [match.start() for match in REPLY_HEADER.finditer(quoted)]
+    if not cuts or cuts[0] != 0:
+        cuts.insert(0, 0)
+    for start, end in zip(cuts, cuts[1:] + [len(quoted)]):
+        segments.extend(split_signature(quoted[start:end], QUOTED))
+    return [(kind, part.strip()) for kind, part in segments if part.strip()]
+
+
+def split_batch(bodies):
+    """Split a batch of bodies; runs in a worker process"""
+    return [[(kind, segment_hash(part), part) for kind, part in split_body(body)] for body in bodies]
+
+
+class SegmentStore:
+    """Stores each distinct segment once and every message as a list of segment references.
+
+    ``segments.jsonl`` holds {hash, kind, text} the first time a segment is
+    seen; ``messages.jsonl`` holds each record without its body and with the
+    ordered segment hashes instead. Hashes and message ids already stored are
+    reloaded on open, so a resumed run does not store them again.
+    """
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        segments_path = os.path.join(directory, 'segments.jsonl')
+        self.known = {segment['hash'] for segment in iter_records(segments_path)}
+        messages_path = os.path.join(directory, 'messages.jsonl')
+        self.message_ids = {message['id'] for message in iter_records(messages_path)}
+        self.segments = RecordWriter(segments_path)
+        self.messages = RecordWriter(messages_path)
+        self.body_chars = 0
+        self.stored_chars = 0
+
+    def write(self, record, segments):
+        self.body_chars += len(record.get('body') or '')
+        for kind, digest, text in segments:
+            if digest not in self.known:
+                self.known.add(digest)
+                self.segments.write({'hash': digest, 'kind': kind, 'text': text})
+                self.stored_chars += len(text)
+        reference = {key: value for key, value in record.items() if key not in ('body', 'body_html')}
+        reference['segments'] = [digest for kind, digest, text in segments]
+        self.messages.write(reference)
+        self.message_ids.add(record['id'])
+
+    def close(self):
+        self.segments.close()
+        self.messages.close()
+        if self.body_chars:
+            logger.info(f"Segments: {self.messages.count} messages, {len(self.known)} distinct segments, "
+                        f"{self.stored_chars / self.body_chars:.0%} of body text stored")
+
+
+class SegmentPipeline:
+    """Batches records into a process pool for splitting and writes results in arrival order.
+
+    ``write`` only buffers; a full batch is submitted to the pool and finished
+    batches are drained at the head of the queue, so the caller blocks only
+    when ``max_pending`` batches are already in flight. ``flush`` waits until
+    every record written so far is in the store.
+    """
+
+    def __init__(self, store, batch_size=200, workers=None):
+        self.store = store
+        self.batch_size = batch_size
+        workers = workers or os.cpu_count() or 1
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self.max_pending = workers * 2
+        self.batch = []
+        self.pending = deque()
+
+    def write(self, record):
+        self.batch.append(record)
+        if len(self.batch) >= self.batch_size:
+            self.submit()
+
+    def submit(self):
+        if not self.batch:
+            return
+        batch, self.batch = self.batch, []
+        self.pending.append((batch, self.pool.submit(split_batch, [record.get('body') or '' for record in batch])))
+        self.drain(block=len(self.pending) >= self.max_pending)
+
+    def drain(self, block=False):
+        while self.pending and (block or self.pending[0][1].done()):
+            batch, future = self.pending.popleft()
+            for record, segments in zip(batch, future.result()):
+                self.store.write(record, segments)
+            block = False
+
+    def flush(self):
+        self.submit()
+        while self.pending:
+            self.drain(block=True)
+
+    def close(self):
+        self.flush()
+        self.pool.shutdown()
+        self.store.close()
+
+
+def segment_run(run_dir, batch_size=200, workers=None):
+    store = SegmentStore(run_dir.file('segments'))
+    pipeline = SegmentPipeline(store, batch_size, workers)
+    for record in iter_records(run_dir.records_path):
+        pipeline.write(record)
+    pipeline.close()
+    return store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Split bodies of a run into new, quoted and signature segments')
+    parser.add_argument('run_dir')
+    parser.add_argument('--batch-size', type=int, default=200)
+    parser.add_argument('--workers', type=int)
+    args = parser.parse_args(argv)
+
+    store = segment_run(RunDirectory(args.run_dir), args.batch_size, args.workers)
+    print(f"{store.messages.count} messages, {len(store.known)} distinct segments, "
+          f"{store.stored_chars}/{store.body_chars} body characters stored")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
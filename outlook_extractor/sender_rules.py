@@ -0,0 +1,102 @@
+import os
+import csv
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class SenderRule:
+    """One sender pattern and the output it routes matches to"""
+
+    __slots__ = ('pattern', 'output')
+
+    def __init__(self, pattern, output):
+        self.pattern = pattern
+        self.output = output
+
+    def __repr__(self):
+        return f"SenderRule({self.pattern!r}, {self.output!r})"
+
+
+def normalize_pattern(pattern):
+    """Lower-case a rule pattern; '*@example.com' and '@example.com' both match the domain"""
+    pattern = pattern.strip().lower()
+    if pattern.startswith('*@'):
+        pattern = pattern[1:]
+    return pattern
+
+
+class SenderAutomaton:
+    """Aho-Corasick automaton over sender names, addresses and '@domain' patterns.
+
+    All patterns are compiled into one trie with failure links, so a row's
+    text is matched against every rule in a single left-to-right pass whose
+    cost depends on the text length, not on how many senders are listed.
+    """
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self.goto = [{}]
+        self.fail = [0]
+        self.outputs = [[]]
+        for rule_index, rule in enumerate(self.rules):
+            self._insert(normalize_pattern(rule.pattern), rule_index)
+        self._link()
+
+    def _insert(self, pattern, rule_index):
+        state = 0
+        for char in pattern:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][char] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.outputs.append([])
+            state = next_state
+        self.outputs[state].append(rule_index)
+
+    def _link(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                if self.fail[next_state] == next_state:
+                    self.fail[next_state] = 0
+                self.outputs[next_state] = self.outputs[next_state] + self.outputs[self.fail[next_state]]
+
+    def match(self, text):
+        """Return the rules whose pattern occurs in text, in rule order"""
+        goto = self.goto
+        fail = self.fail
+        outputs = self.outputs
+        state = 0
+        matched = set()
+        for char in text.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if outputs[state]:
+                matched.update(outputs[state])
+        return [self.rules[index] for index in sorted(matched)]
+
+
+def load_rules(path):
+    """Read rules from a CSV file of ``pattern,output`` rows; a plain list of patterns also works"""
+    rules = []
+    default_output = os.path.splitext(os.path.basename(path))[0]
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.reader(f):
+            if not row or not row[0].strip() or row[0].startswith('#'):
+                continue
+            pattern = row[0].strip()
+            output = row[1].strip() if len(row) > 1 and row[1].strip() else default_output
+            rules.append(SenderRule(pattern, output))
+    logger.info(f"Loaded {len(rules)} sender rules from {path}")
+    return rules
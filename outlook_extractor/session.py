@@ -0,0 +1,177 @@
+import time
+import logging
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from .twofactor import TwoFactorTimeout
+
+logger = logging.getLogger(__name__)
+
+OUTLOOK_URL = "https://outlook.office365.com/"
+MAIL_URL = "https://outlook.office365.com/mail/"
+
+CODE_PROMPT = "text=Enter code"
+CODE_INPUT = 'input[name="otc"], input[autocomplete="one-time-code"], input[type="tel"]'
+MAX_CODE_ATTEMPTS = 3
+
+
+def retry_operation(operation, max_retries=3, delay=2, fatal=()):
+    """Run operation, retrying with backoff; exceptions in ``fatal`` are raised at once"""
+    for attempt in range(max_retries):
+        try:
+            return operation()
+        except fatal:
+            raise
+        except Exception as e:
+            if attempt == max_retries - 1:
+                raise e
+            logger.warning(f"Attempt {attempt + 1} failed: {e}")
+            logger.info(f"Retrying in {delay} seconds...")
+            time.sleep(delay)
+            delay *= 2
+
+
+def wait_for_load(page, timeout=30):
+    """Wait until the page reaches network idle, or give up after timeout seconds"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            page.wait_for_load_state("networkidle", timeout=5000)
+            page.wait_for_load_state("domcontentloaded", timeout=5000)
+            return True
+        except Exception as e:
+            logger.debug(f"Still loading... ({str(e)})")
+            time.sleep(1)
+    return False
+
+
+def handle_code_prompt(page, two_factor=None, timeout=10000):
+    """Answer a 2FA "Enter code" prompt if one appears; returns whether there was one.
+
+    With a ChallengeRendezvous the code comes from the run's challenge
+    (asked again if Microsoft rejects it); without one, the code is typed
+    into the visible browser by hand as before.
+    """
+    try:
+        page.wait_for_selector(CODE_PROMPT, timeout=timeout)
+    except Exception:
+        logger.debug("No 2FA prompt detected")
+        return False
+
+    if two_factor is None:
+        print("\n*** 2FA Required ***")
+        print("Please enter the authentication code manually")
+        input("Press Enter after entering the code...")
+        return True
+
+    prompt = "Enter code"
+    for attempt in range(1, MAX_CODE_ATTEMPTS + 1):
+        code = two_factor.wait_for_code(page, prompt, attempt)
+        page.fill(CODE_INPUT, code)
+        page.keyboard.press("Enter")
+        try:
+            page.wait_for_selector(CODE_INPUT, state="detached", timeout=15000)
+            return True
+        except Exception:
+            prompt = "The code was not accepted; enter a new one"
+    raise TwoFactorTimeout(f"2FA code rejected {MAX_CODE_ATTEMPTS} times")
+
+
+def login_to_outlook(page, email, password, two_factor=None):
+    """Sign in to Outlook on the web and wait for the mailbox to load"""
+    def _login():
+        logger.info("Logging in to Outlook...")
+        page.goto(OUTLOOK_URL, wait_until="networkidle")
+        wait_for_load(page)
+
+        sign_in = page.locator("text=Sign in")
+        if sign_in.count() and sign_in.first.is_visible():
+            sign_in.first.click()
+
+        page.wait_for_selector("input[type='email']", timeout=10000).fill(email)
+        page.keyboard.press("Enter")
+
+        page.wait_for_selector("input[type='password']", timeout=10000).fill(password)
+        page.keyboard.press("Enter")
+
+        handle_code_prompt(page, two_factor)
+
+        wait_for_load(page)
+        page.wait_for_selector('div[role="list"]', timeout=60000)
+        return True
+
+    # A login that ran out of time for its code is not retried: that would only ask for another one
+    return retry_operation(_login, fatal=(TwoFactorTimeout,))
+
+
+def cookie_matches(cookie, url):
+    """Whether a browser would send this Playwright cookie to url (domain, path and Secure rules)"""
+    parts = urllib.parse.urlsplit(url)
+    host = (parts.hostname or '').lower()
+    domain = (cookie.get('domain') or '').lower()
+    if domain.startswith('.'):
+        if host != domain[1:] and not host.endswith(domain):
+            return False
+    elif host != domain:
+        return False
+    path = cookie.get('path') or '/'
+    request_path = parts.path or '/'
+    if path != '/' and request_path != path and not request_path.startswith(path.rstrip('/') + '/'):
+        return False
+    return not cookie.get('secure') or parts.scheme == 'https'
+
+
+def cookie_header(cookies, url):
+    """Build the Cookie header a browser would send to url from Playwright context cookies.
+
+    Only cookies whose domain, path and Secure flag match url are included,
+    so plain HTTP clients share the session without leaking it to other hosts.
+    """
+    return '; '.join(f"{c['name']}={c['value']}" for c in cookies if cookie_matches(c, url))
+
+
+class SessionCookieHandler(urllib.request.BaseHandler):
+    """Adds the matching session cookies to every request an opener sends, redirect hops included.
+
+    The header is unredirected, so urllib does not copy it onto a redirect;
+    each hop gets only the cookies its own URL matches.
+    """
+
+    def __init__(self, cookies):
+        self.cookies = cookies
+
+    def http_request(self, request):
+        cookies = cookie_header(self.cookies, request.full_url)
+        if cookies:
+            request.add_unredirected_header('Cookie', cookies)
+        return request
+
+    https_request = http_request
+
+
+class GuardedRedirectHandler(urllib.request.HTTPRedirectHandler):
+    """Follows a redirect only if ``allow_url`` accepts its target"""
+
+    def __init__(self, allow_url):
+        self.allow_url = allow_url
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        if not self.allow_url(newurl):
+            raise urllib.error.HTTPError(newurl, code, f"Refusing redirect to {newurl}", headers, fp)
+        return super().redirect_request(req, fp, code, msg, headers, newurl)
+
+
+def session_opener(cookies, allow_url=None):
+    """A urllib opener carrying the browser session, optionally refusing redirects outside ``allow_url``"""
+    handlers = [SessionCookieHandler(cookies)]
+    if allow_url:
+        handlers.append(GuardedRedirectHandler(allow_url))
+    return urllib.request.build_opener(*handlers)
+
+
+def open_mail_view(page):
+    """Load the mail view on an already authenticated page"""
+    page.goto(MAIL_URL, wait_until="domcontentloaded")
+    page.wait_for_selector('div[role="list"]', timeout=60000)
+    wait_for_load(page, timeout=10)
@@ -0,0 +1,64 @@
+"""Pluggable login, navigation, list scan, body capture and output strategies."""
+
+from .base import (
+    CaptureStrategy,
+    ListScanStrategy,
+    LoginStrategy,
+    NavigationStrategy,
+    OutputStrategy,
+)
+from .capture import ClipboardCapture, InnerTextCapture, StructuredCapture
+from .listscan import AllRowsScan, SenderRulesScan, SenderTextScan, row_id
+from .login import FormLogin, PromptLogin
+from .navigation import DirectNavigation, FilterMenuNavigation, MailLinkNavigation, SearchNavigation
+from .output import DedupOutput, JsonlOutput, ParquetOutput, RoutedOutput, SegmentOutput, TextOutput
+
+LOGIN_STRATEGIES = {cls.name: cls for cls in (FormLogin, PromptLogin)}
+NAVIGATION_STRATEGIES = {cls.name: cls for cls in (
+    DirectNavigation, MailLinkNavigation, SearchNavigation, FilterMenuNavigation)}
+LIST_SCAN_STRATEGIES = {cls.name: cls for cls in (SenderTextScan, AllRowsScan, SenderRulesScan)}
+CAPTURE_STRATEGIES = {cls.name: cls for cls in (StructuredCapture, InnerTextCapture, ClipboardCapture)}
+OUTPUT_STRATEGIES = {cls.name: cls for cls in (
+    JsonlOutput, TextOutput, ParquetOutput, RoutedOutput, DedupOutput, SegmentOutput)}
+
+
+def resolve(registry, strategy):
+    """Accept a registered strategy name or an already configured strategy instance"""
+    if isinstance(strategy, str):
+        return registry[strategy]()
+    return strategy
+
+
+class StrategySet:
+    """The navigation, list scan and capture strategies a run uses, plus its extra outputs"""
+
+    def __init__(self, navigation='direct', list_scan='sender-text', capture='structured', outputs=()):
+        self.navigation = resolve(NAVIGATION_STRATEGIES, navigation)
+        self.list_scan = resolve(LIST_SCAN_STRATEGIES, list_scan)
+        self.capture = resolve(CAPTURE_STRATEGIES, capture)
+        self.outputs = [JsonlOutput()] + [OUTPUT_STRATEGIES[name]() for name in outputs if name != 'jsonl']
+
+    def describe(self):
+        return {
+            'navigation': self.navigation.name,
+            'list_scan': self.list_scan.name,
+            'capture': self.capture.name,
+            'outputs': [output.name for output in self.outputs],
+        }
+
+
+__all__ = [
+    'CAPTURE_STRATEGIES',
+    'LIST_SCAN_STRATEGIES',
+    'LOGIN_STRATEGIES',
+    'NAVIGATION_STRATEGIES',
+    'OUTPUT_STRATEGIES',
+    'CaptureStrategy',
+    'ListScanStrategy',
+    'LoginStrategy',
+    'NavigationStrategy',
+    'OutputStrategy',
+    'SenderRulesScan',
+    'StrategySet',
+    'row_id',
+]
@@ -0,0 +1,53 @@
+class Strategy:
+    """Base for pluggable extraction steps; ``name`` is the key used on the command line"""
+
+    name = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.name!r})"
+
+
+class LoginStrategy(Strategy):
+    def login(self, page, email, password, two_factor=None):
+        """Sign in on page and return once the mailbox is usable; 2FA codes come from two_factor when given"""
+        raise NotImplementedError
+
+
+class NavigationStrategy(Strategy):
+    # True when the resulting list only holds the requested sender's mail
+    narrows_to_sender = False
+
+    def open(self, page, sender=None):
+        """Bring page to a message list, narrowed to sender where the strategy can"""
+        raise NotImplementedError
+
+
+class ListScanStrategy(Strategy):
+    def rows(self, page, sender=None):
+        """Return info dicts for the rendered list rows worth opening"""
+        raise NotImplementedError
+
+
+class CaptureStrategy(Strategy):
+    def capture(self, page, attachments=False):
+        """Return the open message as a dict with from/to/cc/subject/date/html/text/attachments"""
+        raise NotImplementedError
+
+
+class OutputStrategy(Strategy):
+    def open(self, run_dir):
+        pass
+
+    def write(self, record):
+        raise NotImplementedError
+
+    def flush(self):
+        """Persist everything written so far; runs before the checkpoint commits the ids written"""
+        pass
+
+    def recover(self, records):
+        """Take records a crashed session logged after its last commit; outputs that write at once have them"""
+        pass
+
+    def close(self):
+        pass
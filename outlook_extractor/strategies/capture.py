@@ -0,0 +1,59 @@
+import logging
+
+from ..inpage import extract_message
+from .base import CaptureStrategy
+
+logger = logging.getLogger(__name__)
+
+
+def text_only(text):
+    return {'from': '', 'to': [], 'cc': [], 'subject': '', 'date': '', 'html': '', 'text': text,
+            'attachments': []}
+
+
+class StructuredCapture(CaptureStrategy):
+    """One injected evaluate returning headers, HTML and layout-free text"""
+
+    name = 'structured'
+
+    def capture(self, page, attachments=False):
+        return extract_message(page, attachments=attachments)
+
+
+class InnerTextCapture(CaptureStrategy):
+    """Try the v6/v7 content selectors in turn and read innerText"""
+
+    name = 'inner-text'
+
+    SELECTORS = [
+        'div[role="document"]',
+        'div[role="main"]',
+        '[role="region"]',
+        '[aria-label="Message body"]',
+    ]
+
+    def capture(self, page, attachments=False):
+        page.wait_for_selector(self.SELECTORS[0], timeout=10000)
+        for selector in self.SELECTORS:
+            content = page.locator(selector)
+            if content.count() and content.first.is_visible():
+                return text_only(content.first.inner_text())
+        raise Exception("Could not find email content")
+
+
+class ClipboardCapture(CaptureStrategy):
+    """Select-all and copy into the system clipboard (v19); needs a headed browser"""
+
+    name = 'clipboard'
+
+    def capture(self, page, attachments=False):
+        import pyperclip
+
+        page.wait_for_selector('div[role="document"]', timeout=10000)
+        page.locator('div[role="document"]').first.click()
+        page.keyboard.press("Control+a")
+        page.keyboard.press("Control+c")
+        content = pyperclip.paste()
+        if not content:
+            raise Exception("Clipboard was empty")
+        return text_only(content)
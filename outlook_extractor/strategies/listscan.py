@@ -0,0 +1,72 @@
+import hashlib
+
+from ..sender_rules import SenderAutomaton
+from .base import ListScanStrategy
+
+LIST_ITEM_SELECTOR = 'div[role="listitem"]'
+
+# Reads every rendered row in one round trip instead of holding an ElementHandle per row
+ROWS_INFO_JS = """rows => rows.map((el, index) => {
+    const heading = el.querySelector('div[role="heading"]');
+    const dated = el.querySelector('div[title*="/"]');
+    const sender = el.querySelector('span[title*="@"]');
+    return {
+        index: index,
+        id: el.getAttribute('data-item-id') || el.getAttribute('data-convid') || el.id || '',
+        text: el.textContent || '',
+        subject: heading ? heading.textContent.trim() : 'No subject',
+        date: dated ? dated.getAttribute('title') : 'Date unknown',
+        sender: sender ? sender.getAttribute('title') : '',
+    };
+})"""
+
+
+def row_id(info):
+    """Stable id for a list row, falling back to a digest of its visible text"""
+    if info.get('id'):
+        return info['id']
+    digest = hashlib.sha1(f"{info['subject']}|{info['date']}|{info['text']}".encode('utf-8'))
+    return 'row-' + digest.hexdigest()[:20]
+
+
+class SenderTextScan(ListScanStrategy):
+    """Batch-read the rows and keep those whose text mentions the sender (v19)"""
+
+    name = 'sender-text'
+
+    def rows(self, page, sender=None):
+        rows = page.locator(LIST_ITEM_SELECTOR).evaluate_all(ROWS_INFO_JS)
+        if not sender:
+            return rows
+        return [info for info in rows if sender in info['text']]
+
+
+class AllRowsScan(ListScanStrategy):
+    """Take every row; for navigation that already narrowed the list by search or filter"""
+
+    name = 'all'
+
+    def rows(self, page, sender=None):
+        return page.locator(LIST_ITEM_SELECTOR).evaluate_all(ROWS_INFO_JS)
+
+
+class SenderRulesScan(ListScanStrategy):
+    """Match rows against many sender rules at once and tag each row with the outputs of its rules"""
+
+    name = 'sender-rules'
+
+    def __init__(self, rules=()):
+        self.automaton = SenderAutomaton(rules)
+
+    def outputs_for(self, text):
+        """Outputs of the rules matching text; empty when none does"""
+        return sorted({rule.output for rule in self.automaton.match(text)})
+
+    def rows(self, page, sender=None):
+        matched = []
+        for info in page.locator(LIST_ITEM_SELECTOR).evaluate_all(ROWS_INFO_JS):
+            outputs = self.outputs_for(f"{info['sender']} {info['text']}")
+            if outputs:
+                info['outputs'] = outputs
+                matched.append(info)
+        return matched
@@ -0,0 +1,66 @@
+import logging
+
+from ..session import handle_code_prompt, login_to_outlook, retry_operation, wait_for_load, OUTLOOK_URL
+from ..twofactor import TwoFactorTimeout
+from .base import LoginStrategy
+
+logger = logging.getLogger(__name__)
+
+# Interstitials seen between password and inbox ("Stay signed in?", consent pages, ...)
+PROMPT_SELECTORS = [
+    "text=Stay signed in",
+    'button:has-text("Yes")',
+    'button:has-text("Next")',
+    'button:has-text("Continue")',
+    "text=I agree",
+    "text=Accept",
+    'button:has-text("Skip")',
+    "text=Not now",
+]
+
+
+class FormLogin(LoginStrategy):
+    """Email, password and an optional 2FA code, as in the v3-v7 scripts"""
+
+    name = 'form'
+
+    def login(self, page, email, password, two_factor=None):
+        return login_to_outlook(page, email, password, two_factor)
+
+
+class PromptLogin(LoginStrategy):
+    """Form login that also clicks through post-password prompts until the inbox appears"""
+
+    name = 'prompts'
+
+    def __init__(self, max_prompt_checks=5):
+        self.max_prompt_checks = max_prompt_checks
+
+    def handle_prompt(self, page):
+        for selector in PROMPT_SELECTORS:
+            element = page.locator(selector)
+            if element.count() and element.first.is_visible():
+                logger.debug(f"Clicking prompt: {selector}")
+                element.first.click()
+                return True
+        return False
+
+    def login(self, page, email, password, two_factor=None):
+        def _login():
+            page.goto(OUTLOOK_URL, wait_until="networkidle")
+            page.wait_for_selector("input[type='email']", timeout=10000).fill(email)
+            page.keyboard.press("Enter")
+            page.wait_for_selector("input[type='password']", timeout=10000).fill(password)
+            page.keyboard.press("Enter")
+            handle_code_prompt(page, two_factor, timeout=5000)
+            for _ in range(self.max_prompt_checks):
+                self.handle_prompt(page)
+                try:
+                    page.wait_for_selector('div[role="list"]', timeout=5000)
+                    wait_for_load(page)
+                    return True
+                except Exception:
+                    continue
+            raise Exception("Failed to reach inbox after handling prompts")
+
+        return retry_operation(_login, fatal=(TwoFactorTimeout,))
@@ -0,0 +1,106 @@
+import logging
+
+from ..session import open_mail_view, wait_for_load
+from .base import NavigationStrategy
+
+logger = logging.getLogger(__name__)
+
+LIST_ITEM_SELECTOR = 'div[role="listitem"]'
+
+
+def first_visible(page, selectors):
+    for selector in selectors:
+        element = page.locator(selector)
+        if element.count() and element.first.is_visible():
+            return element.first
+    return None
+
+
+class DirectNavigation(NavigationStrategy):
+    """Load the mail URL directly and use the inbox as listed"""
+
+    name = 'direct'
+
+    def open(self, page, sender=None):
+        open_mail_view(page)
+
+
+class MailLinkNavigation(NavigationStrategy):
+    """Click the Mail entry in the app bar (v6/v7)"""
+
+    name = 'mail-link'
+
+    SELECTORS = [
+        "a:has-text('Mail')",
+        "[aria-label='Mail']",
+        "[title='Mail']",
+    ]
+
+    def open(self, page, sender=None):
+        link = first_visible(page, self.SELECTORS)
+        if not link:
+            raise Exception("Could not find Mail navigation link")
+        link.click()
+        page.wait_for_selector(LIST_ITEM_SELECTOR, timeout=30000)
+        wait_for_load(page, timeout=10)
+
+
+class SearchNavigation(NavigationStrategy):
+    """Run a ``from:<sender>`` search so the list only holds that sender's mail (v3-v5)"""
+
+    name = 'search'
+    narrows_to_sender = True
+
+    SELECTORS = [
+        "input[aria-label='Search']",
+        "input[placeholder='Search']",
+        "[role='searchbox']",
+        "input[type='search']",
+        "[aria-label*='search' i]",
+    ]
+
+    def open(self, page, sender=None):
+        open_mail_view(page)
+        if not sender:
+            return
+        search_box = first_visible(page, self.SELECTORS)
+        if not search_box:
+            raise Exception("Could not find search bar")
+        search_box.click()
+        search_box.fill(f"from:{sender}")
+        search_box.press("Enter")
+        page.wait_for_selector(LIST_ITEM_SELECTOR, timeout=30000)
+        wait_for_load(page, timeout=10)
+
+
+class FilterMenuNavigation(NavigationStrategy):
+    """Narrow the list with the Filter > From menu (v7)"""
+
+    name = 'filter'
+    narrows_to_sender = True
+
+    FILTER_SELECTORS = [
+        "button:has-text('Filter')",
+        "[aria-label='Filter']",
+    ]
+    SENDER_SELECTORS = [
+        "button:has-text('From')",
+        "[aria-label='Filter by sender']",
+    ]
+
+    def open(self, page, sender=None):
+        open_mail_view(page)
+        if not sender:
+            return
+        filter_button = first_visible(page, self.FILTER_SELECTORS)
+        if not filter_button:
+            raise Exception("Could not find filter menu")
+        filter_button.click()
+        sender_option = first_visible(page, self.SENDER_SELECTORS)
+        if not sender_option:
+            raise Exception("Could not find sender filter")
+        sender_option.click()
+        page.locator("input[type='text']").first.fill(sender)
+        page.keyboard.press("Enter")
+        page.wait_for_selector(LIST_ITEM_SELECTOR, timeout=30000)
+        wait_for_load(page, timeout=10)
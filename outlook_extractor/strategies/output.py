@@ -0,0 +1,141 @@
+import os
+from datetime import datetime
+
+from ..records import RecordWriter
+from .base import OutputStrategy
+
+
+class JsonlOutput(OutputStrategy):
+    """Canonical record log (records.jsonl); always enabled"""
+
+    name = 'jsonl'
+
+    def open(self, run_dir):
+        self.writer = RecordWriter(run_dir.records_path)
+
+    def write(self, record):
+        self.writer.write(record)
+
+    def close(self):
+        self.writer.close()
+
+
+class TextOutput(OutputStrategy):
+    """Appends each record in the plain text layout of the v19 script"""
+
+    name = 'text'
+
+    def open(self, run_dir):
+        path = run_dir.file('emails.txt')
+        self._file = open(path, 'a', encoding='utf-8')
+        if self._file.tell() == 0:
+            self._file.write('\n'.join([
+                "=" * 80,
+                "EXTRACTED EMAILS",
+                f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+                "=" * 80,
+                "",
+                "",
+            ]))
+
+    def write(self, record):
+        self._file.write('\n'.join([
+            "-" * 80,
+            f"Subject: {record['subject']}",
+            f"Date: {record['date']}",
+            "-" * 40,
+            record['body'],
+            "-" * 80,
+            "",
+            "",
+        ]))
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetOutput(OutputStrategy):
+    """Streams record metadata into <run>/parquet as row groups while the run progresses, one part file per session"""
+
+    name = 'parquet'
+
+    def open(self, run_dir):
+        from ..columnar import ParquetDatasetWriter
+
+        # One part file per session: ParquetWriter truncates, and a resumed run must keep the rows written before
+        session = datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')
+        part_name = f"part-{os.path.basename(os.path.normpath(run_dir.path))}-{session}"
+        self.writer = ParquetDatasetWriter(run_dir.file('parquet'), run_dir.read_status().get('account'),
+                                           part_name=part_name, bodies=True)
+
+    def write(self, record):
+        self.writer.write(record)
+
+    def close(self):
+        self.writer.close()
+
+
+class RoutedOutput(OutputStrategy):
+    """Writes each record to <run>/routes/<output>.jsonl for every output its sender rules routed it to"""
+
+    name = 'routes'
+
+    def open(self, run_dir):
+        self.directory = run_dir.file('routes')
+        self.writers = {}
+
+    def write(self, record):
+        for output in record.get('outputs', ()):
+            writer = self.writers.get(output)
+            if writer is None:
+                writer = RecordWriter(os.path.join(self.directory, f'{output}.jsonl'))
+                self.writers[output] = writer
+            writer.write(record)
+
+    def close(self):
+        for writer in self.writers.values():
+            writer.close()
+
+
+class DedupOutput(OutputStrategy):
+    """Clusters near-duplicate bodies as they arrive; <run>/dedup keeps one body per cluster plus references"""
+
+    name = 'dedup'
+
+    def open(self, run_dir):
+        from ..dedup import DedupWriter
+
+        self.writer = DedupWriter(run_dir.file('dedup'))
+
+    def write(self, record):
+        self.writer.write(record)
+
+    def close(self):
+        self.writer.close()
+
+
+class SegmentOutput(OutputStrategy):
+    """Splits bodies into new, quoted and signature segments in a process pool; <run>/segments stores each once"""
+
+    name = 'segments'
+
+    def open(self, run_dir):
+        from ..segments import SegmentPipeline, SegmentStore
+
+        self.pipeline = SegmentPipeline(SegmentStore(run_dir.file('segments')))
+
+    def write(self, record):
+        self.pipeline.write(record)
+
+    def flush(self):
+        self.pipeline.flush()
+
+    def recover(self, records):
+        for record in records:
+            if record['id'] not in self.pipeline.store.message_ids:
+                self.pipeline.write(record)
+        self.pipeline.flush()
+
+    def close(self):
+        self.pipeline.close()
@@ -0,0 +1,137 @@
+import os
+import sys
+import json
+import time
+import uuid
+import logging
+import argparse
+from datetime import datetime, timedelta
+
+from .records import RunDirectory
+
+logger = logging.getLogger(__name__)
+
+# The pending challenge published by the extractor, and the answer written next to it
+CHALLENGE_FILE = 'challenge.json'
+CODE_FILE = 'challenge.code'
+AWAITING_STATE = 'awaiting_2fa'
+
+
+class TwoFactorTimeout(Exception):
+    pass
+
+
+def write_json(path, data):
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def read_json(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def submit_code(run_path, challenge_id, code):
+    """Answer a pending challenge; returns False if it is not the one pending (answered, expired or replaced)"""
+    challenge = read_json(os.path.join(run_path, CHALLENGE_FILE))
+    if not challenge or challenge.get('state') != 'pending' or challenge.get('id') != challenge_id:
+        return False
+    write_json(os.path.join(run_path, CODE_FILE), {'id': challenge_id, 'code': code})
+    return True
+
+
+class ChallengeRendezvous:
+    """Hands a 2FA code prompt to whoever watches the run, instead of blocking on the terminal.
+
+    The extractor publishes ``challenge.json`` in its run directory and sets
+    the run's state to awaiting_2fa, so the backend can show the prompt and
+    take the code through its API, and other jobs carry on meanwhile. The
+    login waits on the page (keeping the browser session alive) until the
+    code file for this challenge appears or ``timeout`` seconds pass.
+    """
+
+    def __init__(self, run_dir, timeout=300, poll_interval=1.0):
+        self.run_dir = run_dir
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+
+    @property
+    def challenge_path(self):
+        return self.run_dir.file(CHALLENGE_FILE)
+
+    @property
+    def code_path(self):
+        return self.run_dir.file(CODE_FILE)
+
+    def publish(self, prompt, attempt):
+        now = datetime.utcnow()
+        challenge = {
+            'id': uuid.uuid4().hex,
+            'state': 'pending',
+            'prompt': prompt,
+            'attempt': attempt,
+            'created_at': now.isoformat(),
+            'expires_at': (now + timedelta(seconds=self.timeout)).isoformat(),
+        }
+        if os.path.exists(self.code_path):
+            os.remove(self.code_path)
+        write_json(self.challenge_path, challenge)
+        self.run_dir.update_status(state=AWAITING_STATE, challenge={key: challenge[key] for key in (
+            'id', 'prompt', 'attempt', 'expires_at')})
+        logger.info(f"2FA code requested (challenge {challenge['id']}, attempt {attempt}); "
+                    f"waiting up to {self.timeout}s for it")
+        return challenge
+
+    def take_code(self, challenge_id):
+        answer = read_json(self.code_path)
+        if not answer or answer.get('id') != challenge_id or not answer.get('code'):
+            return None
+        os.remove(self.code_path)
+        return str(answer['code']).strip()
+
+    def resolve(self, challenge, state):
+        write_json(self.challenge_path, dict(challenge, state=state, resolved_at=datetime.utcnow().isoformat()))
+        self.run_dir.update_status(state='running', challenge=None)
+
+    def wait_for_code(self, page, prompt='Enter code', attempt=1):
+        """The code submitted for a newly published challenge; raises TwoFactorTimeout"""
+        challenge = self.publish(prompt, attempt)
+        deadline = time.monotonic() + self.timeout
+        try:
+            while time.monotonic() < deadline:
+                code = self.take_code(challenge['id'])
+                if code:
+                    self.resolve(challenge, 'answered')
+                    return code
+                # Waiting through Playwright keeps the session's event loop serviced while parked
+                page.wait_for_timeout(self.poll_interval * 1000)
+        except BaseException:
+            self.resolve(challenge, 'abandoned')
+            raise
+        self.resolve(challenge, 'expired')
+        raise TwoFactorTimeout(f"No 2FA code submitted within {self.timeout}s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Answer a run's pending 2FA challenge from the shell")
+    parser.add_argument('run_dir', help='Run directory of the waiting extraction')
+    parser.add_argument('code', help='The code shown by the authenticator or sent by SMS')
+    args = parser.parse_args(argv)
+    challenge = read_json(RunDirectory(args.run_dir).file(CHALLENGE_FILE))
+    if not challenge or challenge.get('state') != 'pending':
+        print("No 2FA challenge is pending for this run")
+        return 1
+    if not submit_code(args.run_dir, challenge['id'], args.code):
+        print("The challenge was answered or expired meanwhile")
+        return 1
+    print(f"Code submitted for challenge {challenge['id']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,24 @@
+from outlook_extractor.bounded import BoundedMemoryExtractor
+from outlook_extractor.records import RunDirectory
+
+
+class HeapCountingExtractor(BoundedMemoryExtractor):
+    checks = 0
+
+    def js_heap_bytes(self):
+        self.checks += 1
+        return 0
+
+
+def test_heap_is_checked_when_batched_writes_skip_the_multiple(tmp_path):
+    extractor = HeapCountingExtractor(None, None, RunDirectory(str(tmp_path / 'run')), recycle_every=0,
+                                      heap_limit_mb=1, heap_check_every=5)
+    checked_at = []
+    # Conversations and source batches write several records between checks; 3, 6, 9, ... hits a multiple of 5 only every 15
+    for _ in range(10):
+        extractor.since_recycle += 3
+        before = extractor.checks
+        extractor.should_recycle()
+        if extractor.checks > before:
+            checked_at.append(extractor.since_recycle)
+    assert checked_at == [6, 12, 18, 24, 30]
@@ -0,0 +1,41 @@
+from outlook_extractor.checkpoint import Checkpoint
+from outlook_extractor.records import RecordWriter, iter_records
+
+
+def write_run(directory, records_path, ids, checkpoint=None):
+    if checkpoint is None:
+        checkpoint = Checkpoint(directory, records_path=records_path)
+    writer = RecordWriter(records_path)
+    for message_id in ids:
+        writer.write({'id': message_id})
+        checkpoint.add(message_id)
+    writer.close()
+    return checkpoint
+
+
+def test_records_written_before_a_crash_are_recovered(tmp_path):
+    records_path = str(tmp_path / 'records.jsonl')
+    # No close: the ids are still pending when the process dies
+    write_run(str(tmp_path), records_path, [f'm{n}' for n in range(10)])
+
+    resumed = Checkpoint(str(tmp_path), records_path=records_path)
+    assert len(resumed) == 10
+    assert all(f'm{n}' in resumed for n in range(10))
+
+
+def test_recovery_reads_only_past_the_last_commit(tmp_path, caplog):
+    records_path = str(tmp_path / 'records.jsonl')
+    checkpoint = Checkpoint(str(tmp_path), commit_every=4, records_path=records_path)
+    write_run(str(tmp_path), records_path, [f'm{n}' for n in range(6)], checkpoint)
+
+    resumed = Checkpoint(str(tmp_path), records_path=records_path)
+    assert len(resumed) == 6
+    assert 'Recovered 2 ids' in caplog.text
+    resumed.close()
+
+    # After a clean close nothing is left to recover
+    caplog.clear()
+    again = Checkpoint(str(tmp_path), records_path=records_path)
+    assert len(again) == 6
+    assert 'Recovered' not in caplog.text
+    assert [record['id'] for record in iter_records(records_path)] == [f'm{n}' for n in range(6)]
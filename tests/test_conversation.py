@@ -0,0 +1,68 @@
+from outlook_extractor.conversation import ConversationExtractor
+from outlook_extractor.records import RunDirectory, iter_records
+from outlook_extractor.sender_rules import SenderRule
+from outlook_extractor.strategies.listscan import SenderRulesScan
+from outlook_extractor.strategies.output import JsonlOutput
+
+MEMBERS = [
+    {'id': 'a1', 'sender': 'alerts@example.com', 'sender_name': 'Alerts', 'date': '10/14/2024 9:05 AM',
+     'body': 'Disk full', 'body_html': '', 'attachments': []},
+    {'id': 'b1', 'sender': 'bob@example.com', 'sender_name': 'Bob', 'date': '10/14/2024 9:30 AM',
+     'body': 'On it', 'body_html': '', 'attachments': []},
+]
+
+
+class FakeLocator:
+    """Every locator of the fake page: one conversation whose reading pane holds MEMBERS"""
+
+    first = property(lambda self: self)
+
+    def nth(self, index):
+        return self
+
+    def click(self):
+        pass
+
+    def wait_for(self, **kwargs):
+        pass
+
+    def count(self):
+        return 0
+
+    def evaluate(self, script, arg=None):
+        return MEMBERS
+
+
+class FakePage:
+    def locator(self, selector):
+        return FakeLocator()
+
+
+class FixedRows(SenderRulesScan):
+    def rows(self, page, sender=None):
+        info = {'id': 'conv1', 'index': 0, 'subject': 'Disk', 'date': '10/14/2024', 'sender': 'Alerts',
+                'text': 'Alerts Bob Disk full'}
+        info['outputs'] = self.outputs_for(f"{info['sender']} {info['text']}")
+        return [info]
+
+
+class FakeStrategies:
+    def __init__(self):
+        self.list_scan = FixedRows([SenderRule('alerts@', 'ops')])
+        self.outputs = [JsonlOutput()]
+
+
+def test_members_are_matched_against_sender_rules_and_rows_are_not_counted(tmp_path):
+    run_dir = RunDirectory(str(tmp_path / 'run'))
+    extractor = ConversationExtractor(None, None, run_dir, strategies=FakeStrategies(), recycle_every=0,
+                                      heap_limit_mb=0)
+    extractor.page = FakePage()
+    extractor.open_outputs()
+    extractor.process_visible_rows()
+    extractor.close_outputs()
+
+    records = list(iter_records(run_dir.records_path))
+    assert [(record['id'], record['outputs']) for record in records] == [('a1', ['ops'])]
+    assert len(extractor.checkpoint) == 1
+    assert len(extractor.rows) == 1
+    assert 'a1' in extractor.checkpoint and 'a1' not in extractor.rows
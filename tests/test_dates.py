@@ -0,0 +1,74 @@
+import json
+
+from outlook_extractor.dates import DateParser
+from outlook_extractor.search_index import collect
+
+
+def local_day(parser, text):
+    parsed = parser.parse(text)
+    return None if parsed is None else parsed.astimezone().strftime('%Y-%m-%d')
+
+
+def test_mixed_shapes_survive_a_bad_value():
+    parser = DateParser()
+    assert local_day(parser, 'Mon 10/14/2024 9:05 AM') == '2024-10-14'
+    assert local_day(parser, '2024-10-14T09:05:00+00:00') is not None
+    assert local_day(parser, 'Tue, 15 Oct 2024 10:00:00 +0000') is not None
+    assert parser.parse('yesterday') is None
+    # Same shape as the first value, but no format can read it
+    assert parser.parse('Mon 99/99/2024 9:05 AM') is None
+    assert local_day(parser, 'Wed 10/16/2024 1:30 PM') == '2024-10-16'
+    assert local_day(parser, 'Thu 10/17/2024 8:00 AM') == '2024-10-17'
+    assert 'a 9/9/9 9:9 a' not in parser.unparseable
+    assert 'a' in parser.unparseable
+
+
+def test_ambiguous_dates_follow_day_first_evidence():
+    parser = DateParser()
+    assert local_day(parser, '14/10/2024 12:00') == '2024-10-14'
+    assert local_day(parser, '03/04/2024 12:00') == '2024-04-03'
+    assert local_day(parser, '05/06/2024') == '2024-06-05'
+
+
+def test_ambiguous_dates_follow_month_first_evidence():
+    parser = DateParser()
+    assert local_day(parser, '10/14/2024 12:00 PM') == '2024-10-14'
+    assert local_day(parser, '03/04/2024 12:00 PM') == '2024-03-04'
+
+
+def test_order_is_settled_once_and_kept():
+    parser = DateParser()
+    # Ambiguous before any evidence: read month first
+    assert local_day(parser, '03/04/2024') == '2024-03-04'
+    assert local_day(parser, '14/10/2024') == '2024-10-14'
+    # From here on ambiguous values are read day first
+    assert local_day(parser, '05/06/2024') == '2024-06-05'
+    # A value only month first can read is still read that way, and does not reopen the order
+    assert local_day(parser, '10/14/2024') == '2024-10-14'
+    assert local_day(parser, '07/08/2024') == '2024-08-07'
+
+
+def test_explicit_order():
+    parser = DateParser(day_first=True)
+    assert local_day(parser, '03/04/2024 12:00') == '2024-04-03'
+
+
+def write_run(root, name, account, dates):
+    run = root / name
+    run.mkdir()
+    (run / 'status.json').write_text(json.dumps({'state': 'completed', 'account': account}))
+    with open(run / 'records.jsonl', 'w') as f:
+        for n, date in enumerate(dates):
+            f.write(json.dumps({'id': f'{name}-{n}', 'sender': 'a@example.com', 'subject': '', 'date': date}) + '\n')
+
+
+def test_runs_of_opposite_locales_keep_their_dates(tmp_path):
+    write_run(tmp_path, 'run1', 'us@example.com', ['10/14/2024 9:05 AM', '03/04/2024 9:05 AM'])
+    write_run(tmp_path, 'run2', 'uk@example.com', ['14/10/2024 09:05', '03/04/2024 09:05', '25/12/2024 09:05'])
+    _, entries = collect(str(tmp_path))
+    assert all(item.epoch is not None for item, _ in entries)
+    epochs = {item.id: item.epoch for item, _ in entries}
+    # Same text, read month first in the US run and day first in the UK run
+    assert epochs['run1-1'] != epochs['run2-1']
+    # 4 March to 3 April, give or take a daylight saving change
+    assert abs(epochs['run2-1'] - epochs['run1-1'] - 30 * 86400) <= 3600
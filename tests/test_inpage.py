@@ -0,0 +1,80 @@
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from outlook_extractor.attachments import ATTACHMENT_LINK_SELECTOR
+from outlook_extractor.conversation import CONVERSATION_JS
+
+pytestmark = pytest.mark.skipif(shutil.which('node') is None, reason='needs node to run the page scripts')
+
+# Just enough DOM for the page scripts: elements match the selectors they use through predicates,
+# and an unknown selector throws, as a malformed one would in the browser
+FAKE_DOM = """
+const MATCHERS = {
+    '[data-item-id], div[aria-label^="Email from"]': e => e.attrs['data-item-id'] !== undefined,
+    'span[title*="@"]': e => e.tagName === 'SPAN' && (e.attrs.title || '').includes('@'),
+    '[title*="/"]': e => (e.attrs.title || '').includes('/'),
+    'div[role="document"]': e => e.tagName === 'DIV' && e.attrs.role === 'document',
+    [ATTACHMENT_SELECTOR]: e => e.tagName === 'A' && e.attrs.href !== undefined &&
+        e.ancestors().some(p => (p.attrs['data-testid'] || '').toLowerCase().includes('attachment')),
+};
+class Text {
+    constructor(value) { this.nodeType = 3; this.nodeValue = value; this.nextSibling = null; }
+}
+class Element {
+    constructor(tag, attrs, children) {
+        this.nodeType = 1;
+        this.tagName = tag.toUpperCase();
+        this.attrs = attrs || {};
+        this.children = (children || []).map(c => typeof c === 'string' ? new Text(c) : c);
+        this.children.forEach((c, i) => { c.parent = this; c.nextSibling = this.children[i + 1] || null; });
+        this.firstChild = this.children[0] || null;
+        this.nextSibling = null;
+        this.href = this.attrs.href;
+        this.innerHTML = '';
+    }
+    getAttribute(name) { return this.attrs[name] === undefined ? null : this.attrs[name]; }
+    get textContent() { return this.children.map(c => c.nodeType === 3 ? c.nodeValue : c.textContent).join(''); }
+    ancestors() { const out = []; for (let p = this.parent; p; p = p.parent) out.push(p); return out; }
+    descendants() { return this.children.filter(c => c.nodeType === 1).flatMap(c => [c, ...c.descendants()]); }
+    contains(other) { return other === this || other.ancestors().includes(this); }
+    querySelectorAll(selector) {
+        const match = MATCHERS[selector];
+        if (!match) throw new Error('Unsupported selector: ' + selector);
+        return this.descendants().filter(match);
+    }
+    querySelector(selector) { return this.querySelectorAll(selector)[0] || null; }
+}
+const el = (tag, attrs, ...children) => new Element(tag, attrs, children);
+"""
+
+CONVERSATION = """
+const member = (id, sender, body, attachments) => el('div', {'data-item-id': id},
+    el('span', {title: sender}, sender),
+    el('span', {title: '10/14/2024 9:05 AM'}),
+    el('div', {role: 'document'}, body, el('a', {href: 'https://example.com/in-body'}, 'a link')),
+    el('div', {'data-testid': 'attachment-well'},
+        ...attachments.map(name => el('a', {href: 'https://attachments.office.net/' + name, title: name}, name))));
+const pane = el('div', {role: 'main'},
+    member('m1', 'alice@example.com', 'First', ['report.pdf']),
+    member('m2', 'bob@example.com', 'Reply', []));
+"""
+
+
+def run_script(setup, expression):
+    script = FAKE_DOM.replace('ATTACHMENT_SELECTOR', json.dumps(ATTACHMENT_LINK_SELECTOR)) + setup + \
+        f'console.log(JSON.stringify({expression}));'
+    result = subprocess.run(['node', '-e', script], capture_output=True, text=True, timeout=30)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout)
+
+
+def test_conversation_members_keep_their_attachments():
+    members = run_script(CONVERSATION, f'({CONVERSATION_JS})(pane, {json.dumps(ATTACHMENT_LINK_SELECTOR)})')
+    assert [member['id'] for member in members] == ['m1', 'm2']
+    assert members[0]['attachments'] == [{'name': 'report.pdf', 'url': 'https://attachments.office.net/report.pdf'}]
+    # The link inside the body is the sender's, not an attachment
+    assert members[1]['attachments'] == []
+    assert members[0]['body'].startswith('First')
@@ -0,0 +1,24 @@
+import pytest
+
+from outlook_extractor.records import RunDirectory
+from outlook_extractor.strategies.output import ParquetOutput
+
+pq = pytest.importorskip('pyarrow.parquet')
+
+
+def write_session(run_dir, ids):
+    output = ParquetOutput()
+    output.open(run_dir)
+    for message_id in ids:
+        output.write({'id': message_id, 'sender': 'a@example.com', 'subject': '', 'body': 'x',
+                      'date': '10/14/2024 9:05 AM'})
+    output.close()
+
+
+def test_resumed_session_keeps_earlier_rows(tmp_path):
+    run_dir = RunDirectory(str(tmp_path / 'run'))
+    run_dir.update_status(account='me@example.com')
+    write_session(run_dir, ['m1', 'm2'])
+    write_session(run_dir, ['m3'])
+    table = pq.read_table(run_dir.file('parquet/metadata'))
+    assert sorted(table.column('message_id').to_pylist()) == ['m1', 'm2', 'm3']
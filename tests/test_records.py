@@ -0,0 +1,28 @@
+import json
+
+from outlook_extractor.records import RecordWriter, iter_records, iter_records_with_offsets
+
+
+def test_resume_after_torn_write(tmp_path):
+    path = tmp_path / 'records.jsonl'
+    with RecordWriter(str(path)) as writer:
+        writer.write({'id': 'a', 'body': 'first'})
+        writer.write({'id': 'b', 'body': 'second'})
+    # A crash in the middle of the third write
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps({'id': 'c', 'body': 'third'})[:12])
+
+    with RecordWriter(str(path)) as writer:
+        writer.write({'id': 'c', 'body': 'third'})
+        writer.write({'id': 'd', 'body': 'fourth'})
+
+    assert [record['id'] for record in iter_records(str(path))] == ['a', 'b', 'c', 'd']
+    assert [record['id'] for _, record in iter_records_with_offsets(str(path))] == ['a', 'b', 'c', 'd']
+
+
+def test_torn_only_line_is_dropped(tmp_path):
+    path = tmp_path / 'records.jsonl'
+    path.write_text('{"id": "a", "bo')
+    with RecordWriter(str(path)) as writer:
+        writer.write({'id': 'b'})
+    assert [record['id'] for record in iter_records(str(path))] == ['b']
@@ -0,0 +1,52 @@
+import threading
+import urllib.error
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from outlook_extractor.session import session_opener
+
+SESSION = [{'name': 'session', 'value': 'secret', 'domain': '127.0.0.1', 'path': '/', 'secure': False}]
+
+
+@pytest.fixture
+def server():
+    """One server reached as two hosts: 127.0.0.1 redirects to 127.0.0.2, which reports the cookies it got"""
+    seen = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            seen[(self.headers['Host'].split(':')[0], self.path)] = self.headers.get('Cookie')
+            if self.path == '/start':
+                self.send_response(302)
+                self.send_header('Location', f'http://127.0.0.2:{self.server.server_port}/landing')
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(b'ok')
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(('0.0.0.0', 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd.server_port, seen
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_redirect_to_another_host_drops_the_session(server):
+    port, seen = server
+    with session_opener(SESSION).open(f'http://127.0.0.1:{port}/start', timeout=10) as response:
+        assert response.read() == b'ok'
+    assert seen[('127.0.0.1', '/start')] == 'session=secret'
+    assert seen[('127.0.0.2', '/landing')] is None
+
+
+def test_redirect_outside_allowed_hosts_is_refused(server):
+    port, seen = server
+    opener = session_opener(SESSION, allow_url=lambda url: url.startswith('http://127.0.0.1:'))
+    with pytest.raises(urllib.error.HTTPError, match='Refusing redirect'):
+        opener.open(f'http://127.0.0.1:{port}/start', timeout=10)
+    assert ('127.0.0.2', '/landing') not in seen
@@ -0,0 +1,120 @@
+from outlook_extractor.mime import SourceFetchExtractor
+from outlook_extractor.records import RunDirectory, iter_records
+from outlook_extractor.strategies.output import JsonlOutput, SegmentOutput
+
+EML = """From: alerts@example.com
+To: me@example.com
+Subject: Message {n}
+Date: Mon, 1 Jan 2024 10:00:00 +0000
+Message-ID: <{n}@example.com>
+
+Body {n}
+"""
+
+
+class FakeContext:
+    def cookies(self):
+        return []
+
+
+class FakeListScan:
+    def __init__(self, rows):
+        self.rows_ = rows
+
+    def rows(self, page, sender):
+        return self.rows_
+
+
+class FakeStrategies:
+    def __init__(self, rows, outputs=()):
+        self.list_scan = FakeListScan(rows)
+        self.outputs = [JsonlOutput()] + [output() for output in outputs]
+
+
+def make_extractor(tmp_path, count, missing=(), outputs=()):
+    sources = tmp_path / 'sources'
+    sources.mkdir(exist_ok=True)
+    for n in range(count):
+        if n not in missing:
+            (sources / f'm{n}.eml').write_text(EML.format(n=n))
+    rows = [{'id': f'm{n}', 'subject': f'Message {n}', 'date': '', 'text': ''} for n in range(count)]
+    run_dir = RunDirectory(str(tmp_path / 'run'))
+    extractor = SourceFetchExtractor(None, FakeContext(), run_dir, strategies=FakeStrategies(rows, outputs),
+                                     url_template=f'file://{sources}/{{id}}.eml', recycle_every=0,
+                                     heap_limit_mb=0, fetch_workers=2, parse_workers=1)
+    return extractor, run_dir
+
+
+def run_pass(extractor, crash=False):
+    extractor.open_outputs()
+    extractor.process_visible_rows()
+    # The same rows are still on screen after a scroll that did not move
+    extractor.process_visible_rows()
+    extractor.write_records(extractor.finish())
+    if not crash:
+        extractor.close_outputs()
+        extractor.checkpoint.close()
+        return
+    # Dies with whatever the outputs still buffer: nothing more reaches the disk
+    for output in extractor.strategies.outputs:
+        if isinstance(output, SegmentOutput):
+            output.pipeline.pool.shutdown(cancel_futures=True)
+            output.pipeline.store.close()
+        else:
+            output.close()
+
+
+def test_source_mode_writes_every_record_once(tmp_path):
+    extractor, run_dir = make_extractor(tmp_path, 6)
+    run_pass(extractor)
+    records = list(iter_records(run_dir.records_path))
+    assert sorted(record['id'] for record in records) == [f'm{n}' for n in range(6)]
+    assert all(record['body'].strip() == f"Body {record['id'][1:]}" for record in records)
+    assert len(extractor.checkpoint) == 6
+
+
+def test_failed_fetch_is_retried_on_resume(tmp_path):
+    extractor, run_dir = make_extractor(tmp_path, 4, missing={2})
+    run_pass(extractor)
+    assert sorted(record['id'] for record in iter_records(run_dir.records_path)) == ['m0', 'm1', 'm3']
+    assert 'm2' not in extractor.checkpoint
+
+    (tmp_path / 'sources' / 'm2.eml').write_text(EML.format(n=2))
+    resumed, _ = make_extractor(tmp_path, 4)
+    run_pass(resumed)
+    ids = [record['id'] for record in iter_records(run_dir.records_path)]
+    assert sorted(ids) == ['m0', 'm1', 'm2', 'm3']
+
+
+def test_resume_after_crash_does_not_write_records_twice(tmp_path):
+    extractor, run_dir = make_extractor(tmp_path, 10)
+    run_pass(extractor, crash=True)
+
+    resumed, _ = make_extractor(tmp_path, 10)
+    assert len(resumed.checkpoint) == 10
+    run_pass(resumed)
+    ids = [record['id'] for record in iter_records(run_dir.records_path)]
+    assert sorted(ids) == sorted(f'm{n}' for n in range(10))
+
+
+def segmented_ids(run_dir):
+    return [message['id'] for message in iter_records(run_dir.file('segments/messages.jsonl'))]
+
+
+def test_segments_are_stored_before_their_ids_are_committed(tmp_path):
+    extractor, run_dir = make_extractor(tmp_path, 10, outputs=[SegmentOutput])
+    extractor.checkpoint.commit_every = 4
+    run_pass(extractor, crash=True)
+    committed = [line for line in open(run_dir.file('checkpoint.wal')) if not line.startswith('#')]
+    assert len(committed) == 8
+    assert len(segmented_ids(run_dir)) >= 8
+
+
+def test_segments_of_recovered_records_are_caught_up(tmp_path):
+    extractor, run_dir = make_extractor(tmp_path, 10, outputs=[SegmentOutput])
+    run_pass(extractor, crash=True)
+    assert segmented_ids(run_dir) == []
+
+    resumed, _ = make_extractor(tmp_path, 10, outputs=[SegmentOutput])
+    run_pass(resumed)
+    assert sorted(segmented_ids(run_dir)) == sorted(f'm{n}' for n in range(10))